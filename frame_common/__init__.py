@@ -0,0 +1,7 @@
+"""
+Host-side helpers shared by the Frame apps in this repo (msg_display, image_display,
+live_translation).
+
+The app scripts are run from their own directories, so they put the repo root on
+sys.path before importing from here.
+"""
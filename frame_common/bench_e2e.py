@@ -0,0 +1,234 @@
+"""
+End-to-end timings of the Frame scripts over a simulated BLE link, no glasses needed.
+
+Each scenario drives the real script code against FakeFrameMsg (MTU packets,
+per-packet latency, optional throughput cap and jitter, and the Lua apps' message
+contract):
+
+  startup      UploadManager.sync() of the translator app and libraries, then
+               start_frame_app() up to the ready print; cold (empty Frame) and warm
+               (everything already uploaded)
+  sprite       image_display/Koala.py: load the cached koala sprite, compress it and
+               send it on 0x20
+  translator   live_translation/translator.py main() for a few utterances: the fake
+               mic streams WAV fixtures (or generated speech-like bursts) in the
+               AUDIO_FORMAT the translator asks for, a stub ASR and a fake translator
+               answer, and the translation is checked on the simulated display
+
+Every run is checked (the sprite arrived intact, the translation is what Frame shows),
+so a broken change fails instead of looking fast. With --json the medians are written
+out for a CI job to compare against a baseline.
+
+Usage:
+    python bench_e2e.py [--runs 3] [--packet-ms 15] [--jitter-ms 5] [--kbps 20]
+    python bench_e2e.py --fixtures ../live_translation/fixtures --json e2e.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import struct
+import sys
+import time
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "image_display"))
+sys.path.insert(0, str(ROOT / "live_translation"))
+
+from frame_common.fake_frame import FakeFrameMsg
+from frame_common.upload_manager import UploadManager
+from progressive_display import text_checksum
+
+TRANSCRIPT = "hola, ¿cómo estás?"
+TRANSLATION = "hello, how are you?"
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    old = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(old)
+
+
+def quiet(verbose):
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def make_frame(args, **options):
+    return FakeFrameMsg(packet_ms=args.packet_ms, jitter_ms=args.jitter_ms,
+                        bytes_per_second=args.kbps * 1000 / 8 if args.kbps else None,
+                        seed=args.seed, **options)
+
+
+async def startup(args):
+    frame = make_frame(args, ready_message="Frame Lua app running")
+    app = ROOT / "live_translation" / "lua"
+    ready = []
+    timings = {}
+    for label in ("cold", "warm"):
+        ready.clear()
+        start = time.perf_counter()
+        await frame.connect()
+        uploads = UploadManager(frame)
+        await uploads.sync(stdlua_libs=['data', 'code', 'audio', 'sprite'],
+                           frame_app=str(app / "translator_frame_app.lua"),
+                           extra_files={"mic.lua": str(app / "mic.lua")})
+        frame.attach_print_response_handler(ready.append)
+        await frame.start_frame_app()
+        timings[f"startup_{label}"] = time.perf_counter() - start
+        assert ready == ["Frame Lua app running"], f"no ready print: {ready}"
+        await frame.stop_frame_app()
+        await frame.disconnect()
+    return timings
+
+
+async def sprite(args):
+    import Koala
+    from sprite_codec import decompress_sprite
+    from sprite_cache import SpriteCache
+
+    frame = make_frame(args)
+    with working_dir(ROOT / "image_display"), quiet(args.verbose):
+        expected = SpriteCache().packed_sprite(Path("images/koala.jpg"))
+        start = time.perf_counter()
+        await Koala.main(frame, hold=0)
+        elapsed = time.perf_counter() - start
+    sprites = [payload for code, payload in frame.messages if code == 0x20]
+    assert len(sprites) == 1 and decompress_sprite(sprites[0]) == expected, "koala sprite didn't arrive intact"
+    return {"sprite_display": elapsed, "sprite_bytes": len(sprites[0])}
+
+
+def load_fixtures(folder, sample_rate):
+    """int16 samples of each WAV in folder at sample_rate (nearest-sample resampling)."""
+    clips = []
+    for path in sorted(Path(folder).glob("*.wav")):
+        with wave.open(str(path)) as wav:
+            rate, width = wav.getframerate(), wav.getsampwidth()
+            raw = wav.readframes(wav.getnframes())
+        if width == 1:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8
+        else:
+            samples = np.frombuffer(raw, dtype="<i2")
+        clips.append(samples[(np.arange(len(samples) * sample_rate // rate) * rate // sample_rate)])
+    return clips
+
+
+def speech_bursts(count, sample_rate, seconds=1.5):
+    """Voiced-sounding bursts (a 180 Hz tone with a syllable envelope) the VAD accepts as speech."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 2 * t))
+    burst = (0.4 * envelope * np.sin(2 * np.pi * 180 * t) * 32767).astype(np.int16)
+    return [burst] * count
+
+
+def apply_text_messages(messages):
+    """Replay TEXT_OUT/TEXT_DIFF messages the way translator_frame_app.lua does."""
+    text = b""
+    for code, payload in messages:
+        if code == 0x20:
+            text = payload
+        elif code == 0x21:
+            keep, base = struct.unpack_from(">HH", payload)
+            if keep == 0 or (base == text_checksum(text) and keep <= len(text)):
+                text = text[:keep] + payload[4:]
+        elif code == 0x22:
+            text = b""
+    return text.decode()
+
+
+async def translator_cycle(args):
+    import translator
+    from asr_backends import StubBackend
+    from frame_common.metrics import Metrics
+    from translation_cache import CachedTranslator, TranslationCache
+
+    class FakeGoogle:
+        def translate(self, text, dest):
+            time.sleep(args.translate_ms / 1000)
+            return SimpleNamespace(text=TRANSLATION, src="es")
+
+    audio_format = translator.AUDIO_FORMAT
+    clips = (load_fixtures(args.fixtures, audio_format.sample_rate) if args.fixtures
+             else speech_bursts(args.utterances, audio_format.sample_rate))
+    gap = np.zeros(audio_format.sample_rate, dtype=np.int16)
+    stream = np.concatenate([part for clip in clips for part in (gap, clip)] + [gap])
+
+    translator.asr = StubBackend(TRANSCRIPT, latency=args.asr_ms / 1000)
+    translator.translator = CachedTranslator(FakeGoogle(), TranslationCache())
+    translator.metrics = Metrics()
+    frame = make_frame(args, ready_message="Frame Lua app running",
+                       mic_audio=audio_format.encode(stream), mic_speed=args.mic_speed)
+
+    # the Frame app and mic.lua are read relative to live_translation/
+    with working_dir(ROOT / "live_translation"), quiet(args.verbose):
+        start = time.perf_counter()
+        await translator.main(frame, max_utterances=len(clips))
+        elapsed = time.perf_counter() - start
+
+    shown = apply_text_messages(frame.messages)
+    assert TRANSLATION in shown, f"translation not on the display: {shown!r}"
+    stages = translator.metrics.histograms
+    result = {"translator_session": elapsed, "utterances": stages["capture"].count,
+              "mic_bytes": frame.mic_bytes}
+    for stage in ("ble_drain", "asr", "translate", "display_send", "end_to_end"):
+        if stage in stages:
+            result[f"{stage}_p50"] = stages[stage].quantile(0.5)
+    return result
+
+
+async def run_all(args):
+    results = {}
+    for scenario in (startup, sprite, translator_cycle):
+        runs = []
+        for _ in range(args.runs):
+            runs.append(await scenario(args))
+        for key, value in runs[0].items():
+            # counts stay whole numbers
+            median = statistics.median_low if isinstance(value, int) else statistics.median
+            results[key] = median(run[key] for run in runs)
+    return results
+
+
+def main(args):
+    kbps = f"{args.kbps} kbit/s cap" if args.kbps else "no throughput cap"
+    print(f"Simulated link: {args.packet_ms} ms per packet, ±{args.jitter_ms} ms jitter, {kbps}; "
+          f"median of {args.runs} runs\n")
+    results = asyncio.run(run_all(args))
+
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"{key:<22} {value * 1000:10.1f} ms")
+        else:
+            print(f"{key:<22} {value:10}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--packet-ms", type=float, default=15, help="time per acknowledged packet")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform ± jitter per packet")
+    parser.add_argument("--kbps", type=float, help="link throughput cap in kbit/s")
+    parser.add_argument("--seed", type=int, default=0, help="jitter random seed")
+    parser.add_argument("--fixtures", help="folder of .wav utterances for the translator scenario")
+    parser.add_argument("--utterances", type=int, default=3, help="generated utterances without --fixtures")
+    parser.add_argument("--mic-speed", type=float, default=4, help="fake mic speed vs real time")
+    parser.add_argument("--asr-ms", type=float, default=50, help="stub ASR latency")
+    parser.add_argument("--translate-ms", type=float, default=100, help="fake translate latency")
+    parser.add_argument("--json", help="write the medians to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the scripts' own output")
+    main(parser.parse_args())
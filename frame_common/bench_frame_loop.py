@@ -0,0 +1,374 @@
+"""
+The Frame apps' main loop before and after lua/runtime.lua, run as Lua under a simulated clock.
+
+The real app files and frame-msg's data/code/sprite/audio libraries run in a Lua 5.4
+interpreter (lupa, `pip install lupa`) against a stand-in for the firmware's `frame` API:
+
+  - frame.sleep() yields to the simulator, which moves the clock on by the sleep plus
+    the CPU time the Lua code took since the last one
+  - host messages are cut into packets the way send_message() does it, and each one
+    reaches data.lua's receive callback during a sleep, once the previous packet was
+    acknowledged and --packet-ms has passed. --deferred-callbacks holds packets until
+    the sleep ends instead, for firmware that only runs callbacks between Lua calls
+  - the mic fills a 32 KB buffer at the rate the app asked for; read() takes whole
+    reads as lua/mic.lua asks for them
+  - a HEALTH request goes out every --health-s, and replies are read with
+    metrics.parse_health()/parse_loop_stats() into Metrics, as translator.py does
+
+"before" is the loop every app had: data.process_raw_items() (and its full garbage
+collection) every pass, then frame.sleep(0.001), or 0.01 for the translator app when
+the mic is off. "after" is runtime.lua. Scenarios:
+
+  idle         translator app waiting for speech, only health polls
+  captions     translator app, a TEXT_DIFF caption twice a second
+  listening    translator app streaming μ-law audio, with a caption every 2 s
+  slideshow    sprite app, a 10 KB sprite every 2 s
+
+Reported per loop: passes per second, Lua CPU time per second of session (on this
+host; Frame's 64 MHz core takes many times longer for the same work, so the sleep
+share is an upper bound), full collections per minute, peak heap, how long a message
+took to send and from its last packet to the display being shown, and mic buffer
+overruns. For
+"after", the loop figures the host derived from the HEALTH replies are shown too.
+
+Usage:
+    python bench_frame_loop.py [--duration 30] [--packet-ms 15] [--scenarios idle,captions]
+    python bench_frame_loop.py --deferred-callbacks
+"""
+import argparse
+import heapq
+import statistics
+import struct
+import sys
+import time
+from pathlib import Path
+
+from lupa.lua54 import LuaRuntime
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from frame_common.metrics import Metrics, parse_health, parse_loop_stats
+from frame_common.upload_manager import RUNTIME_LUA, stdlua_source
+
+TRANSLATOR_APP = ROOT / "live_translation" / "lua" / "translator_frame_app.lua"
+SPRITE_APP = ROOT / "image_display" / "lua" / "sprite_frame_app.lua"
+MIC_LUA = ROOT / "live_translation" / "lua" / "mic.lua"
+
+TEXT_DIFF = 0x21
+USER_SPRITE = 0x20
+AUDIO_CTRL = 0x30
+HEALTH = 0x31
+ACK = b"\x00"
+MIC_BUFFER = 32768
+
+# the loop the apps had before runtime.lua, as a drop-in for require('runtime')
+BEFORE_RUNTIME = """
+local data = require('data.min')
+local _M = {}
+data.parsers[0x31] = function(raw) return true end
+function _M.run(step, on_error)
+    while true do
+        local ok, err = pcall(function()
+            local items_ready = data.process_raw_items()
+            if data.app_data[0x31] ~= nil then
+                data.app_data[0x31] = nil
+                frame.bluetooth.send(string.char(0x31) .. frame.battery_level() .. ' / ' .. collectgarbage('count'))
+            end
+            local busy, active = step(items_ready)
+            if active then
+                frame.sleep(0.001)
+            else
+                frame.sleep(IDLE_SLEEP)
+            end
+        end)
+        if not ok and on_error(err) then
+            break
+        end
+    end
+end
+return _M
+"""
+
+# the firmware API the apps use, backed by the simulator's Python functions
+FRAME_API = """
+local sim = ...
+local real_collectgarbage = collectgarbage
+collectgarbage = function(opt, ...)
+    if opt == nil or opt == 'collect' then
+        sim.collected()
+    end
+    return real_collectgarbage(opt, ...)
+end
+local function noop() end
+frame = {
+    sleep = function(seconds) coroutine.yield(seconds) end,
+    battery_level = function() return 87 end,
+    bluetooth = {
+        max_length = sim.max_length,
+        send = sim.send,
+        receive_callback = sim.receive_callback,
+    },
+    display = {
+        text = noop, bitmap = noop, clear = noop, assign_color = noop,
+        show = sim.show,
+    },
+    microphone = {
+        start = function(options) sim.mic_start(options.sample_rate, options.bit_depth) end,
+        stop = sim.mic_stop,
+        read = sim.mic_read,
+    },
+}
+print = sim.print
+table.insert(package.searchers, 2, function(name)
+    local source = sim.source(name)
+    if source ~= nil then
+        return load(source, '@' .. name)
+    end
+end)
+"""
+
+
+class SimulatedFrame:
+    """The firmware side of one Frame running one Lua app, on a simulated clock."""
+
+    def __init__(self, app, runtime_source, args):
+        self.args = args
+        self.now = 0.0
+        self.packet_s = args.packet_ms / 1000
+        self.sources = {"runtime": runtime_source, "mic": MIC_LUA.read_text()}
+        for lib in ("data", "code", "sprite", "audio"):
+            self.sources[f"{lib}.min"] = stdlua_source(lib)[1]
+
+        self.events = []          # (time, sequence, function) heap
+        self.sequence = 0
+        self.outbox = []          # host messages waiting for the link
+        self.packets = []         # packets of the message being sent
+        self.sending = None
+        self.arrived = 0.0        # when the packet being handled reached Frame
+        self.delivered = []       # (message kind, when its first packet went out, when its last arrived)
+
+        self.passes = 0
+        self.cpu = 0.0
+        self.collections = 0
+        self.peak_kb = 0.0
+        self.shows = []
+        self.replies = []
+        self.prints = []
+        self.mic = None
+        self.mic_overrun = 0
+        self.mic_delays = []
+        self.audio_bytes = 0
+
+        self.lua = LuaRuntime(encoding=None)
+        self.lua.execute(FRAME_API.encode(), self.api())
+        self.main = self.lua.eval(b"load")(app.read_bytes(), b"@app").coroutine()
+        self.heap_kb = self.lua.eval(b"function() return collectgarbage('count') end")
+
+    def api(self):
+        return self.lua.table_from({
+            b"collected": self._collected, b"max_length": lambda: self.args.mtu,
+            b"send": self._bluetooth_send, b"receive_callback": self._set_receive_callback,
+            b"show": lambda: self.shows.append(self.now), b"mic_start": self._mic_start,
+            b"mic_stop": self._mic_stop, b"mic_read": self._mic_read, b"print": self._print,
+            b"source": lambda name: self.sources.get(name.decode(), "").encode() or None,
+        })
+
+    def _collected(self):
+        self.collections += 1
+
+    def _print(self, *values):
+        self.prints.append(" ".join(str(v) for v in values))
+
+    def _set_receive_callback(self, callback):
+        self.receive = callback
+
+    def _bluetooth_send(self, data):
+        data = bytes(data)
+        if data == ACK:
+            if self.packets:
+                self._schedule(self.now + self.packet_s, self._deliver_packet)
+            else:
+                kind, started = self.sending
+                self.delivered.append((kind, started, self.arrived))
+                self.sending = None
+                self._send_next()
+        elif data[0] == HEALTH:
+            self.replies.append((self.now, data[1:].decode()))
+        elif data[0] in (0x05, 0x06):
+            self.audio_bytes += len(data) - 1
+
+    # host side: one send_message() at a time, one packet per acknowledgement
+    def send_message(self, kind, code, payload):
+        self.outbox.append((kind, code, payload))
+        if self.sending is None:
+            self._send_next()
+
+    def _send_next(self):
+        if not self.outbox:
+            return
+        kind, code, payload = self.outbox.pop(0)
+        self.sending = (kind, self.now)
+        first = self.args.mtu - 3
+        self.packets = [bytes([code]) + struct.pack(">H", len(payload)) + payload[:first]]
+        for start in range(first, len(payload), self.args.mtu - 1):
+            self.packets.append(bytes([code]) + payload[start:start + self.args.mtu - 1])
+        self._schedule(self.now + self.packet_s, self._deliver_packet)
+
+    def _deliver_packet(self, arrived):
+        self.arrived = arrived
+        packet = self.packets.pop(0)
+        start = time.perf_counter()
+        self.receive(packet)
+        self.cpu += time.perf_counter() - start
+
+    def at(self, when, function):
+        self._schedule(when, lambda arrived: function())
+
+    def _schedule(self, when, function):
+        self.sequence += 1
+        heapq.heappush(self.events, (when, self.sequence, function))
+
+    # the mic: a FIFO filling in real time, overwritten when nothing reads it
+    def _mic_start(self, sample_rate, bit_depth):
+        self.mic = {"rate": sample_rate * bit_depth // 8, "level": 0.0, "at": self.now, "stopped": False}
+
+    def _mic_stop(self):
+        if self.mic is not None:
+            self._mic_fill()
+            self.mic["stopped"] = True
+
+    def _mic_fill(self):
+        mic = self.mic
+        if not mic["stopped"]:
+            mic["level"] += (self.now - mic["at"]) * mic["rate"]
+        mic["at"] = self.now
+        if mic["level"] > MIC_BUFFER:
+            self.mic_overrun += mic["level"] - MIC_BUFFER
+            mic["level"] = MIC_BUFFER
+
+    def _mic_read(self, nbytes):
+        if self.mic is None:
+            return None
+        self._mic_fill()
+        if self.mic["level"] < nbytes:
+            if self.mic["stopped"]:
+                self.mic = None
+                return None
+            return b""
+        self.mic_delays.append(self.mic["level"] / self.mic["rate"])
+        self.mic["level"] -= nbytes
+        return bytes(nbytes)
+
+    def run(self, until):
+        while self.now < until:
+            start = time.perf_counter()
+            sleep = self.main.send(None)
+            spent = time.perf_counter() - start
+            self.cpu += spent
+            self.now += spent
+            self.passes += 1
+            self.peak_kb = max(self.peak_kb, self.heap_kb())
+            self._sleep(float(sleep))
+
+    def _sleep(self, seconds):
+        end = self.now + seconds
+        while self.events and self.events[0][0] <= end:
+            when, _, function = heapq.heappop(self.events)
+            self.now = end if self.args.deferred_callbacks else max(self.now, when)
+            function(when)
+        self.now = end
+
+
+def caption(i):
+    text = f"Caption {i}: the museum opens at nine and closes at five".encode()
+    return struct.pack(">HH", 0, 0) + text
+
+
+def sprite(i, width=160, height=120, bpp=4):
+    palette = bytes(range(48))
+    pixels = bytes((i + n) & 0xFF for n in range(width * height * bpp // 8))
+    return struct.pack(">HHBBB", width, height, 0, bpp, 16) + palette + pixels
+
+
+def scenario(name, frame, duration):
+    """Queue the host's side of a scenario on frame."""
+    if name == "captions":
+        for i, t in enumerate(range(1, int(duration * 2))):
+            frame.at(t / 2, lambda i=i: frame.send_message("text", TEXT_DIFF, caption(i)))
+    elif name == "listening":
+        start = struct.pack(">BHBB", 1, 8000, 16, 1)   # translator.py's AUDIO_FORMAT, μ-law
+        frame.at(1, lambda: frame.send_message("ctrl", AUDIO_CTRL, start))
+        frame.at(duration - 1, lambda: frame.send_message("ctrl", AUDIO_CTRL, bytes([0])))
+        for i, t in enumerate(range(2, int(duration) - 1, 2)):
+            frame.at(t, lambda i=i: frame.send_message("text", TEXT_DIFF, caption(i)))
+    elif name == "slideshow":
+        for i, t in enumerate(range(1, int(duration), 2)):
+            frame.at(t, lambda i=i: frame.send_message("sprite", USER_SPRITE, sprite(i)))
+
+
+def measure(name, loop, args):
+    app = SPRITE_APP if name == "slideshow" else TRANSLATOR_APP
+    if loop == "before":
+        idle_sleep = "0.001" if app == SPRITE_APP else "0.01"
+        runtime_source = BEFORE_RUNTIME.replace("IDLE_SLEEP", idle_sleep)
+    else:
+        runtime_source = RUNTIME_LUA.read_text()
+    frame = SimulatedFrame(app, runtime_source, args)
+    scenario(name, frame, args.duration)
+    for t in range(args.health_s, int(args.duration) + 1, args.health_s):
+        frame.at(t - 0.5, lambda: frame.send_message("health", HEALTH, bytes([1])))
+    frame.run(args.duration)
+
+    metrics = Metrics()
+    for when, reply in frame.replies:
+        metrics.record_health(*parse_health(reply))
+        stats = parse_loop_stats(reply)
+        if stats:
+            metrics.record_loop(stats, now=when)
+
+    sends, latencies = [], []
+    for kind, started, arrived in frame.delivered:
+        if kind in ("text", "sprite"):
+            sends.append(arrived - started)
+            shown = next((t for t in frame.shows if t >= arrived), None)
+            if shown is not None:
+                latencies.append(shown - arrived)
+    return frame, metrics, sends, latencies
+
+
+def main(args):
+    print(f"{args.duration:.0f} s per run, {args.packet_ms:.0f} ms per packet, MTU {args.mtu}, "
+          f"callbacks {'after each sleep' if args.deferred_callbacks else 'during sleeps'}\n")
+    print(f"{'scenario':<10} {'loop':<7} {'passes/s':>8} {'Lua CPU':>9} {'GC/min':>7} {'peak KB':>8} "
+          f"{'send p50':>8} {'shown p50':>9} {'max':>6} {'mic overrun':>11}")
+    for name in args.scenarios.split(","):
+        for loop in ("before", "after"):
+            frame, metrics, sends, latencies = measure(name, loop, args)
+            latency = (f"{statistics.median(sends) * 1000:6.0f}ms {statistics.median(latencies) * 1000:7.1f}ms "
+                       f"{max(latencies) * 1000:4.0f}ms" if latencies else f"{'-':>8} {'-':>9} {'-':>6}")
+            mic = f"{frame.mic_overrun:9.0f} B" if name == "listening" else f"{'-':>11}"
+            print(f"{name:<10} {loop:<7} {frame.passes / args.duration:8.0f} "
+                  f"{frame.cpu / args.duration * 1000:6.1f}ms/s {frame.collections * 60 / args.duration:7.0f} "
+                  f"{frame.peak_kb:8.1f} {latency} {mic}")
+            if name == "listening":
+                print(f"{'':<18} audio {frame.audio_bytes / (args.duration - 2) / 1000:.1f} kB/s, "
+                      f"mic buffer {statistics.mean(frame.mic_delays) * 1000:.0f} ms on average")
+            for line in metrics.report():
+                if line.startswith("frame loop"):
+                    print(f"{'':<18} health replies: {line}")
+            if args.verbose:
+                for line in frame.prints:
+                    print(f"{'':<18} Frame: {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default="idle,captions,listening,slideshow")
+    parser.add_argument("--duration", type=float, default=30, help="simulated seconds per run")
+    parser.add_argument("--packet-ms", type=float, default=15, help="time per acknowledged packet")
+    parser.add_argument("--mtu", type=int, default=240)
+    parser.add_argument("--health-s", type=int, default=10, help="seconds between HEALTH requests")
+    parser.add_argument("--deferred-callbacks", action="store_true",
+                        help="deliver packets when a sleep ends rather than during it")
+    parser.add_argument("--verbose", action="store_true", help="show what the Lua app printed")
+    main(parser.parse_args())
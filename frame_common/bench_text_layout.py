@@ -0,0 +1,117 @@
+"""
+Layout cost and correctness on long translated paragraphs.
+
+Lays out a set of multi-sentence translations with:
+
+  chars      the old display_text_scroll() wrap, which compared character counts to
+             640 (pixels), so nothing was ever broken
+  remeasure  a pixel-accurate wrap that re-measures the whole candidate line for every
+             word (the frame-sdk approach), uncached
+  layout     text_layout.paginate(), first call (cold) and repeated (memoized)
+
+and reports time per paragraph, lines/pages produced and how many lines would overflow
+the 640px display.
+
+Usage: python bench_text_layout.py [--repeat 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common import text_layout
+from frame_common.text_layout import DISPLAY_WIDTH, FRAME_FONT
+
+PARAGRAPHS = [
+    "I would like to book a table for four people tonight at eight o'clock, preferably "
+    "on the terrace if the weather is good, and we will need a high chair for the baby.",
+    "Excuse me, could you tell me how to get to the central train station? I have a "
+    "connection to Barcelona at half past three and I'm afraid I am going to miss it.",
+    "The museum is closed on Mondays, but from Tuesday to Sunday it opens at ten in the "
+    "morning and closes at seven in the evening; admission is free on the first Sunday.",
+    "My grandmother always said that the secret of a good paella is patience: you must "
+    "never stir the rice once the broth is added, and the crust at the bottom is the best part.",
+    "Attention passengers: the train to Madrid departing from platform six has been delayed "
+    "by approximately twenty-five minutes due to maintenance work on the line. We apologise.",
+    "Ça fait longtemps qu'on ne s'est pas vus ! Ma sœur déménage à Zürich l'été prochain "
+    "et elle aimerait beaucoup que tu viennes fêter son départ avec nous à la crêperie.",
+]
+
+
+def chars_wrap(text, max_width=DISPLAY_WIDTH):
+    lines, current = [], ""
+    for word in text.split():
+        test_line = current + word + " "
+        if len(test_line) <= max_width:
+            current = test_line
+        else:
+            if current:
+                lines.append(current.strip())
+            current = word + " "
+    if current:
+        lines.append(current.strip())
+    return lines
+
+
+def remeasure_wrap(text, max_width=DISPLAY_WIDTH):
+    lines, line = [], ""
+    for word in text.split(" "):
+        if FRAME_FONT.text_width(line + " " + word) > max_width:
+            lines.append(line)
+            line = word
+        elif not line:
+            line = word
+        else:
+            line += " " + word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def overflowing(lines):
+    return sum(FRAME_FONT.text_width(line) > DISPLAY_WIDTH for line in lines)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in PARAGRAPHS:
+            result = fn(text)
+    per_call = (time.perf_counter() - start) / (repeat * len(PARAGRAPHS))
+    return per_call, result
+
+
+def report(label, per_call, lines, pages=None):
+    pages = f"{pages:3d} pages" if pages is not None else "         "
+    print(f"{label:<14} {per_call * 1e6:9.1f}us/paragraph  {sum(len(l) for l in lines):3d} lines "
+          f"{pages}  overflowing {sum(overflowing(l) for l in lines):3d}")
+
+
+def main(args):
+    print(f"{len(PARAGRAPHS)} paragraphs, {sum(len(p) for p in PARAGRAPHS)} characters, "
+          f"{DISPLAY_WIDTH}px wide, {text_layout.lines_per_page()} lines per page\n")
+
+    per_call, _ = timed(chars_wrap, args.repeat)
+    report("chars", per_call, [chars_wrap(p) for p in PARAGRAPHS])
+
+    per_call, _ = timed(remeasure_wrap, args.repeat)
+    report("remeasure", per_call, [remeasure_wrap(p) for p in PARAGRAPHS])
+
+    for fn in (text_layout.wrap, text_layout.paginate, text_layout.tail):
+        fn.cache_clear()
+    per_call, _ = timed(text_layout.paginate, 1)
+    lines = [text_layout.wrap(p) for p in PARAGRAPHS]
+    pages = sum(len(text_layout.paginate(p)) for p in PARAGRAPHS)
+    report("layout cold", per_call, lines, pages)
+
+    per_call, _ = timed(text_layout.paginate, args.repeat)
+    report("layout cached", per_call, lines, pages)
+    print(f"\n{text_layout.cache_info()['paginate']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the paragraphs")
+    main(parser.parse_args())
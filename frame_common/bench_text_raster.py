@@ -0,0 +1,98 @@
+"""
+Render + pack time per caption line for TextRasterizer, cold vs warm caches.
+
+For a set of translated lines in scripts Frame's font can't draw, measures:
+
+  pillow     draw each line with ImageDraw, quantize, TxSprite(...).pack()
+             (what rendering without any caching would cost)
+  cold       a fresh TextRasterizer: empty glyph atlas and line cache
+  atlas      glyph atlas warm, line cache empty (new lines in a known script)
+  warm       both warm (a repeated phrase, or the unchanged lines of a caption)
+
+Usage: python bench_text_raster.py [--font DejaVuSans.ttf] [--bpp 1] [--runs 20]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from frame_msg import TxSprite
+from PIL import Image, ImageDraw, ImageFont
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.text_raster import DEFAULT_FONT, TextRasterizer
+
+LINES = {
+    "russian": "Здравствуйте, где находится ближайшая станция?",
+    "greek": "Θα ήθελα ένα τραπέζι για δύο άτομα",
+    "hebrew": "תודה רבה על העזרה שלך היום",
+    "arabic": "أين أقرب محطة قطار من فضلك؟",
+    "urdu": "براہ کرم مجھے ہوٹل کا راستہ بتائیں",
+}
+CJK_LINES = {
+    "chinese": "请问最近的火车站在哪里？",
+    "japanese": "駅までの道を教えてください",
+}
+
+
+def pillow_line(font, text, bpp):
+    ascent, descent = font.getmetrics()
+    width = int(font.getlength(text)) + 1
+    image = Image.new("L", (width, ascent + descent))
+    ImageDraw.Draw(image).text((0, 0), text, font=font, fill=255)
+    levels = 2 ** bpp
+    pixels = ((np.asarray(image).astype(np.uint16) * (levels - 1) + 127) // 255).astype(np.uint8)
+    palette = bytes(int(255 * i / (levels - 1)) for i in range(levels) for _ in range(3))
+    return TxSprite(width=width, height=ascent + descent, num_colors=levels,
+                    palette_data=palette, pixel_data=pixels.tobytes()).pack()
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(args):
+    lines = dict(LINES)
+    try:
+        ImageFont.truetype(args.cjk_font, 36)
+        lines.update(CJK_LINES)
+    except OSError:
+        print(f"({args.cjk_font} not found, skipping Chinese/Japanese)\n")
+
+    print(f"{args.font} {args.size}px, {args.bpp} bpp, median of {args.runs} runs\n")
+    print(f"{'line':<10} {'pillow':>9} {'cold':>9} {'atlas':>9} {'warm':>9} {'bytes':>7}")
+    for name, text in lines.items():
+        line_font = args.cjk_font if name in CJK_LINES else args.font
+        font = ImageFont.truetype(line_font, args.size)
+        pillow = timed(lambda: pillow_line(font, text, args.bpp), args.runs)
+
+        # creating the rasterizer (loading the font) is not part of the per-line cost
+        rasterizer = TextRasterizer(line_font, args.size, args.bpp)
+        start = time.perf_counter()
+        packed = rasterizer.pack(text)
+        first = (time.perf_counter() - start) * 1000
+
+        def atlas_only():
+            rasterizer.line_cache.clear()
+            rasterizer.pack(text)
+        atlas = timed(atlas_only, args.runs)
+        warm = timed(lambda: rasterizer.pack(text), args.runs)
+        print(f"{name:<10} {pillow:7.2f}ms {first:7.2f}ms {atlas:7.2f}ms {warm:7.3f}ms {len(packed):7d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--font", default=DEFAULT_FONT)
+    parser.add_argument("--cjk-font", default="NotoSansCJK-Regular.ttc")
+    parser.add_argument("--size", type=int, default=36)
+    parser.add_argument("--bpp", type=int, default=1, choices=[1, 2])
+    parser.add_argument("--runs", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,249 @@
+"""
+Stand-in for FrameMsg that runs without glasses or Bluetooth.
+
+send_message() costs what it would over BLE: the payload is cut into MTU-sized
+packets the way frame_ble does it and every packet waits one acknowledgement
+round trip, optionally capped by a link throughput and varied by random jitter.
+Messages are kept so a caller can check what would have been shown.
+
+It also plays the part of the Frame apps in this repo:
+
+  - start_frame_app() prints the app's ready line to the print response handler
+  - 0x20 (sprite or text) and anything else sent is recorded in `messages`
+  - 0x30 AUDIO_CTRL starts/stops a simulated mic: the bytes of `mic_audio` (then
+    silence) are streamed back in real time as 0x05 chunks and a final 0x06, to
+    whatever registered for them (RxAudio)
+  - 0x31 HEALTH is answered with "<battery> / <lua heap KB>", as is HEALTH_LUA
+  - UploadManager's manifest reads print the part of upload_manifest.txt they ask
+    for; like any print, a response longer than one packet (the MTU) is cut short
+
+drop() takes the headset out of range mid-session: later sends fail, or hang as a
+BLE write with no acknowledgement would.
+
+Like frame_ble, which waits for every packet's acknowledgement with one flag and one
+queue, a send_message() that starts while another is still in flight loses its ACK
+and fails with "device didn't respond" (counted in `collisions`); callers sharing a
+frame between tasks go through frame_common.serial_frame.SerialFrame.
+
+    frame = FakeFrameMsg(packet_ms=15, jitter_ms=5)
+    await frame.connect()
+    await frame.send_message(0x20, packed_sprite)
+    frame.messages[-1]        # (code, payload)
+"""
+import asyncio
+import math
+import random
+import re
+import struct
+
+SPRITE = 0x20
+AUDIO_CTRL = 0x30
+HEALTH = 0x31
+AUDIO_DATA_NON_FINAL = 0x05
+AUDIO_DATA_FINAL = 0x06
+
+
+class FakeFrameMsg:
+    """The subset of FrameMsg the scripts use, over a simulated BLE link."""
+
+    def __init__(self, mtu=244, packet_ms=15.0, jitter_ms=0.0, bytes_per_second=None,
+                 keep_messages=100, ready_message="Frame app is running", mic_audio=b"",
+                 mic_speed=1.0, battery=100, lua_kb=20.0, seed=0):
+        self.mtu = mtu
+        self.packet_s = packet_ms / 1000
+        self.jitter_s = jitter_ms / 1000
+        self.bytes_per_second = bytes_per_second
+        self.keep_messages = keep_messages
+        self.ready_message = ready_message
+        self.mic_audio = mic_audio
+        self.mic_speed = mic_speed
+        self.battery = battery
+        self.lua_kb = lua_kb
+        self.random = random.Random(seed)
+
+        self.messages = []
+        self.files = {}
+        self.bytes_sent = 0
+        self.packets_sent = 0
+        self.mic_bytes = 0
+        self.collisions = 0
+        self.connected = False
+        self.app_running = False
+        self.dropped = None
+        self._print_handler = None
+        self._sending = False
+        self._data_handlers = {}
+        self._mic_task = None
+        self._mic_stop = None
+
+    def max_data_payload(self):
+        return self.mtu
+
+    def packets_for(self, nbytes):
+        # 3-byte header on the first packet, 1 byte on each one after it
+        return 1 + max(0, math.ceil((nbytes - (self.mtu - 3)) / (self.mtu - 1)))
+
+    def link_time(self, nbytes):
+        """Seconds to carry nbytes: per-packet round trips, throughput cap and jitter."""
+        packets = self.packets_for(nbytes)
+        on_air = nbytes + 3 + (packets - 1)
+        seconds = 0.0
+        for n in range(packets):
+            packet_bytes = min(self.mtu, on_air - n * self.mtu)
+            packet_s = self.packet_s
+            if self.bytes_per_second:
+                packet_s = max(packet_s, packet_bytes / self.bytes_per_second)
+            if self.jitter_s:
+                packet_s = max(0.0, packet_s + self.random.uniform(-self.jitter_s, self.jitter_s))
+            seconds += packet_s
+        return seconds
+
+    async def connect(self, initialize=True):
+        self.connected = True
+
+    async def disconnect(self):
+        await self._stop_mic()
+        self.connected = False
+        self.app_running = False
+
+    def is_connected(self):
+        return self.connected
+
+    def drop(self, hang=False):
+        """Lose the link: every later send raises ConnectionError, or never returns if hang."""
+        self.connected = False
+        self.dropped = "hang" if hang else "raise"
+
+    def health(self):
+        return f"{self.battery} / {self.lua_kb}"
+
+    async def send_lua(self, string, await_print=False, **kwargs):
+        await asyncio.sleep(self.link_time(len(string.encode())))
+        if not await_print:
+            return None
+        # the snippets the scripts send: UploadManager's manifest read, and battery/memory
+        part = re.search(r"m:sub\((\d+),(\d+)\)", string)
+        if "upload_manifest.txt" in string and part:
+            manifest = ";".join(self.files.get("upload_manifest.txt", "").splitlines())
+            first, last = map(int, part.groups())
+            response = f"{len(manifest)}:{manifest[first - 1:last]}"
+        else:
+            response = self.health()
+        # a print goes back in one notification, so anything longer is lost
+        return response[:self.mtu]
+
+    async def upload_file_from_string(self, content, frame_file_name):
+        await asyncio.sleep(self.link_time(len(content.encode())))
+        self.files[frame_file_name] = content
+
+    async def print_short_text(self, text=""):
+        await asyncio.sleep(self.link_time(len(text.encode()) + 30))
+
+    async def upload_stdlua_libs(self, lib_names=("data",), minified=True):
+        for name in lib_names:
+            self.files[f"{name}.min.lua" if minified else f"{name}.lua"] = ""
+
+    async def upload_frame_app(self, local_filename, frame_filename="frame_app.lua"):
+        with open(local_filename) as f:
+            await self.upload_file_from_string(f.read(), frame_filename)
+
+    async def start_frame_app(self, frame_app_name="frame_app", await_print=True):
+        await asyncio.sleep(self.link_time(len(f"require('{frame_app_name}')")))
+        self.app_running = True
+        if self._print_handler is not None:
+            self._print_handler(self.ready_message)
+
+    async def stop_frame_app(self, reset=True):
+        await self._stop_mic()
+        self.app_running = False
+
+    def attach_print_response_handler(self, handler=print):
+        self._print_handler = handler
+
+    def detach_print_response_handler(self):
+        self._print_handler = None
+
+    def register_data_response_handler(self, subscriber, msg_codes, handler):
+        for code in msg_codes:
+            self._data_handlers.setdefault(code, []).append((subscriber, handler))
+
+    def unregister_data_response_handler(self, subscriber):
+        for code, handlers in self._data_handlers.items():
+            self._data_handlers[code] = [(s, h) for s, h in handlers if s is not subscriber]
+
+    def notify(self, data):
+        """Deliver a Frame-to-host data notification to the handlers registered for data[0]."""
+        for _, handler in self._data_handlers.get(data[0], []):
+            handler(data)
+
+    async def send_message(self, msg_code, payload, show_me=False):
+        if not 0 <= msg_code <= 255:
+            raise ValueError(f"Message code must be 0-255, got {msg_code}")
+        if len(payload) > 65535:
+            raise ValueError(f"Payload size {len(payload)} exceeds maximum 65535 bytes")
+        if self.dropped == "hang":
+            await asyncio.Event().wait()
+        elif self.dropped:
+            raise ConnectionError("Frame is out of range")
+        if self._sending:
+            # the send in flight takes the acknowledgement this one is waiting for
+            self.collisions += 1
+            await asyncio.sleep(self.link_time(len(payload)))
+            raise Exception("device didn't respond")
+        self._sending = True
+        try:
+            await asyncio.sleep(self.link_time(len(payload)))
+        finally:
+            self._sending = False
+        self.packets_sent += self.packets_for(len(payload))
+        self.bytes_sent += len(payload)
+        self.messages.append((msg_code, bytes(payload)))
+        del self.messages[:-self.keep_messages]
+
+        if msg_code == AUDIO_CTRL and payload:
+            if payload[0] == 1:
+                self._start_mic(bytes(payload))
+            else:
+                self._mic_stop_requested()
+        elif msg_code == HEALTH:
+            self.notify(bytes([HEALTH]) + self.health().encode())
+
+    def _start_mic(self, ctrl):
+        if self._mic_task is not None and not self._mic_task.done():
+            return
+        self._mic_stop = asyncio.Event()
+        self._mic_task = asyncio.create_task(self._stream_mic(ctrl))
+
+    def _mic_stop_requested(self):
+        if self._mic_stop is not None:
+            self._mic_stop.set()
+
+    async def _stop_mic(self):
+        self._mic_stop_requested()
+        if self._mic_task is not None:
+            await asyncio.gather(self._mic_task, return_exceptions=True)
+            self._mic_task = None
+
+    async def _stream_mic(self, ctrl):
+        # same format fields as lua/mic.lua reads after the start byte
+        rate, depth, encoding = 8000, 8, 0
+        if len(ctrl) >= 5:
+            rate, depth, encoding = struct.unpack_from(">HBB", ctrl, 1)
+        bytes_per_second = rate * (1 if encoding == 1 or depth == 8 else 2)
+        silence = b"\xff" if encoding == 1 else b"\x00"
+        audio = self.mic_audio(ctrl) if callable(self.mic_audio) else self.mic_audio
+
+        chunk_size = self.mtu - 1
+        chunk_s = chunk_size / bytes_per_second / self.mic_speed
+        position = 0
+        while not self._mic_stop.is_set():
+            try:
+                await asyncio.wait_for(self._mic_stop.wait(), chunk_s)
+            except asyncio.TimeoutError:
+                pass
+            chunk = audio[position:position + chunk_size]
+            position += len(chunk)
+            chunk += silence * (chunk_size - len(chunk))
+            self.mic_bytes += len(chunk)
+            self.notify(bytes([AUDIO_DATA_NON_FINAL]) + chunk)
+        self.notify(bytes([AUDIO_DATA_FINAL]))
@@ -0,0 +1,153 @@
+-- Main loop shared by the Frame apps: adaptive sleep, scheduled garbage collection,
+-- and loop/heap stats in the HEALTH reply (see frame_common/metrics.py)
+local data = require('data.min')
+
+local _M = {}
+
+-- Host to Frame request and Frame to Host reply flag, answered for every app
+local HEALTH = 0x31
+
+-- Seconds between passes. A pass that handled a message, saw part of one arriving or
+-- sent audio is followed by min_sleep; each idle pass after it doubles the sleep, up
+-- to active_sleep while the app has something under way (the mic) or max_sleep when
+-- it is waiting for the host. So the first packet after an idle spell waits at most
+-- max_sleep, and the rest of the message comes in at min_sleep.
+_M.min_sleep = 0.001
+_M.active_sleep = 0.005
+_M.max_sleep = 0.05
+
+-- A full collection once the work has stopped, at most every gc_interval seconds of
+-- sleep, or straight away once the heap has grown gc_kb since the last one (a sprite
+-- is up to 64 KB); Lua's incremental collector keeps up in between
+_M.gc_interval = 1.0
+_M.gc_kb = 16
+
+local stats = { passes = 0, busy = 0, slept = 0, gc = 0, peak_kb = 0 }
+local since_gc = 0
+local dirty = false
+local collected_kb = collectgarbage('count')
+
+data.parsers[HEALTH] = function(raw)
+	return true
+end
+
+-- Send a message to the host, for replies like HEALTH's
+local function send(msg)
+	while true do
+		-- If the Bluetooth is busy, this simply tries again until it gets through
+		if (pcall(frame.bluetooth.send, msg)) then
+			break
+		end
+	end
+end
+
+_M.send = send
+
+function _M.collect()
+	collectgarbage('collect')
+	collected_kb = collectgarbage('count')
+	stats.gc = stats.gc + 1
+	since_gc = 0
+	dirty = false
+end
+
+-- Collect now if the heap has grown by gc_kb, and keep track of its peak
+local function check_heap()
+	local kb = collectgarbage('count')
+	if kb > stats.peak_kb then
+		stats.peak_kb = kb
+	end
+	if kb > collected_kb + _M.gc_kb then
+		_M.collect()
+	end
+end
+
+-- Counters since the app started, as metrics.parse_loop_stats() reads them
+function _M.stats()
+	return string.format('passes=%d busy=%d slept=%.3f gc=%d peak=%.1f',
+		stats.passes, stats.busy, stats.slept, stats.gc, stats.peak_kb)
+end
+
+-- "<battery> / <heap KB> / <loop stats>" behind the HEALTH flag
+local function send_health()
+	send(string.char(HEALTH) .. frame.battery_level() .. ' / ' .. collectgarbage('count') .. ' / ' .. _M.stats())
+end
+
+-- True while a message sent in several packets is partly received
+local function receiving()
+	for _, item in pairs(data.app_data_accum) do
+		if item.num_chunks ~= nil and item.num_chunks > 0 then
+			return true
+		end
+	end
+	return false
+end
+
+-- data.process_raw_items() without the full collection it runs on every call,
+-- which was most of the work of an idle pass
+local function process_raw_items()
+	local processed = 0
+	for flag, block in pairs(data.app_data_block) do
+		if data.parsers[flag] == nil then
+			print('Error: No parser for flag: ' .. tostring(flag))
+		else
+			data.app_data[flag] = data.parsers[flag](block, data.app_data[flag])
+			processed = processed + 1
+		end
+		data.app_data_block[flag] = nil
+	end
+	return processed
+end
+
+-- Run the app until on_error returns true. Every pass, new messages are parsed into
+-- data.app_data and step(items_ready) is called; it returns busy (it drew something
+-- or sent audio) and active (something needs polling soon even if this pass was idle).
+-- on_error(err) gets anything step() raised, including the break signal.
+function _M.run(step, on_error)
+	local sleep = _M.min_sleep
+
+	-- one pass, made once rather than as a new closure for every pcall
+	local function pass()
+		local items_ready = 0
+		if next(data.app_data_block) ~= nil then
+			check_heap()
+			items_ready = process_raw_items()
+		end
+
+		if data.app_data[HEALTH] ~= nil then
+			data.app_data[HEALTH] = nil
+			send_health()
+		end
+
+		local busy, active = step(items_ready)
+
+		stats.passes = stats.passes + 1
+		if items_ready > 0 or busy or receiving() then
+			stats.busy = stats.busy + 1
+			dirty = true
+			sleep = _M.min_sleep
+		else
+			-- nothing happened: a good time to clean up after the last burst of work
+			if dirty and since_gc >= _M.gc_interval then
+				_M.collect()
+			end
+			sleep = math.min(sleep * 2, active and _M.active_sleep or _M.max_sleep)
+		end
+		check_heap()
+
+		frame.sleep(sleep)
+		stats.slept = stats.slept + sleep
+		since_gc = since_gc + sleep
+	end
+
+	-- start from what the app keeps, without the garbage of loading it
+	_M.collect()
+	while true do
+		local ok, err = pcall(pass)
+		if not ok and on_error(err) then
+			break
+		end
+	end
+end
+
+return _M
@@ -0,0 +1,74 @@
+local data = require('data.min')
+local sprite = require('sprite.min')
+local plain_text = require('plain_text.min')
+local runtime = require('runtime')
+
+-- Phone to Frame flags
+USER_TEXT = 0x0a
+CLEAR_MSG = 0x10
+USER_SPRITE = 0x20
+
+-- register the message parsers so they are automatically called when matching data comes in
+data.parsers[USER_TEXT] = plain_text.parse_plain_text
+data.parsers[CLEAR_MSG] = function(raw) return true end
+data.parsers[USER_SPRITE] = sprite.parse_sprite
+
+-- Combined app kept running by the session daemon: shows text and sprites for any client
+function app_loop()
+	frame.display.text('Frame Session Ready', 1, 1)
+	frame.display.show()
+
+	-- tell the host program that the frameside app is ready (waiting on await_print)
+	print('Frame app is running')
+
+	runtime.run(
+		function(items_ready)
+			if data.app_data[CLEAR_MSG] ~= nil then
+				frame.display.text(' ', 1, 1)
+				frame.display.show()
+				data.app_data[CLEAR_MSG] = nil
+			end
+
+			if data.app_data[USER_TEXT] ~= nil then
+				local txt = data.app_data[USER_TEXT]
+
+				-- one display.text() call per line, the firmware doesn't wrap
+				local y = txt.y
+				for line in string.gmatch(txt.string, '[^\n]+') do
+					frame.display.text(line, txt.x, y, {color = txt.color, spacing = txt.spacing})
+					y = y + 60
+				end
+				frame.display.show()
+
+				data.app_data[USER_TEXT] = nil
+			end
+
+			if data.app_data[USER_SPRITE] ~= nil then
+				local spr = data.app_data[USER_SPRITE]
+
+				-- set the palette in case it's different to the standard palette
+				sprite.set_palette(spr.num_colors, spr.palette_data)
+
+				-- show the sprite
+				frame.display.bitmap(1, 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
+				frame.display.show()
+
+				-- drop the sprite; runtime.lua collects it on its schedule
+				data.app_data[USER_SPRITE] = nil
+			end
+
+			return items_ready > 0
+		end,
+		-- Catch an error (including the break signal) here
+		function(err)
+			-- send the error back on the stdout stream and clear the display
+			print(err)
+			frame.display.text(' ', 1, 1)
+			frame.display.show()
+			return true
+		end
+	)
+end
+
+-- run the main app loop
+app_loop()
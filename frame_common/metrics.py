@@ -0,0 +1,316 @@
+"""
+Per-stage latency histograms and Frame health gauges, exported for long field sessions.
+
+Stages (capture, ble_drain, wav, asr, translate, display, ...) call
+metrics.observe(stage, seconds) or wrap work in `with metrics.time(stage):`; observe()
+is thread-safe, so backend calls running in an executor can record from their thread.
+HealthPoller asks Frame for its battery level and Lua heap size every `interval`
+seconds and records them as gauges, along with the main loop's passes, sleep and
+garbage collections when the app runs on frame_common/lua/runtime.lua.
+
+Two exports, both optional:
+
+  jsonl_path       one JSON object per observation or health sample, appended as it
+                   happens, for replaying a whole session afterwards
+                   {"ts": 1712345678.1, "stage": "asr", "seconds": 0.84}
+                   {"ts": 1712345680.0, "battery": 87.0, "lua_kb": 24.6}
+                   {"ts": 1712345680.0, "loop": {"passes": 5210.0, "busy": 312.0, ...}}
+  prometheus_path  the current histograms and gauges in Prometheus text format,
+                   rewritten atomically by flush(), e.g. for node_exporter's textfile
+                   collector to scrape
+"""
+import asyncio
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# seconds; BLE transfers and cloud ASR/translate calls span milliseconds to tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# what the scripts print at startup: "<battery %> / <Lua heap KB>"
+HEALTH_LUA = 'print(frame.battery_level() .. " / " .. collectgarbage("count"))'
+
+# a running Frame app can't take send_lua(), so it answers a HEALTH_REQUEST message
+# with the same string behind a HEALTH_DATA flag byte on the data channel; runtime.lua
+# adds its loop counters as a third field:
+#   "87 / 24.6 / passes=5210 busy=312 slept=58.210 gc=41 peak=52.3"
+HEALTH_REQUEST = 0x31
+HEALTH_DATA = 0x31
+
+
+def parse_health(response):
+    """(battery percent, Lua heap KB) from a HEALTH_LUA style "87 / 24.6" response."""
+    battery, lua_kb = str(response).split("/")[:2]
+    return float(battery), float(lua_kb)
+
+
+def parse_loop_stats(response):
+    """runtime.lua's counters from a health response, {} if the app doesn't send them."""
+    fields = str(response).split("/", 2)
+    if len(fields) < 3:
+        return {}
+    stats = {}
+    for item in fields[2].split():
+        name, _, value = item.partition("=")
+        if value:
+            stats[name] = float(value)
+    return stats
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as Prometheus expects it."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.max
+                low = self.buckets[i - 1] if i else 0.0
+                return min(low + (self.buckets[i] - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def cumulative(self):
+        """(upper bound, count of observations <= it) pairs, ending with +Inf."""
+        total, out = 0, []
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+
+class Metrics:
+    """Stage histograms and device gauges for one session, with JSONL/Prometheus export."""
+
+    def __init__(self, jsonl_path=None, prometheus_path=None, prefix="frame", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.histograms = {}
+        self.gauges = {}
+        self.listeners = []      # callables given (stage, seconds) for every observation
+        # both files are only created once there is something to write to them
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self._jsonl = None
+        self._lock = threading.Lock()
+        self._last_loop = None
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            self._log({"stage": stage, "seconds": round(seconds, 6)})
+        for listener in self.listeners:
+            listener(stage, seconds)
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def record_health(self, battery, lua_kb):
+        with self._lock:
+            self.gauges["battery_percent"] = battery
+            self.gauges["lua_heap_kb"] = lua_kb
+            self._log({"battery": battery, "lua_kb": lua_kb})
+
+    def record_loop(self, stats, now=None):
+        """
+        Gauges from runtime.lua's counters: passes per second, share of the time spent
+        asleep and collections per minute since the previous sample, and the peak heap.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last = self._last_loop
+            self._last_loop = (now, stats)
+            self.gauges["lua_heap_peak_kb"] = stats["peak"]
+            # the counters start over when the app is restarted
+            if last is not None and now > last[0] and stats["passes"] >= last[1]["passes"]:
+                elapsed = now - last[0]
+                self.gauges["lua_loop_passes_per_second"] = (stats["passes"] - last[1]["passes"]) / elapsed
+                self.gauges["lua_loop_sleep_ratio"] = min(1.0, (stats["slept"] - last[1]["slept"]) / elapsed)
+                self.gauges["lua_gc_per_minute"] = (stats["gc"] - last[1]["gc"]) * 60 / elapsed
+            self._log({"loop": stats})
+
+    def _log(self, entry):
+        if self.jsonl_path is None:
+            return
+        if self._jsonl is None:
+            self._jsonl = open(self.jsonl_path, "a", buffering=1)
+        self._jsonl.write(json.dumps({"ts": round(time.time(), 3), **entry}) + "\n")
+
+    def prometheus(self):
+        """The current metrics in Prometheus text exposition format."""
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent in each stage.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                for bound, count in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for gauge, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {self.prefix}_{gauge} gauge")
+                lines.append(f"{self.prefix}_{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Rewrite the Prometheus file (temp file + rename, so scrapers never see half of it)."""
+        if self.prometheus_path is None or not (self.histograms or self.gauges):
+            return
+        tmp_file = self.prometheus_path.with_suffix(f".tmp{os.getpid()}")
+        tmp_file.write_text(self.prometheus())
+        os.replace(tmp_file, self.prometheus_path)
+
+    def report(self):
+        """Per-stage summary lines, plus the last health sample."""
+        with self._lock:
+            lines = [f"{stage:<12} n={h.count:<4} mean={h.mean * 1000:7.0f}ms "
+                     f"p50={h.quantile(0.5) * 1000:7.0f}ms p95={h.quantile(0.95) * 1000:7.0f}ms "
+                     f"max={h.max * 1000:7.0f}ms"
+                     for stage, h in self.histograms.items()]
+            if "battery_percent" in self.gauges:
+                lines.append(f"{'health':<12} battery={self.gauges['battery_percent']:.0f}% "
+                             f"lua={self.gauges['lua_heap_kb']:.1f}KB")
+            if "lua_loop_passes_per_second" in self.gauges:
+                lines.append(f"{'frame loop':<12} {self.gauges['lua_loop_passes_per_second']:.0f} passes/s "
+                             f"asleep={self.gauges['lua_loop_sleep_ratio']:.0%} "
+                             f"gc={self.gauges['lua_gc_per_minute']:.1f}/min "
+                             f"peak={self.gauges['lua_heap_peak_kb']:.1f}KB")
+        return lines
+
+    def close(self):
+        self.flush()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+class HealthPoller:
+    """
+    Records Frame's battery and Lua heap every `interval` seconds, and flushes the
+    Prometheus file on the same tick.
+
+    query() is an async callable returning a "battery / heap KB" string: a
+    HealthRequest for a running Frame app, or send_lua/run_lua(HEALTH_LUA, await_print=True)
+    when no app loop is running. start() polls in the background; a caller that can't
+    share the link with a background query calls poll_if_due() between its own sends.
+    """
+
+    def __init__(self, query, metrics, interval=30.0, timeout=5.0):
+        self.query = query
+        self.metrics = metrics
+        self.interval = interval
+        self.timeout = timeout
+        self.failures = 0
+        self._last_poll = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def poll(self):
+        """Take one health sample; returns (battery, lua_kb) or None if Frame didn't answer."""
+        self._last_poll = time.monotonic()
+        try:
+            response = await asyncio.wait_for(self.query(), self.timeout)
+            battery, lua_kb = parse_health(response)
+        except asyncio.TimeoutError:
+            self.failures += 1
+            print(f"⚠️  Health poll timed out after {self.timeout}s")
+            return None
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️  Health poll failed: {e}")
+            return None
+        self.metrics.record_health(battery, lua_kb)
+        stats = parse_loop_stats(response)
+        if stats:
+            self.metrics.record_loop(stats)
+        return battery, lua_kb
+
+    async def poll_if_due(self):
+        """Poll and flush the Prometheus file if `interval` has passed since the last poll."""
+        if self._last_poll is not None and time.monotonic() - self._last_poll < self.interval:
+            return None
+        sample = await self.poll()
+        self.metrics.flush()
+        return sample
+
+    async def _run(self):
+        while True:
+            await self.poll_if_due()
+            await asyncio.sleep(self.interval)
+
+
+class HealthRequest:
+    """
+    HealthPoller query for a running Frame app: sends HEALTH_REQUEST and waits for the
+    app's HEALTH_DATA reply. attach() once the frame is connected, detach() at the end.
+    """
+
+    def __init__(self, frame, request_code=HEALTH_REQUEST, response_flag=HEALTH_DATA):
+        self.frame = frame
+        self.request_code = request_code
+        self.response_flag = response_flag
+        self._reply = None
+
+    def attach(self):
+        self.frame.register_data_response_handler(self, [self.response_flag], self._handle)
+        return self
+
+    def detach(self):
+        self.frame.unregister_data_response_handler(self)
+
+    def _handle(self, data):
+        if self._reply is not None and not self._reply.done():
+            self._reply.set_result(bytes(data[1:]).decode(errors="replace"))
+
+    async def __call__(self):
+        self._reply = asyncio.get_running_loop().create_future()
+        await self.frame.send_message(self.request_code, bytes([1]))
+        return await self._reply
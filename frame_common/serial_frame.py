@@ -0,0 +1,36 @@
+"""
+One outbound message at a time on a FrameMsg shared by several tasks.
+
+frame_ble waits for each packet's acknowledgement with a single flag and a single
+queue, so two send_message() calls that overlap (the display, the mic start/stop and
+the health poller each run in their own task) can take each other's ACK, and one of
+them fails with "device didn't respond". SerialFrame puts every send behind one
+asyncio.Lock; everything else is passed straight through.
+
+    frame = SerialFrame(FrameMsg())
+    display = ProgressiveDisplay(frame.send_message, ...)   # safe next to the mic and health tasks
+"""
+import asyncio
+
+
+class SerialFrame:
+    """Wraps a FrameMsg so send_message, send_lua and uploads never overlap."""
+
+    def __init__(self, frame):
+        self._frame = frame
+        self.lock = asyncio.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self._frame, name)
+
+    async def send_message(self, msg_code, payload, *args, **kwargs):
+        async with self.lock:
+            return await self._frame.send_message(msg_code, payload, *args, **kwargs)
+
+    async def send_lua(self, string, *args, **kwargs):
+        async with self.lock:
+            return await self._frame.send_lua(string, *args, **kwargs)
+
+    async def upload_file_from_string(self, content, frame_file_name):
+        async with self.lock:
+            return await self._frame.upload_file_from_string(content, frame_file_name)
@@ -0,0 +1,75 @@
+"""
+Sends jobs to a running session_daemon.py instead of opening a new Frame connection.
+
+Usage:
+    python session_client.py text "I am Saad"
+    python session_client.py sprite ../image_display/images/koala.jpg
+    python session_client.py translate "¿Dónde está la estación?" --target en
+    python session_client.py clear
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.session_daemon import SOCKET_PATH
+
+
+class SessionClient:
+    """Keeps one socket open to the daemon; jobs are sent and answered in order."""
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket_path = socket_path
+        self._reader = None
+        self._writer = None
+
+    async def __aenter__(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def request(self, job):
+        self._writer.write(json.dumps(job).encode() + b"\n")
+        await self._writer.drain()
+        return json.loads(await self._reader.readline())
+
+    async def show_text(self, text, x=1, y=1):
+        return await self.request({"job": "text", "text": text, "x": x, "y": y})
+
+    async def show_sprite(self, path):
+        # the daemon reads the file itself, so pass an absolute path
+        return await self.request({"job": "sprite", "path": str(Path(path).resolve())})
+
+    async def translate(self, text, target="en"):
+        return await self.request({"job": "translate", "text": text, "target": target})
+
+    async def clear(self):
+        return await self.request({"job": "clear"})
+
+
+async def main(args):
+    async with SessionClient(args.socket) as client:
+        if args.job == "text":
+            reply = await client.show_text(args.value)
+        elif args.job == "sprite":
+            reply = await client.show_sprite(args.value)
+        elif args.job == "translate":
+            reply = await client.translate(args.value, args.target)
+        else:
+            reply = await client.clear()
+    print(reply)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a job to the Frame session daemon")
+    parser.add_argument("job", choices=["text", "sprite", "translate", "clear"])
+    parser.add_argument("value", nargs="?", default="", help="text to show/translate, or image path")
+    parser.add_argument("--target", default="en", help="target language for translate jobs")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,206 @@
+"""
+Long-lived Frame session shared by the display, image and translation tools.
+
+Every app script used to connect, upload its Lua, start the frame app, do one thing,
+then stop_frame_app() (which reboots Frame) and disconnect, so each job paid the full
+BLE connect and Lua boot cost. The session daemon owns one FrameMsg connection, keeps
+lua/session_frame_app.lua running, and takes jobs from local clients over a Unix socket.
+
+Protocol: one JSON object per line in each direction.
+    {"job": "text", "text": "Hello", "x": 1, "y": 1}
+    {"job": "sprite", "path": "image_display/images/koala.jpg"}
+    {"job": "sprite", "packed": "<base64 of TxSprite.pack()>"}
+    {"job": "translate", "text": "hola", "target": "en"}
+    {"job": "clear"}
+    {"job": "ping"}
+Each reply is {"ok": true, "elapsed_ms": ..., ...} or {"ok": false, "error": "..."}.
+
+Usage: python session_daemon.py [--socket /tmp/frame_session.sock]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.text_layout import DISPLAY_WIDTH, wrap
+from frame_common.upload_manager import UploadManager
+
+SOCKET_PATH = "/tmp/frame_session.sock"
+APP_FILE = Path(__file__).resolve().parent / "lua" / "session_frame_app.lua"
+STDLUA_LIBS = ["data", "sprite", "plain_text"]
+
+# message codes understood by session_frame_app.lua
+USER_TEXT = 0x0a
+CLEAR_MSG = 0x10
+USER_SPRITE = 0x20
+
+
+class SessionDaemon:
+    """
+    Owns one Frame connection and runs jobs from socket clients one at a time.
+
+    frame_factory builds the transport (FrameMsg by default); anything with the same
+    connect/send_lua/send_message/... coroutines can stand in for it, so the daemon
+    can run against a simulated link without glasses.
+    """
+
+    def __init__(self, frame_factory=None, socket_path=SOCKET_PATH):
+        if frame_factory is None:
+            from frame_msg import FrameMsg
+            frame_factory = FrameMsg
+        self.frame_factory = frame_factory
+        self.socket_path = socket_path
+        self.frame = None
+        self.jobs_done = 0
+        self._lock = asyncio.Lock()
+        self._sprite_cache = None
+        self._translator = None
+        self._server = None
+
+    async def ensure_session(self):
+        """Connect and start the combined frame app, unless that's already done."""
+        if self.frame is not None and self.frame.is_connected():
+            return
+
+        self.frame = self.frame_factory()
+        await self.frame.connect()
+
+        uploads = UploadManager(self.frame)
+        await uploads.sync(stdlua_libs=STDLUA_LIBS, frame_app=APP_FILE)
+        print(f"📤 {uploads.report()}")
+
+        self.frame.attach_print_response_handler()
+        await self.frame.start_frame_app()
+        print("🚀 Frame session started")
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            # a socket nobody answers on was left behind by a daemon that died
+            try:
+                _, writer = await asyncio.open_unix_connection(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.socket_path)
+            else:
+                writer.close()
+                raise RuntimeError(f"a session daemon is already listening on {self.socket_path}")
+        await self.ensure_session()
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        print(f"👂 Listening on {self.socket_path}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        if self.frame is not None and self.frame.is_connected():
+            self.frame.detach_print_response_handler()
+            await self.frame.stop_frame_app()
+            await self.frame.disconnect()
+        # only remove the socket this daemon listened on, never another daemon's
+        if self._server is not None and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def run_job(self, job):
+        """Run one job dict and return the reply dict."""
+        start = time.perf_counter()
+        handler = getattr(self, f"_job_{job.get('job')}", None)
+        if handler is None:
+            return {"ok": False, "error": f"unknown job: {job.get('job')!r}"}
+
+        try:
+            # one BLE link: jobs take turns, and a dropped connection is re-made here
+            async with self._lock:
+                await self.ensure_session()
+                reply = await handler(job) or {}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+        self.jobs_done += 1
+        reply.update(ok=True, elapsed_ms=round((time.perf_counter() - start) * 1000, 1))
+        return reply
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    job = json.loads(line)
+                except json.JSONDecodeError as e:
+                    reply = {"ok": False, "error": f"bad request: {e}"}
+                else:
+                    reply = await self.run_job(job)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _job_ping(self, job):
+        return {"jobs_done": self.jobs_done}
+
+    async def _job_clear(self, job):
+        await self.frame.send_message(CLEAR_MSG, b"\x00")
+
+    async def _job_text(self, job):
+        from frame_msg import TxPlainText
+        x, y = job.get("x", 1), job.get("y", 1)
+        # session_frame_app.lua draws one line per "\n"; wrap to what fits right of x
+        lines = wrap(job["text"], width=DISPLAY_WIDTH - x)
+        text = TxPlainText(text="\n".join(lines), x=x, y=y)
+        await self.frame.send_message(USER_TEXT, text.pack())
+
+    async def _job_sprite(self, job):
+        if "packed" in job:
+            packed = base64.b64decode(job["packed"])
+        else:
+            # quantizing is the slow part, so it runs off the event loop
+            packed = await asyncio.to_thread(self._get_sprite_cache().packed_sprite, job["path"])
+        await self.frame.send_message(USER_SPRITE, packed)
+        return {"bytes": len(packed)}
+
+    async def _job_translate(self, job):
+        translated, detected = await asyncio.to_thread(
+            self._get_translator().translate, job["text"], job.get("target", "en"))
+        if not translated:
+            raise RuntimeError("translation failed")
+        await self._job_text({"text": translated})
+        return {"translated": translated, "detected": detected}
+
+    def _get_sprite_cache(self):
+        if self._sprite_cache is None:
+            # the on-disk sprite cache lives with the image display scripts
+            sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "image_display"))
+            from sprite_cache import SpriteCache
+            self._sprite_cache = SpriteCache()
+        return self._sprite_cache
+
+    def _get_translator(self):
+        if self._translator is None:
+            # the translation cache lives with the live translator scripts
+            sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "live_translation"))
+            from googletrans import Translator
+            from translation_cache import CachedTranslator, TranslationCache
+            self._translator = CachedTranslator(Translator(), TranslationCache())
+        return self._translator
+
+
+async def main(args):
+    daemon = SessionDaemon(socket_path=args.socket)
+    try:
+        await daemon.serve()
+    finally:
+        await daemon.close()
+        print(f"✅ Session closed after {daemon.jobs_done} jobs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep one Frame session open for local clients")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket to listen on")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,148 @@
+"""
+Pixel-accurate text wrapping and paging for the Frame display.
+
+Frame draws text in a proportional font and does no wrapping of its own, so layout
+has to happen on the host. Lines are measured with the font's glyph advance widths
+(plus the inter-character spacing Frame adds), wrapped at word boundaries to a box
+in display pixels and split into pages of as many lines as fit the box.
+
+wrap(), paginate() and tail() are memoized on (text, font, box): a translation
+that is shown again, or re-laid out while it is paged or scrolled, costs a dict
+lookup instead of a re-measure.
+
+Usage:
+    pages = paginate("a long translated paragraph ...")
+    for page in pages:
+        ...  # "\n"-separated lines that fit the display
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+DISPLAY_WIDTH = 640
+DISPLAY_HEIGHT = 400
+
+# A rectangle on the display, in pixels
+Box = namedtuple("Box", "x y width height")
+DISPLAY = Box(1, 1, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+# Advance widths of Frame's built-in font, from the frame-sdk font metrics
+_FRAME_WIDTHS = {
+    ' ': 13, '!': 5, '"': 13, '#': 19, '$': 17, '%': 34, '&': 20, "'": 5, '(': 10, ')': 11,
+    '*': 21, '+': 19, ',': 8, '-': 17, '.': 6, '0': 18, '1': 16, '2': 16, '3': 15, '4': 18,
+    '5': 15, '6': 17, '7': 15, '8': 18, '9': 17, ':': 6, ';': 8, '<': 19, '=': 19, '>': 19,
+    '?': 14, '@': 31, 'A': 22, 'B': 18, 'C': 16, 'D': 19, 'E': 17, 'F': 17, 'G': 18, 'H': 19,
+    'I': 12, 'J': 14, 'K': 19, 'L': 16, 'M': 23, 'N': 19, 'O': 20, 'P': 18, 'Q': 22, 'R': 20,
+    'S': 17, 'T': 20, 'U': 19, 'V': 21, 'W': 23, 'X': 21, 'Y': 23, 'Z': 17, '[': 9, '\\': 15,
+    ']': 10, '^': 20, '_': 25, '`': 11, 'a': 19, 'b': 18, 'c': 13, 'd': 18, 'e': 16, 'f': 15,
+    'g': 20, 'h': 18, 'i': 5, 'j': 11, 'k': 18, 'l': 8, 'm': 28, 'n': 18, 'o': 18, 'p': 18,
+    'q': 18, 'r': 11, 's': 15, 't': 14, 'u': 17, 'v': 19, 'w': 30, 'x': 20, 'y': 20, 'z': 16,
+    '{': 12, '|': 5, '}': 12, '~': 17, '¡': 6, '¢': 14, '£': 18, '¥': 22, '©': 28, '«': 17,
+    '®': 29, '°': 15, '±': 20, 'µ': 17, '·': 6, '»': 17, '¿': 14, 'À': 22, 'Á': 23, 'Â': 23,
+    'Ã': 23, 'Ä': 23, 'Å': 23, 'Æ': 32, 'Ç': 16, 'È': 17, 'É': 16, 'Ê': 17, 'Ë': 17, 'Ì': 12,
+    'Í': 11, 'Î': 16, 'Ï': 15, 'Ð': 22, 'Ñ': 19, 'Ò': 20, 'Ó': 20, 'Ô': 20, 'Õ': 20, 'Ö': 20,
+    '×': 18, 'Ø': 20, 'Ù': 19, 'Ú': 19, 'Û': 19, 'Ü': 19, 'Ý': 22, 'Þ': 18, 'ß': 19, 'à': 19,
+    'á': 19, 'â': 19, 'ã': 19, 'ä': 19, 'å': 19, 'æ': 29, 'ç': 14, 'è': 17, 'é': 16, 'ê': 17,
+    'ë': 17, 'ì': 11, 'í': 11, 'î': 16, 'ï': 15, 'ð': 18, 'ñ': 16, 'ò': 18, 'ó': 18, 'ô': 18,
+    'õ': 17, 'ö': 18, '÷': 19, 'ø': 18, 'ù': 17, 'ú': 17, 'û': 16, 'ü': 17, 'ý': 20, 'þ': 18,
+    'ÿ': 20, 'ı': 5, 'Ł': 19, 'ł': 10, 'Œ': 30, 'œ': 30, 'Š': 17, 'š': 15, 'Ÿ': 22, 'Ž': 18,
+    'ž': 17, 'ƒ': 16, '€': 18,
+}
+
+
+class Font:
+    """Glyph widths and line metrics for one Frame font."""
+
+    def __init__(self, name, widths, default_width=25, spacing=4, line_height=60):
+        self.name = name
+        self.widths = widths
+        self.default_width = default_width
+        self.spacing = spacing
+        self.line_height = line_height
+
+    def char_width(self, char):
+        return self.widths.get(char, self.default_width) + self.spacing
+
+    def text_width(self, text):
+        widths, default, spacing = self.widths, self.default_width, self.spacing
+        return sum(widths.get(char, default) for char in text) + spacing * len(text)
+
+
+FONTS = {}
+
+
+def register_font(font):
+    """Make a font available to the layout functions by name."""
+    FONTS[font.name] = font
+    return font
+
+
+FRAME_FONT = register_font(Font("frame", _FRAME_WIDTHS))
+
+
+def can_render(text, font="frame"):
+    """True if the font has a glyph for every visible character of text."""
+    widths = FONTS[font].widths
+    return all(char in widths or char.isspace() for char in text)
+
+
+def _split_word(word, font, width):
+    # a word wider than the box is broken between characters
+    pieces, piece, piece_width = [], "", 0
+    for char in word:
+        char_width = font.char_width(char)
+        if piece and piece_width + char_width > width:
+            pieces.append(piece)
+            piece, piece_width = "", 0
+        piece += char
+        piece_width += char_width
+    pieces.append(piece)
+    return pieces
+
+
+@lru_cache(maxsize=512)
+def wrap(text, font="frame", width=DISPLAY_WIDTH):
+    """Lines of text, broken at spaces (and explicit newlines) to fit `width` pixels."""
+    metrics = FONTS[font]
+    space = metrics.char_width(" ")
+    lines = []
+    for paragraph in text.split("\n"):
+        line, line_width = [], 0
+        for word in paragraph.split():
+            word_width = metrics.text_width(word)
+            if word_width > width:
+                pieces = _split_word(word, metrics, width)
+                if line:
+                    lines.append(" ".join(line))
+                lines.extend(pieces[:-1])
+                line, line_width = [pieces[-1]], metrics.text_width(pieces[-1])
+            elif line and line_width + space + word_width > width:
+                lines.append(" ".join(line))
+                line, line_width = [word], word_width
+            else:
+                line_width += word_width + (space if line else 0)
+                line.append(word)
+        lines.append(" ".join(line))
+    return tuple(lines)
+
+
+def lines_per_page(font="frame", box=DISPLAY):
+    return max(1, box.height // FONTS[font].line_height)
+
+
+@lru_cache(maxsize=256)
+def paginate(text, font="frame", box=DISPLAY):
+    """Screen-sized pages, each a "\n"-separated string of lines that fit the box."""
+    lines = wrap(text, font, box.width)
+    per_page = lines_per_page(font, box)
+    return tuple("\n".join(lines[i:i + per_page]) for i in range(0, len(lines), per_page))
+
+
+@lru_cache(maxsize=256)
+def tail(text, font="frame", box=DISPLAY):
+    """The last screenful of text, for captions where the newest words matter most."""
+    lines = wrap(text, font, box.width)
+    return "\n".join(lines[-lines_per_page(font, box):])
+
+
+def cache_info():
+    return {fn.__name__: fn.cache_info() for fn in (wrap, paginate, tail)}
@@ -0,0 +1,252 @@
+"""
+Host-side text rendering for scripts Frame's built-in font can't draw.
+
+frame.display.text() only has glyphs for Latin text, so an Arabic, Urdu, Hebrew, CJK
+or Devanagari translation shows up as blanks. TextRasterizer draws the text with
+Pillow in a TrueType font instead, quantizes it to a 1 or 2 bpp palette and packs it
+in the TxSprite format that sprite.min's parse_sprite() and frame.display.bitmap()
+understand.
+
+Two caches keep this cheap enough to do per caption:
+
+  glyph atlas   each character is rasterized once per font and size; lines of
+                unshaped scripts (Latin, Cyrillic, Greek, CJK, Hebrew) are composed
+                by copying glyphs out of the atlas
+  line cache    whole rendered lines (already quantized) in an LRU, so a repeated
+                phrase or a caption that only grows at the end re-renders nothing
+                but its last line
+
+Scripts whose letters change shape with their neighbours (Arabic, Urdu, Indic) are
+rendered a line at a time with Pillow's text layout, which needs Pillow built with
+libraqm for correct joining and right-to-left order; those lines still go through
+the line cache.
+"""
+import struct
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, features
+
+DISPLAY_WIDTH = 640
+DISPLAY_HEIGHT = 400
+
+# Pillow looks this up in the system font directories; use e.g. NotoSansCJK-Regular.ttc
+# for Chinese/Japanese/Korean or NotoNaskhArabic-Regular.ttf for Arabic and Urdu
+DEFAULT_FONT = "DejaVuSans.ttf"
+
+# Unicode ranges that need contextual shaping rather than glyph-by-glyph layout
+_SHAPED_RANGES = [
+    (0x0600, 0x06FF), (0x0750, 0x077F), (0x08A0, 0x08FF),   # Arabic, Urdu, Persian
+    (0xFB50, 0xFDFF), (0xFE70, 0xFEFF),                      # Arabic presentation forms
+    (0x0900, 0x0DFF),                                        # Devanagari ... Sinhala
+]
+
+# scripts written without spaces, where a line may break between any two characters
+_UNSPACED_RANGES = [
+    (0x3000, 0x30FF),                                        # CJK punctuation, kana
+    (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF),   # CJK ideographs
+    (0xFF00, 0xFFEF),                                        # fullwidth forms
+]
+
+
+def needs_shaping(text):
+    return any(lo <= ord(char) <= hi for char in text for lo, hi in _SHAPED_RANGES)
+
+
+def breaks_anywhere(char):
+    return any(lo <= ord(char) <= hi for lo, hi in _UNSPACED_RANGES)
+
+
+def is_rtl(text):
+    return any(unicodedata.bidirectional(char) in ("R", "AL") for char in text)
+
+
+def pack_sprite(pixels, num_colors, palette):
+    """
+    Pack a 2D array of palette indices like TxSprite.pack() does (uncompressed),
+    but with numpy instead of a per-pixel loop.
+    """
+    height, width = pixels.shape
+    flat = pixels.reshape(-1)
+    if num_colors <= 2:
+        bpp, packed = 1, np.packbits(flat)
+    else:
+        bpp = 2
+        flat = np.concatenate([flat, np.zeros(-len(flat) % 4, dtype=np.uint8)]).reshape(-1, 4)
+        packed = (flat[:, 0] << 6) | (flat[:, 1] << 4) | (flat[:, 2] << 2) | flat[:, 3]
+    return struct.pack(">HHBBB", width, height, 0, bpp, num_colors) + bytes(palette) + packed.tobytes()
+
+
+class TextRasterizer:
+    """
+    Renders text to packed 1-2 bpp sprites with a glyph atlas and an LRU of rendered lines.
+
+    bpp=1 gives hard-edged text in half the bytes; bpp=2 keeps two levels of antialiasing.
+    """
+
+    def __init__(self, font_path=DEFAULT_FONT, size=36, bpp=1, color=(255, 255, 255),
+                 width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, line_cache_size=128):
+        if bpp not in (1, 2):
+            raise ValueError(f"bpp must be 1 or 2, got {bpp}")
+        self.font = ImageFont.truetype(str(font_path), size)
+        self.bpp = bpp
+        self.num_colors = 2 ** bpp
+        self.width = width
+        self.height = height
+        ascent, descent = self.font.getmetrics()
+        self.ascent = ascent
+        self.line_height = ascent + descent
+        self.lines_per_page = max(1, height // self.line_height)
+
+        # black (transparent on Frame), the text colour, then the antialiasing levels:
+        # sprite.set_palette() reassigns Frame's named colours in palette order, and
+        # index 1 is the WHITE that display.text() keeps drawing with afterwards
+        levels = np.linspace(0, 1, self.num_colors)
+        order = [0, self.num_colors - 1] + list(range(1, self.num_colors - 1))
+        self.palette = bytes(int(round(c * levels[i])) for i in order for c in color)
+        self._level_index = np.argsort(order).astype(np.uint8)
+
+        self.atlas = {}
+        self.line_cache = OrderedDict()
+        self.line_cache_size = line_cache_size
+        self.hits = 0
+        self.misses = 0
+        self._raqm = features.check("raqm")
+        self._warned = False
+
+    def clear(self):
+        self.atlas.clear()
+        self.line_cache.clear()
+
+    def stats(self):
+        return {"glyphs": len(self.atlas), "lines": len(self.line_cache),
+                "hits": self.hits, "misses": self.misses}
+
+    def text_width(self, text):
+        return self.font.getlength(text)
+
+    def wrap(self, text):
+        """
+        Lines of text broken at spaces to fit the sprite width; Chinese and Japanese
+        break between characters, and a word wider than the sprite between glyphs.
+        """
+        lines = []
+        for paragraph in text.split("\n"):
+            line = ""
+            for word in paragraph.split():
+                for i, piece in enumerate(self._break_word(word)):
+                    candidate = f"{line} {piece}" if line and i == 0 else line + piece
+                    if line and self.text_width(candidate) > self.width:
+                        lines.append(line)
+                        line = piece
+                    else:
+                        line = candidate
+            lines.append(line)
+        return lines
+
+    def _break_word(self, word):
+        # the places a line may break inside a word: before each CJK character, except
+        # closing punctuation, which stays with the character before it
+        pieces = []
+        for char in word:
+            closing = unicodedata.category(char) in ("Po", "Pe", "Pf")
+            if pieces and (closing or not (breaks_anywhere(char) or breaks_anywhere(pieces[-1][-1]))):
+                pieces[-1] += char
+            else:
+                pieces.append(char)
+        # a piece still wider than the sprite is broken between glyphs
+        fitted = []
+        for piece in pieces:
+            part = ""
+            for char in piece:
+                if part and self.text_width(part + char) > self.width:
+                    fitted.append(part)
+                    part = ""
+                part += char
+            fitted.append(part)
+        return fitted
+
+    def render_line(self, line):
+        """One line as a 2D array of palette indices, from the line cache if possible."""
+        cached = self.line_cache.get(line)
+        if cached is not None:
+            self.line_cache.move_to_end(line)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        if needs_shaping(line):
+            coverage = self._shape_line(line)
+        else:
+            coverage = self._compose_line(line[::-1] if is_rtl(line) else line)
+        pixels = self._quantize(coverage)
+
+        self.line_cache[line] = pixels
+        if len(self.line_cache) > self.line_cache_size:
+            self.line_cache.popitem(last=False)
+        return pixels
+
+    def render(self, text):
+        """The last screenful of wrapped text as a 2D array of palette indices."""
+        lines = self.wrap(text)[-self.lines_per_page:]
+        rendered = [self.render_line(line) for line in lines]
+        width = max(1, max(pixels.shape[1] for pixels in rendered))
+        page = np.zeros((self.line_height * len(rendered), width), dtype=np.uint8)
+        for i, pixels in enumerate(rendered):
+            # right-to-left lines are aligned to the right edge
+            x = width - pixels.shape[1] if is_rtl(lines[i]) else 0
+            page[i * self.line_height:(i + 1) * self.line_height, x:x + pixels.shape[1]] = pixels
+        return page
+
+    def pack(self, text):
+        """Packed TxSprite bytes for text, ready for frame.send_message()."""
+        return pack_sprite(self.render(text), self.num_colors, self.palette)
+
+    def sprite(self, text):
+        from frame_msg import TxSprite
+        page = self.render(text)
+        return TxSprite(width=page.shape[1], height=page.shape[0], num_colors=self.num_colors,
+                        palette_data=self.palette, pixel_data=page.tobytes())
+
+    def _glyph(self, char):
+        glyph = self.atlas.get(char)
+        if glyph is None:
+            left, top, right, bottom = self.font.getbbox(char, anchor="la")
+            image = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+            ImageDraw.Draw(image).text((-left, -top), char, font=self.font, fill=255, anchor="la")
+            glyph = (np.asarray(image), left, top, self.font.getlength(char))
+            self.atlas[char] = glyph
+        return glyph
+
+    def _compose_line(self, line):
+        width = int(np.ceil(self.text_width(line))) or 1
+        coverage = np.zeros((self.line_height, width + 2), dtype=np.uint8)
+        x = 0.0
+        for char in line:
+            bitmap, left, top, advance = self._glyph(char)
+            if char != " ":
+                h, w = bitmap.shape
+                x0, y0 = max(0, int(round(x + left))), max(0, top)
+                region = coverage[y0:y0 + h, x0:x0 + w]
+                np.maximum(region, bitmap[:region.shape[0], :region.shape[1]], out=region)
+            x += advance
+        return coverage[:, :width]
+
+    def _shape_line(self, line):
+        if not self._raqm and not self._warned:
+            print("⚠️  Pillow has no libraqm: joined scripts will render unshaped")
+            self._warned = True
+        direction = "rtl" if is_rtl(line) and self._raqm else None
+        if direction is None and is_rtl(line):
+            line = line[::-1]
+        width = int(np.ceil(self.font.getlength(line, direction=direction))) or 1
+        image = Image.new("L", (width, self.line_height))
+        ImageDraw.Draw(image).text((0, 0), line, font=self.font, fill=255, anchor="la",
+                                   direction=direction)
+        return np.asarray(image)
+
+    def _quantize(self, coverage):
+        # 0-255 coverage to levels 0..num_colors-1, then to their palette indices
+        levels = (coverage.astype(np.uint16) * (self.num_colors - 1) + 127) // 255
+        return self._level_index[levels]
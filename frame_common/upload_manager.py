@@ -0,0 +1,132 @@
+"""
+Skips re-uploading Lua libraries and apps that are already on the glasses.
+
+Uploading a file over BLE means one send_lua() round trip per ~220 bytes, so sending
+data.min.lua, sprite.min.lua, audio.min.lua and the frame app on every connect is most
+of the startup time. UploadManager keeps a manifest of content hashes on Frame's
+filesystem, reads it back with send_lua(..., await_print=True) a print-sized part at
+a time, and only uploads files whose hash differs from the local copy.
+"""
+import hashlib
+import time
+from importlib.resources import files
+from pathlib import Path
+
+MANIFEST_FILE = "upload_manifest.txt"
+
+# the main loop every Frame app in this repo require()s; sync() always sends it
+RUNTIME_LUA = Path(__file__).resolve().parent / "lua" / "runtime.lua"
+
+# characters of the manifest per print; a print longer than one BLE packet is cut short
+MANIFEST_PART = 200
+
+
+def _read_manifest_lua(first, last):
+    # the manifest is one entry per line; Frame prints "<length>:<characters first..last>"
+    # of the entries joined by ';', so "0:" when there is no manifest yet
+    return (
+        "local ok,m=pcall(function() local f=frame.file.open('" + MANIFEST_FILE + "','read') "
+        "local t={} for l in f.read,f do t[#t+1]=l end f:close() return table.concat(t,';') end) "
+        f"m=ok and m or '' print(#m..':'..m:sub({first},{last}))"
+    )
+
+
+def content_hash(content):
+    """Short hash of a file's text, to keep the manifest short."""
+    return hashlib.sha256(content.replace("\r", "").encode()).hexdigest()[:12]
+
+
+def stdlua_source(lib_name, minified=True):
+    """Source of a frame-msg standard Lua library, as upload_stdlua_libs() would send it."""
+    suffix = ".min" if minified else ""
+    filename = f"{lib_name}{suffix}.lua"
+    return filename, files("frame_msg").joinpath(f"lua/{filename}").read_text()
+
+
+class UploadManager:
+    """
+    Uploads Lua files to Frame only when the copy on the device is out of date.
+
+    Usage:
+        uploads = UploadManager(frame)
+        await uploads.sync(stdlua_libs=['data', 'sprite'], frame_app="lua/sprite_frame_app.lua")
+        print(uploads.report())
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.uploaded = []
+        self.skipped = []
+        self.timings = {}
+
+    async def read_manifest(self):
+        """{device filename: hash} as last recorded on Frame (empty if never synced)."""
+        start = time.perf_counter()
+        text, length = "", None
+        # one send_lua() per MANIFEST_PART characters, so a long manifest isn't truncated
+        while length is None or len(text) < length:
+            response = await self.frame.send_lua(
+                _read_manifest_lua(len(text) + 1, len(text) + MANIFEST_PART), await_print=True)
+            size, _, part = (response or "").strip().partition(":")
+            length = int(size) if size.isdigit() else 0
+            if not part:
+                break
+            text += part
+        self.timings["read manifest"] = time.perf_counter() - start
+
+        manifest = {}
+        for entry in text.split(";"):
+            name, _, digest = entry.partition("=")
+            if digest:
+                manifest[name] = digest
+        return manifest
+
+    async def sync(self, stdlua_libs=(), frame_app=None, frame_app_name="frame_app.lua",
+                   extra_files=None, minified=True):
+        """
+        Make sure the given standard libs, runtime.lua, the frame app and extra files
+        are current on Frame.
+
+        extra_files maps a device filename to a local path, for Lua modules the app
+        require()s besides the frame-msg standard libraries.
+        Returns the list of device filenames that were actually uploaded.
+        """
+        wanted = dict(stdlua_source(lib, minified) for lib in stdlua_libs)
+        wanted[RUNTIME_LUA.name] = RUNTIME_LUA.read_text()
+        if frame_app:
+            wanted[frame_app_name] = Path(frame_app).read_text()
+        for device_name, local_path in (extra_files or {}).items():
+            wanted[device_name] = Path(local_path).read_text()
+
+        sync_start = time.perf_counter()
+        manifest = await self.read_manifest()
+
+        changed = False
+        for device_name, content in wanted.items():
+            digest = content_hash(content)
+            if manifest.get(device_name) == digest:
+                self.skipped.append(device_name)
+                continue
+
+            start = time.perf_counter()
+            await self.frame.upload_file_from_string(content, device_name)
+            self.timings[device_name] = time.perf_counter() - start
+            self.uploaded.append(device_name)
+            manifest[device_name] = digest
+            changed = True
+
+        # written last, so an interrupted sync is simply redone next time
+        if changed:
+            start = time.perf_counter()
+            lines = "\n".join(f"{name}={digest}" for name, digest in sorted(manifest.items()))
+            await self.frame.upload_file_from_string(lines, MANIFEST_FILE)
+            self.timings["write manifest"] = time.perf_counter() - start
+
+        self.timings["total"] = time.perf_counter() - sync_start
+        return list(self.uploaded)
+
+    def report(self):
+        """One-line summary of what was sent and how long it took."""
+        parts = [f"{name} {seconds:.2f}s" for name, seconds in self.timings.items() if name != "total"]
+        return (f"uploaded {len(self.uploaded)}, skipped {len(self.skipped)} "
+                f"in {self.timings.get('total', 0.0):.2f}s ({', '.join(parts)})")
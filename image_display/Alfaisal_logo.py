@@ -1,6 +1,14 @@
 import asyncio
+import sys
 from pathlib import Path
-from frame_msg import FrameMsg, TxSprite 
+from frame_msg import FrameMsg
+
+from sprite_cache import SpriteCache
+from sprite_codec import compress_sprite
+
+# shared helpers live in frame_common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.upload_manager import UploadManager
 
 async def main():
     frame = FrameMsg()
@@ -9,14 +17,15 @@ async def main():
         await frame.connect()
         await frame.print_short_text("Loading Alfaisal Logo...")
 
-        await frame.upload_stdlua_libs(lib_names=["data", "sprite"])
-        await frame.upload_frame_app("lua/sprite_frame_app.lua")
+        uploads = UploadManager(frame)
+        await uploads.sync(stdlua_libs=["data", "sprite"], frame_app="lua/sprite_frame_app.lua")
+        print("Upload:", uploads.report())
 
         frame.attach_print_response_handler()
         await frame.start_frame_app()
 
-        sprite = TxSprite.from_image_bytes(Path("images/alfaisal.png").read_bytes())
-        await frame.send_message(0x20, sprite.pack())
+        packed_sprite = compress_sprite(SpriteCache().packed_sprite(Path("images/Alfaisal.png")))
+        await frame.send_message(0x20, packed_sprite)
 
         await asyncio.sleep(5)
         await frame.stop_frame_app()
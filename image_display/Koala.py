@@ -1,9 +1,17 @@
 import asyncio
+import sys
 from pathlib import Path
 
-from frame_msg import FrameMsg, TxSprite
+from frame_msg import FrameMsg
 
-async def main():
+from sprite_cache import SpriteCache
+from sprite_codec import compress_sprite
+
+# shared helpers live in frame_common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.upload_manager import UploadManager
+
+async def main(frame=None, hold=5.0):
     """
     Displays a sample image on the Frame display.
 
@@ -13,7 +21,7 @@ async def main():
     This will not be the standard palette from the Frame firmware so the frameside app
     (lua/sprite_frame_app.lua) calls `sprite.set_palette()` before the `frame.display.bitmap()` call.
     """
-    frame = FrameMsg()
+    frame = frame or FrameMsg()
     try:
         await frame.connect()
 
@@ -24,11 +32,12 @@ async def main():
         # Let the user know we're starting
         await frame.print_short_text('Loading...')
 
-        # send the std lua files to Frame that handle data accumulation and sprite parsing
-        await frame.upload_stdlua_libs(lib_names=['data', 'sprite'])
-
-        # Send the main lua application from this project to Frame that will run the app
-        await frame.upload_frame_app(local_filename="lua/sprite_frame_app.lua")
+        # send the std lua files to Frame that handle data accumulation and sprite parsing,
+        # and the main lua application from this project to Frame that will run the app
+        # (files already on Frame from a previous run are skipped)
+        uploads = UploadManager(frame)
+        await uploads.sync(stdlua_libs=['data', 'sprite'], frame_app="lua/sprite_frame_app.lua")
+        print(f"Upload: {uploads.report()}")
 
         # attach the print response handler so we can see stdout from Frame Lua print() statements
         # If we assigned this handler before the frameside app was running,
@@ -45,12 +54,13 @@ async def main():
         # the main app loop on Frame is running).
         # From this point we do message-passing with first-class types and send_message() (or send_data())
 
-        # Quantize and send the image to Frame in chunks
-        # Note that the frameside app is expecting a message of type TxSprite on msgCode 0x20
-        sprite = TxSprite.from_image_bytes(Path("images/koala.jpg").read_bytes())
-        await frame.send_message(0x20, sprite.pack())
+        # Quantize (or load the already-quantized sprite from the cache) and send the image to Frame in chunks
+        # Note that the frameside app is expecting a message of type TxSprite on msgCode 0x20,
+        # optionally with its pixels run-length compressed (see sprite_codec.py)
+        packed_sprite = compress_sprite(SpriteCache().packed_sprite(Path("images/koala.jpg")))
+        await frame.send_message(0x20, packed_sprite)
 
-        await asyncio.sleep(5.0)
+        await asyncio.sleep(hold)
 
         # unhook the print handler
         frame.detach_print_response_handler()
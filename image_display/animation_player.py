@@ -0,0 +1,260 @@
+"""
+Plays a GIF, a folder of frames or a generator of images on Frame as an animation.
+
+Quantizing a frame with TxSprite takes far longer than the gap between frames, so
+frames are quantized in a process pool ahead of playback and the packed sprites wait
+in a bounded prefetch queue. The player sends them to sprite_frame_app.lua at the
+target fps; a frame that is already a full frame interval late when its turn comes
+(BLE fell behind, or quantizing couldn't keep up) is dropped rather than shown late,
+and its quantize is cancelled if a worker hasn't started it yet.
+
+Usage:
+    python animation_player.py images/walk.gif --fps 6
+    python animation_player.py frames_dir/ --loop
+    python animation_player.py --demo --fake      # no glasses needed
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageSequence
+
+from precompile_assets import IMAGE_TYPES
+from sprite_codec import compress_sprite
+
+# shared helpers live in frame_common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.upload_manager import UploadManager
+
+USER_SPRITE = 0x20
+
+
+def quantize_frame(frame, max_pixels=48000, compress=False):
+    """
+    Worker: a path, or (mode, size, raw pixels), to (packed TxSprite bytes, seconds taken).
+    Runs in the process pool, so it only takes and returns picklable values.
+    """
+    from frame_msg import TxSprite
+    start = time.perf_counter()
+    if isinstance(frame, str):
+        image_bytes = Path(frame).read_bytes()
+    else:
+        mode, size, raw = frame
+        # BMP is the cheapest container TxSprite.from_image_bytes() can open
+        buffer = io.BytesIO()
+        Image.frombytes(mode, size, raw).save(buffer, format="BMP")
+        image_bytes = buffer.getvalue()
+    packed = TxSprite.from_image_bytes(image_bytes, max_pixels=max_pixels).pack()
+    if compress:
+        packed = compress_sprite(packed)
+    return packed, time.perf_counter() - start
+
+
+def iter_frames(source):
+    """Frames from a GIF/animated image, a directory of images, or an iterable of images."""
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.is_dir():
+            for frame_path in sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_TYPES):
+                yield str(frame_path)
+            return
+        with Image.open(path) as image:
+            for frame in ImageSequence.Iterator(image):
+                frame = frame.convert("RGB")
+                yield frame.mode, frame.size, frame.tobytes()
+        return
+    for image in source:
+        image = image.convert("RGB")
+        yield image.mode, image.size, image.tobytes()
+
+
+def demo_frames(count=60, size=(240, 160)):
+    """A ball bouncing over a gradient, for trying the player without any files."""
+    for n in range(count):
+        image = Image.linear_gradient("L").resize(size).convert("RGB")
+        x = int((size[0] - 30) * abs((n % 40) / 20 - 1))
+        y = int((size[1] - 30) * abs((n % 24) / 12 - 1))
+        ImageDraw.Draw(image).ellipse((x, y, x + 30, y + 30), fill=(255, 200, 0))
+        yield image
+
+
+class PlayerStats:
+    """Per-frame timings and counters for one playback."""
+
+    def __init__(self, fps):
+        self.target_fps = fps
+        self.shown = 0
+        self.dropped = 0
+        self.cancelled = 0
+        self.quantize_times = []
+        self.send_times = []
+        self.queue_depths = []
+        self.bytes_sent = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def achieved_fps(self):
+        if self.shown < 2 or self.finished is None:
+            return 0.0
+        return self.shown / (self.finished - self.started)
+
+    def summary(self):
+        def ms(samples):
+            return f"{statistics.mean(samples) * 1000:6.1f}ms" if samples else "     -"
+        depth = f"{statistics.mean(self.queue_depths):.1f}" if self.queue_depths else "-"
+        return (f"{self.shown} shown, {self.dropped} dropped ({self.cancelled} before quantizing), "
+                f"{self.achieved_fps:.1f}/{self.target_fps} fps, "
+                f"queue depth {depth}, quantize {ms(self.quantize_times)}, send {ms(self.send_times)}, "
+                f"{self.bytes_sent / 1024:.0f} KiB sent")
+
+
+class AnimationPlayer:
+    """
+    Prefetches quantized frames in a process pool and plays them at a target fps.
+
+    frame is a connected FrameMsg (or a FakeFrameMsg) running sprite_frame_app.lua.
+    """
+
+    def __init__(self, frame, fps=5.0, prefetch=8, workers=None, max_pixels=48000, compress=False):
+        self.frame = frame
+        self.fps = fps
+        self.prefetch = prefetch
+        self.max_pixels = max_pixels
+        self.compress = compress
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.stats = None
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def play(self, source, loop=False):
+        """Play every frame of source (again and again with loop=True); returns the stats."""
+        self.stats = PlayerStats(self.fps)
+        queue = asyncio.Queue(maxsize=self.prefetch)
+        producer = asyncio.create_task(self._prefetch(source, loop, queue))
+        try:
+            await self._playback(queue)
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        return self.stats
+
+    async def _prefetch(self, source, loop, queue):
+        # the queue holds pending futures in frame order, so at most `prefetch`
+        # frames are quantized or waiting at any time
+        event_loop = asyncio.get_running_loop()
+        try:
+            while True:
+                frames = iter_frames(source)
+                for frame in frames:
+                    future = event_loop.run_in_executor(self.pool, quantize_frame, frame,
+                                                     self.max_pixels, self.compress)
+                    await queue.put(future)
+                if not loop or not isinstance(source, (str, Path)):
+                    break
+        finally:
+            await queue.put(None)
+
+    async def _playback(self, queue):
+        stats = self.stats
+        interval = 1 / self.fps
+        due = None
+        while True:
+            stats.queue_depths.append(queue.qsize())
+            future = await queue.get()
+            if future is None:
+                break
+            if due is not None and time.monotonic() > due + interval:
+                # past its slot before we even look at it: cancel the quantize if no
+                # worker has picked it up yet, rather than waiting for a frame we'd drop
+                if future.cancel():
+                    stats.cancelled += 1
+                stats.dropped += 1
+                due += interval
+                continue
+            packed, quantize_time = await future
+            stats.quantize_times.append(quantize_time)
+
+            now = time.monotonic()
+            if due is None:
+                due = stats.started = now
+            elif now > due + interval:
+                # a whole interval late: skip it and aim for the next slot
+                stats.dropped += 1
+                due += interval
+                continue
+            if due > now:
+                await asyncio.sleep(due - now)
+
+            start = time.monotonic()
+            await self.frame.send_message(USER_SPRITE, packed)
+            stats.send_times.append(time.monotonic() - start)
+            stats.bytes_sent += len(packed)
+            stats.shown += 1
+            stats.finished = time.monotonic()
+            due += interval
+
+
+async def main(args):
+    if args.fake:
+        from frame_common.fake_frame import FakeFrameMsg
+        frame = FakeFrameMsg(packet_ms=args.packet_ms)
+    else:
+        from frame_msg import FrameMsg
+        frame = FrameMsg()
+
+    source = demo_frames() if args.demo else args.source
+    try:
+        await frame.connect()
+        await frame.print_short_text('Loading...')
+
+        uploads = UploadManager(frame)
+        await uploads.sync(stdlua_libs=['data', 'sprite'], frame_app="lua/sprite_frame_app.lua")
+        print(f"Upload: {uploads.report()}")
+
+        frame.attach_print_response_handler()
+        await frame.start_frame_app()
+
+        with AnimationPlayer(frame, args.fps, args.prefetch, args.workers,
+                             compress=args.compress) as player:
+            stats = await player.play(source, loop=args.loop)
+        print(f"🎞️  {stats.summary()}")
+
+        frame.detach_print_response_handler()
+        await frame.stop_frame_app()
+
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    finally:
+        await frame.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("source", nargs="?", help="GIF/animated image or directory of frames")
+    parser.add_argument("--demo", action="store_true", help="play a generated bouncing ball")
+    parser.add_argument("--fps", type=float, default=5)
+    parser.add_argument("--prefetch", type=int, default=8, help="frames quantized ahead of playback")
+    parser.add_argument("--workers", type=int, help="quantizing processes (default: one per CPU)")
+    parser.add_argument("--compress", action="store_true", help="run-length compress frames (sprite_codec.py)")
+    parser.add_argument("--loop", action="store_true", help="repeat a file or directory source")
+    parser.add_argument("--fake", action="store_true", help="simulate Frame instead of connecting")
+    parser.add_argument("--packet-ms", type=float, default=15, help="simulated time per BLE packet")
+    args = parser.parse_args()
+    if not args.source and not args.demo:
+        parser.error("give a source or --demo")
+    asyncio.run(main(args))
@@ -0,0 +1,70 @@
+"""
+Cold vs warm time to display for the images under images/.
+
+Cold is what every launch used to pay: decode, resize and quantize with
+TxSprite.from_image_bytes() and pack(). Warm is a SpriteCache hit, which is a content
+hash plus a file read. Either way the sprite is then compressed and sent on 0x20 the
+way Koala.py does it, over FakeFrameMsg's simulated BLE link, so the speedup is of
+the whole wait from launch to the image on Frame.
+
+Usage: python bench_sprite_cache.py [--runs 5] [--packet-ms 15]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from frame_msg import TxSprite
+
+from precompile_assets import IMAGE_DIR, IMAGE_TYPES
+from sprite_cache import SpriteCache
+from sprite_codec import compress_sprite
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.fake_frame import FakeFrameMsg
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def send(payload, packet_ms):
+    frame = FakeFrameMsg(packet_ms=packet_ms)
+    await frame.connect()
+    start = time.perf_counter()
+    await frame.send_message(0x20, payload)
+    return (time.perf_counter() - start) * 1000
+
+
+def main(args):
+    images = sorted(p for p in IMAGE_DIR.iterdir() if p.suffix.lower() in IMAGE_TYPES)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = SpriteCache(cache_dir)
+        print(f"{args.packet_ms} ms per acknowledged packet\n")
+        print(f"{'image':<16} {'sent':>8} {'cold':>9} {'warm':>9} {'send':>9} "
+              f"{'cold total':>11} {'warm total':>11} {'speedup':>8}")
+        for path in images:
+            cold = timed(lambda: compress_sprite(TxSprite.from_image_bytes(path.read_bytes()).pack()),
+                         args.runs)
+            payload = compress_sprite(cache.packed_sprite(path))
+            warm = timed(lambda: compress_sprite(cache.packed_sprite(path)), args.runs)
+            # the link has no jitter, so one send is as long as any other
+            sent = asyncio.run(send(payload, args.packet_ms))
+            print(f"{path.name:<16} {len(payload):>7}B {cold:>7.1f}ms {warm:>7.2f}ms {sent:>7.0f}ms "
+                  f"{cold + sent:>9.0f}ms {warm + sent:>9.0f}ms {(cold + sent) / (warm + sent):>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per image (median reported)")
+    parser.add_argument("--packet-ms", type=float, default=15, help="time per acknowledged packet")
+    main(parser.parse_args())
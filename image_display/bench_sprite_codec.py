@@ -0,0 +1,98 @@
+"""
+Payload size, BLE transfer time and Frame-side memory of banded RLE vs plain sprites.
+
+For each bundled image under images/ (and a few generated graphics: a UI card, a
+caption and a photo-like noise field, the worst case), the packed TxSprite is sent
+either as is or through compress_sprite(). The round trip itself is checked in
+tests/test_sprite_codec.py.
+
+  transfer   time over a simulated link where every MTU-sized packet is acknowledged,
+             as send_message() does
+  Lua peak   the largest strings Frame holds while drawing: the whole pixel string
+             for a plain sprite, the compressed pixels plus one decoded band for RLE
+
+Usage: python bench_sprite_codec.py [--mtu 244] [--packet-ms 15] [--band-bytes 2048]
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from frame_msg import TxSprite
+from PIL import Image, ImageDraw
+
+from precompile_assets import IMAGE_DIR, IMAGE_TYPES
+from sprite_cache import SpriteCache
+from sprite_codec import HEADER, compress_sprite, iter_bands
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.fake_frame import FakeFrameMsg
+
+# what Koala.py reports in use after the VM and the app are loaded
+LUA_BUDGET = 31 * 1024
+
+
+def generated():
+    card = Image.new("RGB", (320, 150))
+    draw = ImageDraw.Draw(card)
+    draw.rounded_rectangle((4, 4, 315, 145), radius=12, outline=(255, 255, 255), width=3)
+    draw.rectangle((20, 20, 120, 60), fill=(200, 40, 40))
+    draw.text((140, 30), "Next: Platform 4", fill=(255, 255, 255))
+    draw.text((140, 90), "Departs 12:45", fill=(255, 200, 0))
+
+    caption = Image.new("RGB", (400, 120))
+    ImageDraw.Draw(caption).text((10, 40), "the koala sleeps up to twenty hours a day",
+                                 fill=(255, 255, 255))
+
+    noise = Image.fromarray(np.random.default_rng(0).integers(0, 255, (150, 300, 3), dtype=np.uint8))
+    return {"ui-card": card, "caption": caption, "noise": noise}
+
+
+def packed_sprites():
+    cache = SpriteCache()
+    for path in sorted(p for p in IMAGE_DIR.iterdir() if p.suffix.lower() in IMAGE_TYPES):
+        yield path.name, cache.packed_sprite(path)
+    for name, image in generated().items():
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        yield name, TxSprite.from_image_bytes(buffer.getvalue()).pack()
+
+
+def lua_peak(packed, compressed):
+    """Bytes of pixels Frame holds at once while drawing the payload band by band."""
+    if compressed is packed:
+        return len(packed) - HEADER.size
+    largest = max(len(band) for _, band in iter_bands(compressed))
+    return len(compressed) - HEADER.size + largest
+
+
+def main(args):
+    link = FakeFrameMsg(mtu=args.mtu, packet_ms=args.packet_ms)
+    packet_s = args.packet_ms / 1000
+    print(f"{args.mtu} B MTU, {args.packet_ms} ms per acknowledged packet, "
+          f"{args.band_bytes} B bands\n")
+    print(f"{'image':<14} {'plain':>8} {'rle':>8} {'ratio':>6} {'plain':>8} {'rle':>8} "
+          f"{'encode':>8} {'Lua peak':>15}")
+    for name, packed in packed_sprites():
+        start = time.perf_counter()
+        compressed = compress_sprite(packed, args.band_bytes)
+        encode = (time.perf_counter() - start) * 1000
+        peak = lua_peak(packed, compressed)
+
+        plain_time = link.packets_for(len(packed)) * packet_s
+        rle_time = link.packets_for(len(compressed)) * packet_s
+        plain_peak = len(packed) - HEADER.size
+        print(f"{name:<14} {len(packed):>7}B {len(compressed):>7}B {len(compressed) / len(packed):6.2f} "
+              f"{plain_time:7.2f}s {rle_time:7.2f}s {encode:6.1f}ms "
+              f"{plain_peak / 1024:5.1f}->{peak / 1024:4.1f} KiB")
+    print(f"\nLua budget ~{LUA_BUDGET // 1024} KiB.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mtu", type=int, default=244, help="BLE data payload per packet")
+    parser.add_argument("--packet-ms", type=float, default=15, help="time per acknowledged packet")
+    parser.add_argument("--band-bytes", type=int, default=2048, help="raw pixel bytes per band")
+    main(parser.parse_args())
@@ -0,0 +1,165 @@
+"""
+Bytes on air and update rate of tile deltas vs whole-sprite re-sends.
+
+Three scenes are built on images/koala.jpg (scaled to the 48,000 pixel sprite budget):
+
+  clock       a dashboard whose clock in one corner ticks every update
+  subtitles   a caption band along the bottom that changes every update
+  animation   a small ball bouncing across the picture
+
+Each frame is sent either as a whole TxSprite (quantized to the same fixed palette,
+so both paths carry identical pixels) or as TileDiffer deltas, over a simulated BLE
+link where every MTU-sized packet waits for Frame's acknowledgement, as
+send_message() does. The deltas are decoded the way sprite_frame_app.lua does it and
+checked against the frame they were made from.
+
+  Lua peak   the most tile data the app holds at once: the tiles it keeps to redraw,
+             plus an incoming message and the tiles parsed out of it (a full frame
+             lets go of the old tiles first)
+
+Usage: python bench_tile_delta.py [--frames 30] [--tile 32] [--mtu 244] [--packet-ms 15]
+       python bench_tile_delta.py --colors 16 --max-resident 65535   # keep every 4 bpp tile
+"""
+import argparse
+import math
+import struct
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from bench_sprite_codec import LUA_BUDGET
+from tile_delta import MAX_RESIDENT, TileDiffer, pack_indices
+
+MAX_PIXELS = 48000
+
+
+def background():
+    image = Image.open("images/koala.jpg").convert("RGB")
+    scale = (MAX_PIXELS / (image.width * image.height)) ** 0.5
+    return image.resize((int(image.width * scale), int(image.height * scale)), Image.LANCZOS)
+
+
+def clock_scene(base, n):
+    image = base.copy()
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((base.width - 90, 4, base.width - 4, 24), fill=(0, 0, 0))
+    draw.text((base.width - 84, 8), f"12:{n // 60:02d}:{n % 60:02d}", fill=(255, 255, 255))
+    return image
+
+
+def subtitle_scene(base, n):
+    image = base.copy()
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, base.height - 28, base.width, base.height), fill=(0, 0, 0))
+    words = "the koala sleeps up to twenty hours a day in the eucalyptus trees".split()
+    draw.text((6, base.height - 22), " ".join(words[n % len(words):][:5]), fill=(255, 255, 255))
+    return image
+
+
+def animation_scene(base, n):
+    image = base.copy()
+    x = int((base.width - 24) * (0.5 + 0.5 * math.sin(n / 5)))
+    y = int((base.height - 24) * abs(math.sin(n / 3)))
+    ImageDraw.Draw(image).ellipse((x, y, x + 24, y + 24), fill=(255, 255, 255))
+    return image
+
+
+SCENES = {"clock": clock_scene, "subtitles": subtitle_scene, "animation": animation_scene}
+
+
+def link_time(nbytes, mtu, packet_s):
+    # send_message: 3-byte header on the first packet, 1 byte on the rest, each acknowledged
+    packets = 1 + max(0, math.ceil((nbytes - (mtu - 3)) / (mtu - 1)))
+    return packets * packet_s
+
+
+def apply_update(screen, tiles, payload):
+    """
+    Decode one TILE_UPDATE the way sprite_frame_app.lua does and draw it into screen;
+    tiles maps each tile the app keeps to its pixel bytes. Returns the Lua peak.
+    """
+    bpp, num_colors, clear = payload[0], payload[1], payload[2]
+    pos = 3 + num_colors * 3
+    if clear:
+        tiles.clear()
+        screen[:] = 0
+    held = sum(tiles.values())
+    parsed = 0
+    while pos < len(payload):
+        x, y, w, h, blank = struct.unpack_from(">HHBBB", payload, pos)
+        pos += 7
+        if blank:
+            tiles.pop((x, y), None)
+            screen[y:y + h, x:x + w] = 0
+            continue
+        size = (w * h * bpp + 7) // 8
+        packed = np.frombuffer(payload, dtype=np.uint8, count=size, offset=pos)
+        pos += size
+        parsed += size
+        bits = np.unpackbits(packed).reshape(-1, bpp)
+        values = (bits * (1 << np.arange(bpp - 1, -1, -1))).sum(axis=1)[:w * h]
+        screen[y:y + h, x:x + w] = values.reshape(h, w)
+        tiles[(x, y)] = size
+    return held + len(payload) + parsed
+
+
+def run(name, scene, base, args):
+    differ = TileDiffer(tile_size=args.tile, num_colors=args.colors, max_resident=args.max_resident)
+    screen = None
+    tiles = {}
+    peak = 0
+    full_time = delta_time = encode_time = 0.0
+    full_bytes = delta_bytes = 0
+    packet_s = args.packet_ms / 1000
+    for n in range(args.frames):
+        image = scene(base, n)
+
+        start = time.perf_counter()
+        payloads = differ.encode(image)
+        encode_time += time.perf_counter() - start
+
+        pixels = differ.quantize(image)
+        full = 7 + len(differ.palette) + len(pack_indices(pixels, differ.bpp))
+        full_bytes += full
+        full_time += link_time(full, args.mtu, packet_s)
+        delta_bytes += sum(len(p) for p in payloads)
+        delta_time += sum(link_time(len(p), args.mtu, packet_s) for p in payloads)
+
+        if screen is None:
+            screen = np.zeros_like(pixels)
+        for payload in payloads:
+            peak = max(peak, apply_update(screen, tiles, payload))
+        assert np.array_equal(screen, pixels), f"{name}: frame {n} decoded wrong"
+
+    frames = args.frames
+    # averages include the first frame, which is a full send either way
+    print(f"{name:<10} {full_bytes / frames:8.0f} B {delta_bytes / frames:8.0f} B "
+          f"{(1 - delta_bytes / full_bytes) * 100:6.1f}%  "
+          f"{frames / full_time:6.1f}/s {frames / (delta_time + encode_time):6.1f}/s "
+          f"{encode_time / frames * 1000:6.2f}ms {differ.bpp:>4} {peak / 1024:7.1f} KiB "
+          f"{'✅' if peak <= LUA_BUDGET else '❌'}")
+
+
+def main(args):
+    base = background()
+    print(f"{base.width}x{base.height} sprite, {args.tile}px tiles, {args.frames} frames, "
+          f"{args.mtu} B MTU, {args.packet_ms} ms per acknowledged packet\n")
+    print(f"{'scene':<10} {'full/upd':>10} {'delta/upd':>10} {'saved':>7}  "
+          f"{'full':>8} {'delta':>8} {'encode':>8} {'bpp':>4} {'Lua peak':>11}")
+    for name, scene in SCENES.items():
+        run(name, scene, base, args)
+    print(f"\nAll delta frames decoded to the same pixels as the full frames "
+          f"(Lua budget ~{LUA_BUDGET // 1024} KiB).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--tile", type=int, default=32, help="tile size in pixels")
+    parser.add_argument("--mtu", type=int, default=244, help="BLE data payload per packet")
+    parser.add_argument("--packet-ms", type=float, default=15, help="time per acknowledged packet")
+    parser.add_argument("--colors", type=int, default=16, help="palette size before the resident cap")
+    parser.add_argument("--max-resident", type=int, default=MAX_RESIDENT,
+                        help="tile bytes the Frame app may keep")
+    main(parser.parse_args())
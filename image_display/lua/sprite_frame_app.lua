@@ -1,11 +1,105 @@
 local data = require('data.min')
 local sprite = require('sprite.min')
+local runtime = require('runtime')
 
 -- Phone to Frame flags
 USER_SPRITE = 0x20
+TILE_UPDATE = 0x21
+
+-- compress byte of a sprite header for banded RLE pixel data (see sprite_codec.py)
+BANDED_RLE = 2
+
+-- pixels of every tile on screen, keyed by position, and their format
+local tiles = {}
+local tile_bpp = 4
+
+-- Parse a TILE_UPDATE message (see tile_delta.py): sequence number, bpp, palette, then
+-- the changed tiles. An update that hasn't been drawn yet (prev) is added to, not lost.
+function parse_tiles(data, prev)
+	local update = prev or { tiles = {}, acks = {} }
+	table.insert(update.acks, string.sub(data, 1, 2))
+	update.bpp = string.byte(data, 3)
+	update.num_colors = string.byte(data, 4)
+	if string.byte(data, 5) == 1 then
+		-- a full frame replaces everything, including what prev held; the tiles on
+		-- screen are let go now, so they aren't in memory next to the new ones
+		update.clear = true
+		update.tiles = {}
+		tiles = {}
+	end
+	local pos = 6 + update.num_colors * 3
+	update.palette_data = string.sub(data, 6, pos - 1)
+
+	while pos <= #data do
+		local tile = {}
+		tile.x = string.byte(data, pos) << 8 | string.byte(data, pos + 1)
+		tile.y = string.byte(data, pos + 2) << 8 | string.byte(data, pos + 3)
+		tile.w = string.byte(data, pos + 4)
+		local h = string.byte(data, pos + 5)
+		local blank = string.byte(data, pos + 6) == 1
+		pos = pos + 7
+		if not blank then
+			local size = (tile.w * h * update.bpp + 7) // 8
+			tile.pixels = string.sub(data, pos, pos + size - 1)
+			pos = pos + size
+		end
+		table.insert(update.tiles, tile)
+	end
+	return update
+end
+
+-- Undo sprite_codec.rle_encode() on data[first..last]
+function rle_decode(data, first, last)
+	local out = {}
+	local pos = first
+	while pos <= last do
+		local n = string.byte(data, pos)
+		if n < 128 then
+			out[#out + 1] = string.sub(data, pos + 1, pos + n + 1)
+			pos = pos + n + 2
+		else
+			out[#out + 1] = string.rep(string.sub(data, pos + 1, pos + 1), n - 126)
+			pos = pos + 2
+		end
+	end
+	return table.concat(out)
+end
+
+-- Decode and draw a banded RLE sprite one band at a time, so only one band
+-- of raw pixels is ever in memory next to the compressed data
+function draw_bands(spr)
+	local data = spr.pixel_data
+	local band_rows = string.byte(data, 1) << 8 | string.byte(data, 2)
+	local pos = 3
+	local y = 1
+	while pos <= #data do
+		local mode = string.byte(data, pos)
+		local length = string.byte(data, pos + 1) << 8 | string.byte(data, pos + 2)
+		local first = pos + 3
+		pos = first + length
+		local band
+		if mode == 1 then -- BAND_RLE
+			band = rle_decode(data, first, pos - 1)
+		else
+			band = string.sub(data, first, pos - 1)
+		end
+		frame.display.bitmap(1, y, spr.width, 2^spr.bpp, 0, band)
+		band = nil
+		y = y + band_rows
+		collectgarbage('step')
+	end
+end
+
+-- Parse a USER_SPRITE message, which may carry banded RLE pixel data
+function parse_user_sprite(data)
+	local spr = sprite.parse_sprite(data)
+	spr.banded = string.byte(data, 5) == BANDED_RLE
+	return spr
+end
 
 -- register the message parsers so they are automatically called when matching data comes in
-data.parsers[USER_SPRITE] = sprite.parse_sprite
+data.parsers[USER_SPRITE] = parse_user_sprite
+data.parsers[TILE_UPDATE] = parse_tiles
 
 -- Main app loop
 function app_loop()
@@ -15,45 +109,63 @@ function app_loop()
 	-- tell the host program that the frameside app is ready (waiting on await_print)
 	print('Frame app is running')
 
-	while true do
-        rc, err = pcall(
-            function()
-				-- process any raw data items, if ready
-				local items_ready = data.process_raw_items()
+	runtime.run(
+		function(items_ready)
+			if data.app_data[USER_SPRITE] ~= nil then
+				local spr = data.app_data[USER_SPRITE]
 
-				-- one or more full messages received
-				if items_ready > 0 then
+				-- set the palette in case it's different to the standard palette
+				sprite.set_palette(spr.num_colors, spr.palette_data)
 
-					if data.app_data[USER_SPRITE] ~= nil then
-						local spr = data.app_data[USER_SPRITE]
+				-- show the sprite
+				if spr.banded then
+					draw_bands(spr)
+				else
+					frame.display.bitmap(1, 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
+				end
+				frame.display.show()
 
-						-- set the palette in case it's different to the standard palette
-						sprite.set_palette(spr.num_colors, spr.palette_data)
+				-- drop the sprite; runtime.lua collects it once the heap needs it or
+				-- the animation pauses
+				data.app_data[USER_SPRITE] = nil
+				tiles = {}
+			end
 
-						-- show the sprite
-						frame.display.bitmap(1, 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
-						frame.display.show()
+			if data.app_data[TILE_UPDATE] ~= nil then
+				local update = data.app_data[TILE_UPDATE]
+				sprite.set_palette(update.num_colors, update.palette_data)
+				tile_bpp = update.bpp
+				if update.clear then
+					tiles = {}
+				end
 
-						-- clear the object and run the garbage collector right away
-						data.app_data[USER_SPRITE] = nil
-						collectgarbage('collect')
-					end
+				-- a blank tile has no pixels, which removes it
+				for _, tile in ipairs(update.tiles) do
+					tiles[tile.y * 65536 + tile.x] = tile.pixels and tile or nil
+				end
 
+				-- show() starts the next frame blank, so redraw every tile we hold
+				for _, tile in pairs(tiles) do
+					frame.display.bitmap(tile.x + 1, tile.y + 1, tile.w, 2^tile_bpp, 0, tile.pixels)
 				end
+				frame.display.show()
 
-				-- can't sleep for long, might be lots of incoming bluetooth data to process
-				frame.sleep(0.001)
+				-- tell the host which updates made it to the screen
+				runtime.send(string.char(TILE_UPDATE) .. table.concat(update.acks))
+				data.app_data[TILE_UPDATE] = nil
 			end
-		)
+
+			return items_ready > 0
+		end,
 		-- Catch an error (including the break signal) here
-		if rc == false then
+		function(err)
 			-- send the error back on the stdout stream and clear the display
 			print(err)
 			frame.display.text(' ', 1, 1)
 			frame.display.show()
-			break
+			return true
 		end
-	end
+	)
 end
 
 -- run the main app loop
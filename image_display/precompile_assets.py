@@ -0,0 +1,38 @@
+"""
+Quantizes and packs every image under images/ (or the paths given) into the sprite cache,
+so the display scripts start with a plain file read.
+
+Usage: python precompile_assets.py [--clear] [image ...]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from sprite_cache import SpriteCache
+
+IMAGE_DIR = Path(__file__).resolve().parent / "images"
+IMAGE_TYPES = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
+
+
+def main(paths, clear=False):
+    if not paths:
+        paths = sorted(p for p in IMAGE_DIR.iterdir() if p.suffix.lower() in IMAGE_TYPES)
+
+    cache = SpriteCache()
+    if clear:
+        cache.clear()
+    start = time.perf_counter()
+    for path, size in cache.precompile(paths).items():
+        print(f"✅ {path}: {size} bytes")
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"📦 {cache.misses} prepared, {cache.hits} already cached in {cache.cache_dir} "
+          f"({elapsed:.0f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("images", nargs="*", type=Path, help="images to prepare (default: images/)")
+    parser.add_argument("--clear", action="store_true", help="empty the cache first, to rebuild it")
+    args = parser.parse_args()
+    main(args.images, args.clear)
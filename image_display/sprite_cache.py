@@ -0,0 +1,63 @@
+"""
+On-disk cache of packed TxSprite bytes, keyed by the content hash of the source image.
+
+TxSprite.from_image_bytes() decodes, resizes and quantizes the image to a 16-colour
+palette, which takes far longer than sending the result, yet the bundled images never
+change. The first run stores sprite.pack() under .sprite_cache/; later runs only read
+that file back. Editing an image changes its hash, so stale entries are never used.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from frame_msg import TxSprite
+
+CACHE_DIR = Path(__file__).resolve().parent / ".sprite_cache"
+
+# bump when the way sprites are prepared changes, so old cache files are ignored
+FORMAT_VERSION = 1
+
+
+class SpriteCache:
+    """Packed sprite bytes for image files, prepared once and then read from disk."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_pixels=48000):
+        self.cache_dir = Path(cache_dir)
+        self.max_pixels = max_pixels
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, image_bytes):
+        digest = hashlib.sha256(f"v{FORMAT_VERSION}:{self.max_pixels}:".encode())
+        digest.update(image_bytes)
+        return digest.hexdigest()
+
+    def packed_sprite(self, image_path):
+        """Return sprite.pack() bytes for image_path, quantizing only on a cache miss."""
+        image_bytes = Path(image_path).read_bytes()
+        cache_file = self.cache_dir / f"{self.key(image_bytes)}.sprite"
+
+        try:
+            packed = cache_file.read_bytes()
+            self.hits += 1
+            return packed
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+        packed = TxSprite.from_image_bytes(image_bytes, max_pixels=self.max_pixels).pack()
+
+        # write to a temp file and rename, so a half-written entry is never read back
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".tmp{os.getpid()}")
+        tmp_file.write_bytes(packed)
+        os.replace(tmp_file, cache_file)
+        return packed
+
+    def precompile(self, image_paths):
+        """Fill the cache for every image; returns {path: packed size in bytes}."""
+        return {str(path): len(self.packed_sprite(path)) for path in image_paths}
+
+    def clear(self):
+        for entry in self.cache_dir.glob("*.sprite"):
+            entry.unlink()
@@ -0,0 +1,157 @@
+"""
+Banded run-length compression for TxSprite payloads (message 0x20).
+
+A packed 4 bpp sprite is width * height / 2 bytes, and graphics with flat areas (logos,
+UI, text, dark backgrounds) are mostly long runs of one byte. compress_sprite() takes
+the bytes of TxSprite.pack() and re-encodes the pixel data with a PackBits-style RLE
+that lua/sprite_frame_app.lua undoes with string.rep() and string.sub() alone.
+
+Frame's Lua heap is only ~31 KB (see the collectgarbage("count") check in Koala.py), so
+decoding a whole 24 KB sprite next to its compressed copy would not fit. The pixel data
+is cut into bands of rows instead, each encoded on its own; Frame decodes and draws
+one band at a time, so it never holds more than one band of raw pixels.
+
+Compressed payload, all integers big-endian:
+    TxSprite header with compress = COMPRESS_BANDED_RLE, palette (unchanged)
+    band_rows (uint16)            rows per band (the last band may be shorter)
+    then per band:
+        mode (uint8)              BAND_RAW or BAND_RLE
+        length (uint16)           bytes of band data that follow
+        data                      raw packed pixels, or RLE codes:
+                                    0-127    copy the next n + 1 bytes
+                                    128-255  repeat the next byte n - 126 times
+
+A band that RLE would grow is sent raw, and a sprite that compression would not make
+smaller is returned unchanged, so compressing is never worse than not.
+"""
+import struct
+
+import numpy as np
+
+# value of the header's compress byte; 1 is frame_msg's LZ4, which sprite.lua can't decode
+COMPRESS_BANDED_RLE = 2
+
+BAND_RAW = 0
+BAND_RLE = 1
+
+# raw pixels per band Frame decodes at once
+BAND_BYTES = 2048
+
+HEADER = struct.Struct(">HHBBB")
+
+
+def rle_encode(data):
+    """PackBits-style RLE: runs of 3 or more bytes become (128 + len - 2, byte)."""
+    data = np.frombuffer(data, dtype=np.uint8)
+    if not len(data):
+        return b""
+    # start of every run of equal bytes
+    starts = np.flatnonzero(np.concatenate(([True], data[1:] != data[:-1])))
+    lengths = np.diff(np.append(starts, len(data)))
+
+    out = bytearray()
+    literal_start = None
+
+    def flush_literal(end):
+        for pos in range(literal_start, end, 128):
+            chunk = data[pos:min(pos + 128, end)]
+            out.append(len(chunk) - 1)
+            out.extend(chunk.tobytes())
+
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        if length < 3:
+            if literal_start is None:
+                literal_start = start
+            continue
+        if literal_start is not None:
+            flush_literal(start)
+            literal_start = None
+        value = int(data[start])
+        end = start + length
+        while length >= 3:
+            count = min(length, 129)
+            out += bytes((count + 126, value))
+            length -= count
+        if length:
+            # the 1-2 bytes left over start the next literal
+            literal_start = end - length
+    if literal_start is not None:
+        flush_literal(len(data))
+    return bytes(out)
+
+
+def rle_decode(data):
+    """Inverse of rle_encode(); mirrors rle_decode() in sprite_frame_app.lua."""
+    out = []
+    pos = 0
+    while pos < len(data):
+        n = data[pos]
+        if n < 128:
+            out.append(data[pos + 1:pos + n + 2])
+            pos += n + 2
+        else:
+            out.append(data[pos + 1:pos + 2] * (n - 126))
+            pos += 2
+    return b"".join(out)
+
+
+def band_rows_for(width, bpp, band_bytes=BAND_BYTES):
+    """
+    Rows per band: as many as fit in band_bytes, but a multiple of 8 so every band
+    starts on a whole byte of the packed pixels (TxSprite rows are not byte-padded).
+    """
+    return max(8, band_bytes * 8 // (width * bpp) // 8 * 8)
+
+
+def compress_sprite(packed, band_bytes=BAND_BYTES):
+    """
+    Compress the bytes of TxSprite.pack(); returns them unchanged if they are already
+    compressed or compression wouldn't make them smaller.
+    """
+    width, height, compress, bpp, num_colors = HEADER.unpack_from(packed)
+    if compress:
+        return packed
+    pixels_at = HEADER.size + num_colors * 3
+    pixels = packed[pixels_at:]
+
+    rows = band_rows_for(width, bpp, band_bytes)
+    step = rows * width * bpp // 8
+    body = [struct.pack(">H", rows)]
+    for start in range(0, len(pixels), step):
+        band = pixels[start:start + step]
+        encoded = rle_encode(band)
+        mode = BAND_RLE if len(encoded) < len(band) else BAND_RAW
+        data = encoded if mode == BAND_RLE else band
+        body.append(struct.pack(">BH", mode, len(data)) + data)
+
+    compressed = (HEADER.pack(width, height, COMPRESS_BANDED_RLE, bpp, num_colors)
+                  + packed[HEADER.size:pixels_at] + b"".join(body))
+    return compressed if len(compressed) < len(packed) else packed
+
+
+def iter_bands(payload):
+    """(first row, raw band pixels) for each band of a compressed sprite, as Frame draws them."""
+    width, height, compress, bpp, num_colors = HEADER.unpack_from(payload)
+    if compress != COMPRESS_BANDED_RLE:
+        raise ValueError(f"not a banded RLE sprite (compress={compress})")
+    pos = HEADER.size + num_colors * 3
+    (rows,) = struct.unpack_from(">H", payload, pos)
+    pos += 2
+    row = 0
+    while pos < len(payload):
+        mode, length = struct.unpack_from(">BH", payload, pos)
+        pos += 3
+        data = payload[pos:pos + length]
+        pos += length
+        yield row, rle_decode(data) if mode == BAND_RLE else data
+        row += rows
+
+
+def decompress_sprite(payload):
+    """The TxSprite.pack() bytes a compressed payload was made from (plain ones pass through)."""
+    width, height, compress, bpp, num_colors = HEADER.unpack_from(payload)
+    if compress != COMPRESS_BANDED_RLE:
+        return payload
+    pixels = b"".join(band for _, band in iter_bands(payload))
+    return (HEADER.pack(width, height, 0, bpp, num_colors)
+            + payload[HEADER.size:HEADER.size + num_colors * 3] + pixels)
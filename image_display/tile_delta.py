@@ -0,0 +1,249 @@
+"""
+Tile-based delta updates for images that change a little at a time.
+
+Sending a new TxSprite redraws and re-sends the whole bitmap even when only a clock,
+a subtitle or a small animated figure changed. TileDiffer quantizes each frame to a
+palette that stays fixed between frames, cuts it into tiles, hashes every tile and
+encodes only the tiles whose hash changed, with their offsets, as TILE_UPDATE
+messages for lua/sprite_frame_app.lua.
+
+Frame clears its draw buffer on every show(), so the Frame app keeps the last pixels
+of each tile and redraws them all; the saving is on the air, where it matters. What
+the app keeps is bounded by `max_resident`: the first frame picks the most colours
+for which a whole screen of tiles fits in it.
+
+TileDiffer.encode() payload, all integers big-endian:
+    bpp (uint8), num_colors (uint8)
+    clear (uint8)             1: a full frame, the app drops every tile it holds first
+    palette (num_colors x r, g, b)
+    then per tile:
+        x (uint16), y (uint16)    offset from the top left of the image
+        w (uint8), h (uint8)      tile size (edge tiles may be smaller)
+        blank (uint8)             1: tile is all colour 0, no pixel data follows
+        pixels                    w * h * bpp bits, packed like TxSprite rows
+TileSender puts a sequence number (uint16) in front of each payload, and the app
+replies with a TILE_UPDATE listing the sequence numbers of the updates it has drawn.
+"""
+import hashlib
+import struct
+from collections import deque
+
+import numpy as np
+from PIL import Image
+
+TILE_UPDATE = 0x21
+
+# send_message() lengths are 16 bits; a long update is split across messages
+MAX_PAYLOAD = 16000
+
+# tile pixels sprite_frame_app.lua may hold between updates, of the ~31 KB Lua heap
+# left after the app loads; a full frame needs as much again while it is parsed
+MAX_RESIDENT = 12 * 1024
+
+# updates sent without an acknowledgement before they are taken as lost
+MAX_UNACKED = 32
+
+
+def pack_indices(pixels, bpp):
+    """Pack palette indices big-end first, bpp bits each, like TxSprite.pack()."""
+    flat = pixels.reshape(-1).astype(np.uint8)
+    if bpp == 1:
+        return np.packbits(flat).tobytes()
+    per_byte = 8 // bpp
+    flat = np.concatenate([flat, np.zeros(-len(flat) % per_byte, dtype=np.uint8)])
+    flat = flat.reshape(-1, per_byte)
+    packed = np.zeros(len(flat), dtype=np.uint8)
+    for i in range(per_byte):
+        packed |= flat[:, i] << (8 - bpp * (i + 1))
+    return packed.tobytes()
+
+
+def fixed_palette(image, num_colors=16):
+    """
+    Quantize once to pick the palette every later frame is mapped onto, with the
+    darkest colour moved to index 0 and made black (transparent on Frame), as
+    TxSprite.from_image_bytes() does.
+    """
+    quantized = image.convert("RGB").quantize(colors=num_colors, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()[:num_colors * 3]
+    palette += [0] * (num_colors * 3 - len(palette))
+    colors = [palette[i:i + 3] for i in range(0, len(palette), 3)]
+    darkest = min(range(num_colors), key=lambda i: sum(colors[i]))
+    colors[0], colors[darkest] = [0, 0, 0], colors[0]
+    return bytes(c for color in colors for c in color)
+
+
+class TileDiffer:
+    """
+    Turns successive frames into the TILE_UPDATE messages that bring Frame up to date.
+
+    The palette is fixed by the first frame (or passed in), so unchanged areas map to
+    the same indices and hash the same in every frame. Without a palette, num_colors
+    is lowered on the first frame until its pixels fit in max_resident bytes.
+    """
+
+    def __init__(self, tile_size=32, num_colors=16, palette=None, max_payload=MAX_PAYLOAD,
+                 max_resident=MAX_RESIDENT):
+        if num_colors not in (2, 4, 16):
+            raise ValueError(f"num_colors must be 2, 4 or 16, got {num_colors}")
+        if not 8 <= tile_size <= 255:
+            raise ValueError(f"tile_size must be 8-255, got {tile_size}")
+        self.tile_size = tile_size
+        self.num_colors = num_colors
+        self.bpp = {2: 1, 4: 2, 16: 4}[num_colors]
+        self.palette = palette
+        self.max_payload = max_payload
+        self.max_resident = max_resident
+        self._palette_image = None
+        self._hashes = {}
+        self.size = None
+
+        self.frames = 0
+        self.tiles_sent = 0
+        self.bytes_sent = 0
+        self.full_bytes = 0    # what whole-sprite updates would have cost
+
+    def reset(self):
+        """Forget what Frame shows, so the next frame is sent in full and replaces it."""
+        self._hashes.clear()
+        self.size = None
+
+    def resident_bytes(self, width, height):
+        """Pixel bytes the Frame app holds for a width x height image with no blank tiles."""
+        return (width * height * self.bpp + 7) // 8
+
+    def quantize(self, image):
+        """Map an image onto the fixed palette; returns a 2D array of indices."""
+        image = image.convert("RGB")
+        if self.palette is None:
+            while self.num_colors > 2 and self.resident_bytes(*image.size) > self.max_resident:
+                self.num_colors = {16: 4, 4: 2}[self.num_colors]
+                self.bpp = {2: 1, 4: 2, 16: 4}[self.num_colors]
+        if self.resident_bytes(*image.size) > self.max_resident:
+            raise ValueError(f"a {image.width}x{image.height} image at {self.bpp} bpp needs "
+                             f"{self.resident_bytes(*image.size)} bytes on Frame, over max_resident "
+                             f"({self.max_resident})")
+        if self.palette is None:
+            self.palette = fixed_palette(image, self.num_colors)
+        if self._palette_image is None:
+            self._palette_image = Image.new("P", (1, 1))
+            # pad to 256 entries so unused slots can never be chosen
+            self._palette_image.putpalette(self.palette + self.palette[:3] * (256 - self.num_colors))
+        quantized = image.quantize(palette=self._palette_image, dither=Image.Dither.NONE)
+        return np.asarray(quantized)
+
+    def dirty_tiles(self, pixels):
+        """(x, y, tile pixels) for every tile that differs from the last frame."""
+        if pixels.shape != self.size:
+            self.reset()
+            self.size = pixels.shape
+        height, width = pixels.shape
+        step = self.tile_size
+        dirty = []
+        for y in range(0, height, step):
+            for x in range(0, width, step):
+                tile = pixels[y:y + step, x:x + step]
+                digest = hashlib.blake2b(tile.tobytes(), digest_size=8).digest()
+                if self._hashes.get((x, y)) != digest:
+                    self._hashes[(x, y)] = digest
+                    dirty.append((x, y, tile))
+        return dirty
+
+    def encode(self, image):
+        """The TILE_UPDATE payloads that update Frame to show image (empty if unchanged)."""
+        pixels = self.quantize(image)
+        first = not self._hashes
+        dirty = self.dirty_tiles(pixels)
+
+        def header(clear):
+            return struct.pack(">BBB", self.bpp, self.num_colors, int(clear)) + self.palette
+
+        # the first payload of a full frame tells the app to clear its tiles, even
+        # when the frame is all blank
+        payloads, body = [], b""
+        for x, y, tile in dirty:
+            h, w = tile.shape
+            blank = not tile.any()
+            # on a fresh screen blank tiles are already blank
+            if blank and first:
+                continue
+            entry = struct.pack(">HHBBB", x, y, w, h, int(blank))
+            if not blank:
+                entry += pack_indices(tile, self.bpp)
+            if body and len(header(False)) + len(body) + len(entry) > self.max_payload:
+                payloads.append(header(first and not payloads) + body)
+                body = b""
+            body += entry
+            self.tiles_sent += 1
+        if body or (first and not payloads):
+            payloads.append(header(first and not payloads) + body)
+
+        self.frames += 1
+        self.bytes_sent += sum(len(p) for p in payloads)
+        self.full_bytes += 7 + len(self.palette) + (pixels.size * self.bpp + 7) // 8
+        return payloads
+
+    def stats(self):
+        saved = 1 - self.bytes_sent / self.full_bytes if self.full_bytes else 0.0
+        return {"frames": self.frames, "tiles_sent": self.tiles_sent, "bytes_sent": self.bytes_sent,
+                "full_bytes": self.full_bytes, "saved": round(saved, 3)}
+
+
+class TileSender:
+    """
+    Sends frames to a running sprite_frame_app.lua as tile deltas.
+
+    data.lua holds one message per flag until the app parses it, so an update can be
+    overwritten by the next one and never drawn. attach() listens for the app's
+    acknowledgements: an update left out of them makes the next frame a full one, as
+    does a failed send, or MAX_UNACKED updates going unanswered.
+    """
+
+    def __init__(self, frame, differ=None):
+        self.frame = frame
+        self.differ = differ or TileDiffer()
+        self.lost = 0
+        self._seq = 0
+        self._unacked = None    # sequence numbers in the order sent, while attached
+        self._refresh = False
+
+    def attach(self):
+        self._unacked = deque(maxlen=MAX_UNACKED)
+        self.frame.register_data_response_handler(self, [TILE_UPDATE], self._handle)
+        return self
+
+    def detach(self):
+        self.frame.unregister_data_response_handler(self)
+        self._unacked = None
+
+    def _handle(self, data):
+        for (seq,) in struct.iter_unpack(">H", bytes(data[1:])):
+            if self._unacked is None or seq not in self._unacked:
+                continue
+            # anything sent before it and still unacknowledged was never drawn
+            while self._unacked.popleft() != seq:
+                self.lost += 1
+                self._refresh = True
+
+    async def show(self, image):
+        """Bring Frame up to date with image; returns the number of bytes sent."""
+        if self._refresh:
+            self._refresh = False
+            self.differ.reset()
+        payloads = self.differ.encode(image)
+        try:
+            for payload in payloads:
+                self._seq = (self._seq + 1) % 65536
+                if self._unacked is not None:
+                    if len(self._unacked) == self._unacked.maxlen:
+                        # the app isn't answering; don't trust what it shows
+                        self._unacked.popleft()
+                        self.lost += 1
+                        self._refresh = True
+                    self._unacked.append(self._seq)
+                await self.frame.send_message(TILE_UPDATE, struct.pack(">H", self._seq) + payload)
+        except Exception:
+            # Frame may have some of these tiles and not others
+            self.differ.reset()
+            raise
+        return sum(len(p) for p in payloads)
@@ -0,0 +1,158 @@
+"""
+Pluggable speech-to-text backends for the live translators.
+
+transcribe_audio_from_wav() used to be hard-wired to recognize_google(), so every
+utterance cost a network round trip and nothing worked offline. Each backend here
+takes sr.AudioData and returns text, and:
+
+  warm_up()              loads models once at startup instead of per utterance
+  transcribe_batch()     transcribes several clips in one go
+  transcribe_stream()    yields (text, is_final) partial results while audio arrives
+
+Backends:
+  google   Google Web Speech via speech_recognition (network)
+  vosk     offline Kaldi models via the vosk package, with true streaming partials
+  stub     deterministic stand-in with modelled latency, for benchmarks and simulations
+"""
+import json
+import time
+
+import speech_recognition as sr
+
+
+class ASRBackend:
+    """Base class; subclasses implement transcribe()."""
+
+    name = "base"
+
+    def warm_up(self):
+        """Load models / open sessions ahead of the first utterance."""
+
+    def transcribe(self, audio):
+        """Return the text spoken in sr.AudioData ("" if nothing was understood)."""
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios):
+        return [self.transcribe(audio) for audio in audios]
+
+    def transcribe_stream(self, chunks, sample_rate, sample_width):
+        """
+        Yield (text, is_final) while raw PCM chunks arrive.
+
+        Backends without incremental decoding only produce the final result.
+        """
+        pcm = b"".join(chunks)
+        yield self.transcribe(sr.AudioData(pcm, sample_rate, sample_width)), True
+
+
+class GoogleBackend(ASRBackend):
+    """Google Web Speech API, as the translators have always used."""
+
+    name = "google"
+
+    def __init__(self, language="en-US"):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language).strip()
+        except sr.UnknownValueError:
+            print("❌ Could not understand audio")
+            return ""
+        except sr.RequestError as e:
+            print(f"❌ API error: {e}")
+            return ""
+
+
+class VoskBackend(ASRBackend):
+    """
+    Offline recognition with a Vosk (Kaldi) model, e.g. vosk-model-small-en-us.
+
+    The model is loaded once by warm_up(); each utterance only creates a cheap
+    KaldiRecognizer. Needs `pip install vosk` and an unpacked model directory.
+    """
+
+    name = "vosk"
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_path="model"):
+        self.model_path = model_path
+        self.model = None
+
+    def warm_up(self):
+        if self.model is None:
+            from vosk import Model, SetLogLevel
+            SetLogLevel(-1)
+            self.model = Model(str(self.model_path))
+
+    def _recognizer(self):
+        from vosk import KaldiRecognizer
+        self.warm_up()
+        return KaldiRecognizer(self.model, self.SAMPLE_RATE)
+
+    def transcribe(self, audio):
+        recognizer = self._recognizer()
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+        return json.loads(recognizer.FinalResult()).get("text", "").strip()
+
+    def transcribe_stream(self, chunks, sample_rate, sample_width):
+        recognizer = self._recognizer()
+        final = []
+        for chunk in chunks:
+            pcm = sr.AudioData(chunk, sample_rate, sample_width).get_raw_data(
+                convert_rate=self.SAMPLE_RATE, convert_width=2)
+            if recognizer.AcceptWaveform(pcm):
+                # Vosk closed a segment at a pause; keep it and carry on
+                final.append(json.loads(recognizer.Result()).get("text", ""))
+                yield " ".join(t for t in final if t), False
+            else:
+                partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                yield " ".join(t for t in final + [partial] if t), False
+        final.append(json.loads(recognizer.FinalResult()).get("text", ""))
+        yield " ".join(t for t in final if t).strip(), True
+
+
+class StubBackend(ASRBackend):
+    """
+    Returns a fixed transcript after a modelled delay: `latency` seconds plus
+    `real_time_factor` x the clip length. Runs anywhere, so benchmarks and the
+    simulated Frame can drive the whole pipeline without a network or a model.
+    """
+
+    name = "stub"
+
+    def __init__(self, text="hola, ¿cómo estás?", latency=0.05, real_time_factor=0.0,
+                 warm_up_seconds=0.0):
+        self.text = text
+        self.latency = latency
+        self.real_time_factor = real_time_factor
+        self.warm_up_seconds = warm_up_seconds
+        self._warm = False
+
+    def warm_up(self):
+        if not self._warm:
+            time.sleep(self.warm_up_seconds)
+            self._warm = True
+
+    def transcribe(self, audio):
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        time.sleep(self.latency + self.real_time_factor * duration)
+        return self.text
+
+    def transcribe_stream(self, chunks, sample_rate, sample_width):
+        words = self.text.split()
+        for received, _ in enumerate(chunks, start=1):
+            # reveal one more word per chunk, like a streaming recognizer catching up
+            yield " ".join(words[:received]), False
+        yield self.transcribe(sr.AudioData(b"", sample_rate, sample_width)), True
+
+
+BACKENDS = {backend.name: backend for backend in (GoogleBackend, VoskBackend, StubBackend)}
+
+
+def get_backend(name, **options):
+    """Build a backend by name, e.g. get_backend("vosk", model_path="vosk-model-small-en-us")."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name](**options)
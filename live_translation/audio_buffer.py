@@ -0,0 +1,159 @@
+"""
+Preallocated, copy-avoiding audio buffers for the translator's mic stream.
+
+The old path made several full copies of every clip: RxAudio joined the chunks,
+to_wav_bytes() converted 8-bit samples one by one into a new bytes object and
+prepended a header, io.BytesIO wrapped that, and sr.AudioFile/recognizer.record
+parsed it back into raw frames.
+
+Here each chunk is copied exactly once, from the BLE notification into a reusable
+PcmBuffer that leaves room for a WAV header in front of the samples. WAV and raw
+views are memoryview slices of that buffer: the header is packed in place and 8-bit
+samples are flipped between signed (Frame) and unsigned (WAV) in place. A small
+PcmRing holds the VAD's pre-roll without allocating per frame.
+"""
+import struct
+
+import numpy as np
+
+WAV_HEADER_SIZE = 44
+
+
+class PcmBuffer:
+    """
+    One utterance of mono PCM in a preallocated bytearray, with a WAV header slot in front.
+
+    Views returned by pcm(), wav_samples() and wav() share the buffer, so hand the
+    buffer back with release() only once nothing is reading them any more.
+    """
+
+    def __init__(self, capacity, sample_rate=8000, sample_width=1, pool=None):
+        self._buf = bytearray(WAV_HEADER_SIZE + capacity)
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.length = 0
+        self._pool = pool
+        # 8-bit samples currently stored unsigned (WAV) rather than signed (Frame)
+        self._unsigned = False
+
+    def __len__(self):
+        return self.length
+
+    def __getstate__(self):
+        # a copy pickled for a worker process can't go back to this process's pool
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    @property
+    def capacity(self):
+        return len(self._buf) - WAV_HEADER_SIZE
+
+    def append(self, data):
+        """Copy signed PCM samples onto the end of the buffer."""
+        if self._unsigned:
+            self._flip_sign()
+        start = WAV_HEADER_SIZE + self.length
+        end = start + len(data)
+        if end > len(self._buf):
+            # rare: only if an utterance outgrows its max length plus pre-roll
+            self._buf.extend(bytes(max(end - len(self._buf), self.capacity // 2)))
+        self._buf[start:end] = data
+        self.length += len(data)
+
+    def pcm(self):
+        """Signed PCM samples, as Frame sent them."""
+        if self._unsigned:
+            self._flip_sign()
+        return memoryview(self._buf)[WAV_HEADER_SIZE:WAV_HEADER_SIZE + self.length]
+
+    def wav_samples(self):
+        """Samples in WAV encoding (unsigned if 8-bit), e.g. for sr.AudioData."""
+        if self.sample_width == 1 and not self._unsigned:
+            self._flip_sign()
+        return memoryview(self._buf)[WAV_HEADER_SIZE:WAV_HEADER_SIZE + self.length]
+
+    def wav(self):
+        """A complete WAV file, as a view over this buffer."""
+        samples = self.wav_samples()
+        byte_rate = self.sample_rate * self.sample_width
+        struct.pack_into(
+            "<4sI4s4sIHHIIHH4sI", self._buf, 0,
+            b"RIFF", 36 + self.length, b"WAVE",
+            b"fmt ", 16, 1, 1, self.sample_rate, byte_rate, self.sample_width, self.sample_width * 8,
+            b"data", self.length)
+        samples.release()
+        return memoryview(self._buf)[:WAV_HEADER_SIZE + self.length]
+
+    def clear(self):
+        self.length = 0
+        self._unsigned = False
+
+    def release(self):
+        """Return the buffer to its pool for the next utterance."""
+        self.clear()
+        if self._pool is not None:
+            self._pool.give_back(self)
+
+    def _flip_sign(self):
+        # signed <-> unsigned 8-bit is an xor of the top bit; done in place
+        samples = np.frombuffer(self._buf, dtype=np.uint8, count=self.length, offset=WAV_HEADER_SIZE)
+        samples ^= 0x80
+        self._unsigned = not self._unsigned
+
+
+class BufferPool:
+    """Keeps a few released PcmBuffers around so long sessions stop allocating."""
+
+    def __init__(self, capacity, sample_rate=8000, sample_width=1, keep=4):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.keep = keep
+        self.allocated = 0
+        self._free = []
+
+    def acquire(self):
+        if self._free:
+            return self._free.pop()
+        self.allocated += 1
+        return PcmBuffer(self.capacity, self.sample_rate, self.sample_width, pool=self)
+
+    def give_back(self, buffer):
+        if len(self._free) < self.keep:
+            self._free.append(buffer)
+
+
+class PcmRing:
+    """Fixed-size ring holding the most recent samples (the VAD's pre-roll)."""
+
+    def __init__(self, capacity):
+        self._buf = bytearray(capacity)
+        self._pos = 0
+        self.filled = 0
+
+    def write(self, data):
+        capacity = len(self._buf)
+        if len(data) >= capacity:
+            data = data[-capacity:]
+        first = min(len(data), capacity - self._pos)
+        self._buf[self._pos:self._pos + first] = data[:first]
+        self._buf[:len(data) - first] = data[first:]
+        self._pos = (self._pos + len(data)) % capacity
+        self.filled = min(capacity, self.filled + len(data))
+
+    def drain_into(self, target):
+        """Append the buffered samples, oldest first, to a PcmBuffer and empty the ring."""
+        view = memoryview(self._buf)
+        start = (self._pos - self.filled) % len(self._buf)
+        if start + self.filled <= len(self._buf):
+            target.append(view[start:start + self.filled])
+        else:
+            target.append(view[start:])
+            target.append(view[:self._pos])
+        view.release()
+        self.clear()
+
+    def clear(self):
+        self._pos = 0
+        self.filled = 0
@@ -0,0 +1,116 @@
+"""
+Host side of the mic stream format: the AUDIO_CTRL message and a vectorized μ-law decoder.
+
+The Frame app used to start the mic at a hard-wired 8 kHz / 8-bit and stream raw PCM.
+AUDIO_CTRL (0x30) now carries the format after the start/stop byte, so the host picks
+the sample rate, the mic bit depth and the encoding on the air. With "ulaw", lua/mic.lua
+reads 16-bit samples and sends each as one G.711 μ-law byte: 16-bit dynamic range for
+the bytes of 8-bit PCM, or half the bytes of 16-bit PCM.
+
+AUDIO_CTRL payload, big-endian:
+    value (uint8)             1 start, 0 stop (a lone byte is the old TxCode message,
+                              and starts 8 kHz 8-bit PCM)
+    sample_rate (uint16)      8000 or 16000
+    bit_depth (uint8)         8 or 16, the mic's resolution
+    encoding (uint8)          PCM or ULAW
+
+Decoded audio is signed PCM as the VAD and PcmBuffer expect: 8- or 16-bit for PCM,
+16-bit little-endian for μ-law.
+"""
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+AUDIO_CTRL = 0x30
+
+PCM = 0
+ULAW = 1
+ENCODINGS = {"pcm": PCM, "ulaw": ULAW}
+
+SAMPLE_RATES = (8000, 16000)
+BIT_DEPTHS = (8, 16)
+
+# G.711 constants
+_BIAS = 0x84
+_CLIP = 32635
+
+
+def _ulaw_table():
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = ((mantissa << 3) + _BIAS << exponent) - _BIAS
+    return np.where(codes & 0x80, -magnitude, magnitude).astype("<i2")
+
+
+# every μ-law byte's 16-bit sample, so decoding is a single fancy-indexing lookup
+ULAW_TABLE = _ulaw_table()
+
+
+def ulaw_encode(samples):
+    """μ-law bytes for int16 samples, as lua/mic.lua computes them on Frame."""
+    samples = np.asarray(samples, dtype=np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), _CLIP) + _BIAS
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | exponent << 4 | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def ulaw_decode(data):
+    """16-bit little-endian PCM bytes for μ-law bytes."""
+    return ULAW_TABLE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+class AudioFormat(namedtuple("AudioFormat", "sample_rate bit_depth encoding")):
+    """A mic stream format the Frame app can be asked for."""
+
+    __slots__ = ()
+
+    def __new__(cls, sample_rate=8000, bit_depth=8, encoding="pcm"):
+        if sample_rate not in SAMPLE_RATES:
+            raise ValueError(f"sample_rate must be one of {SAMPLE_RATES}, got {sample_rate}")
+        if bit_depth not in BIT_DEPTHS:
+            raise ValueError(f"bit_depth must be one of {BIT_DEPTHS}, got {bit_depth}")
+        if encoding not in ENCODINGS:
+            raise ValueError(f"encoding must be one of {sorted(ENCODINGS)}, got {encoding!r}")
+        if encoding == "ulaw" and bit_depth != 16:
+            raise ValueError("ulaw encodes 16-bit samples, set bit_depth=16")
+        return super().__new__(cls, sample_rate, bit_depth, encoding)
+
+    @property
+    def sample_width(self):
+        """Bytes per sample after decoding on the host."""
+        return 2 if self.encoding == "ulaw" else self.bit_depth // 8
+
+    @property
+    def bytes_per_second(self):
+        """Mic bytes on the air each second, before BLE framing."""
+        bytes_per_sample = 1 if self.encoding == "ulaw" else self.bit_depth // 8
+        return self.sample_rate * bytes_per_sample
+
+    def decode(self, chunk):
+        """Signed PCM for one chunk of the stream."""
+        return ulaw_decode(chunk) if self.encoding == "ulaw" else chunk
+
+    def encode(self, samples):
+        """
+        What Frame sends for int16 samples at this format's rate (for fixtures and
+        benchmarks); 8-bit PCM keeps the top byte, as the mic does.
+        """
+        samples = np.asarray(samples, dtype=np.int16)
+        if self.encoding == "ulaw":
+            return ulaw_encode(samples)
+        if self.bit_depth == 8:
+            return (samples >> 8).astype(np.int8).tobytes()
+        return samples.astype("<i2").tobytes()
+
+
+def audio_ctrl(start, audio_format=None):
+    """AUDIO_CTRL payload that starts the mic in audio_format (default 8 kHz 8-bit PCM), or stops it."""
+    if not start:
+        return bytes([0])
+    audio_format = audio_format or AudioFormat()
+    return struct.pack(">BHBB", 1, audio_format.sample_rate, audio_format.bit_depth,
+                       ENCODINGS[audio_format.encoding])
@@ -0,0 +1,260 @@
+"""
+Translate a phrasebook or signage list ahead of time, and pre-fill the translation cache.
+
+translate_text() takes one string and blocks, which is fine for live speech but slow
+for a few thousand phrases. This reads phrases (one per line, from a file or stdin),
+drops duplicates that only differ in case or spacing, and translates them into each
+target language:
+
+  - with `--concurrency` calls in flight, all through one translator whose HTTP
+    session is kept alive and shared, so connections are reused between phrases
+  - at most `--rate` requests per second (token bucket), so a big list doesn't get
+    the client throttled or banned
+  - retrying failed calls `--retries` times with exponential backoff, waiting for
+    the server's Retry-After when it asks to slow down
+  - through the same TranslationCache as the live translators (translations.db by
+    default), so phrases already known cost nothing and everything translated here
+    is a cache hit later
+
+Each result is written as a JSON line as soon as it completes:
+    {"text": "¿Dónde está el baño?", "target": "en", "translated": "Where is the bathroom?", "detected": "es"}
+
+Backends:
+  google          googletrans, as the live translators use (network)
+  libretranslate  a LibreTranslate-compatible server (POST /translate), e.g. self-hosted
+                  for offline use
+
+Usage:
+    python batch_translate.py phrases.txt --target en,fr --output phrases.jsonl
+    cat signs.txt | python batch_translate.py - --backend libretranslate --url http://localhost:5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from translation_cache import AUTO, CachedTranslator, TranslationCache, normalize
+from workers import BlockingExecutor
+
+CACHE_SIZE = 4096
+CACHE_DB = "translations.db"
+CACHE_TTL = 30 * 24 * 3600
+
+
+class TranslateError(Exception):
+    """A failed translate request; retryable ones may carry the server's Retry-After seconds."""
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class LibreTranslateClient:
+    """
+    LibreTranslate API client with googletrans' translate()/detect() interface, so
+    CachedTranslator can sit in front of it. One keep-alive httpx.Client is shared by
+    every thread that calls it; its pool keeps `connections` open (httpx's default is
+    10, so more workers than that would open a new connection per request).
+    """
+
+    def __init__(self, url="http://localhost:5000", api_key=None, timeout=10.0, connections=8):
+        self.url = url.rstrip("/")
+        self.api_key = api_key
+        # httpx 0.13's names (pinned in requirements.txt, as googletrans needs it)
+        limits = httpx.PoolLimits(max_keepalive=connections, max_connections=connections)
+        self.client = httpx.Client(timeout=timeout, pool_limits=limits)
+
+    def _post(self, path, fields):
+        if self.api_key:
+            fields["api_key"] = self.api_key
+        try:
+            response = self.client.post(self.url + path, json=fields)
+        except httpx.HTTPError as e:
+            raise TranslateError(f"{path}: {e!r}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            raise TranslateError(f"{path}: HTTP {response.status_code}",
+                                 retry_after=float(retry_after) if retry_after else None)
+        if response.status_code != 200:
+            raise TranslateError(f"{path}: HTTP {response.status_code} {response.text[:200]}",
+                                 retryable=False)
+        return response.json()
+
+    def translate(self, text, dest="en", src="auto"):
+        result = self._post("/translate", {"q": text, "source": src, "target": dest, "format": "text"})
+        detected = result.get("detectedLanguage") or {}
+        return SimpleNamespace(text=result["translatedText"], src=detected.get("language", src))
+
+    def detect(self, text):
+        results = self._post("/detect", {"q": text})
+        return SimpleNamespace(lang=results[0]["language"] if results else "unknown")
+
+    def close(self):
+        self.client.close()
+
+
+class RateLimiter:
+    """
+    Token bucket: on average `rate` acquisitions per second, bursts of up to `burst`.
+    The default burst of 1 spaces requests evenly, which is what per-second server
+    limits count.
+    """
+
+    def __init__(self, rate, burst=1.0):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def unique_phrases(lines):
+    """Stripped non-empty lines, without repeats that only differ in case or spacing."""
+    seen = set()
+    phrases = []
+    for line in lines:
+        phrase = line.strip()
+        key = normalize(phrase)
+        if phrase and key not in seen:
+            seen.add(key)
+            phrases.append(phrase)
+    return phrases
+
+
+async def translate_batch(phrases, targets, translator, executor, concurrency=8, rate=None,
+                          retries=4, backoff=0.5, on_result=None):
+    """
+    Translate every phrase into every target with `concurrency` workers; returns counts.
+
+    translator is a CachedTranslator; pairs already in its cache are answered first,
+    the rest are requested with its blocking translate() running on `executor`.
+    on_result(text, target, translated, detected) is called on the event loop as each
+    one completes, with translated None if it failed after all retries.
+    """
+    limiter = RateLimiter(rate)
+    stats = {"jobs": 0, "cached": 0, "translated": 0, "failed": 0, "retries": 0}
+    jobs = asyncio.Queue()
+    for phrase in phrases:
+        for target in targets:
+            stats["jobs"] += 1
+            hit = translator.cache.get(phrase, AUTO, target)
+            if hit is None:
+                jobs.put_nowait((phrase, target))
+                continue
+            stats["cached"] += 1
+            if on_result is not None:
+                on_result(phrase, target, *hit)
+
+    async def translate_one(phrase, target):
+        for attempt in range(retries + 1):
+            await limiter.acquire()
+            try:
+                return await executor.run(translator.translate, phrase, target)
+            except Exception as e:
+                retryable = getattr(e, "retryable", True)
+                if not retryable or attempt == retries:
+                    print(f"❌ {phrase!r} → {target}: {e}", file=sys.stderr)
+                    return None, "unknown"
+                stats["retries"] += 1
+                delay = getattr(e, "retry_after", None) or backoff * 2 ** attempt
+                await asyncio.sleep(delay * random.uniform(1.0, 1.25))
+
+    async def worker():
+        while not jobs.empty():
+            phrase, target = jobs.get_nowait()
+            translated, detected = await translate_one(phrase, target)
+            stats["translated" if translated else "failed"] += 1
+            if on_result is not None:
+                on_result(phrase, target, translated, detected)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, jobs.qsize()))))
+    return stats
+
+
+def make_translator(args):
+    if args.backend == "libretranslate":
+        return LibreTranslateClient(args.url, args.api_key, args.timeout, args.concurrency)
+    # googletrans keeps one HTTP/2 connection and multiplexes the workers over it
+    from googletrans import Translator
+    return Translator(timeout=args.timeout)
+
+
+async def run(args, lines, out):
+    phrases = unique_phrases(lines)
+    targets = [target.strip() for target in args.target.split(",") if target.strip()]
+    print(f"📖 {len(phrases)} phrases ({len(lines) - len(phrases)} duplicate or blank lines dropped) "
+          f"→ {', '.join(targets)} via {args.backend}", file=sys.stderr)
+
+    cache = TranslationCache(CACHE_SIZE, args.cache_db, CACHE_TTL)
+    client = make_translator(args)
+    translator = CachedTranslator(client, cache)
+    executor = BlockingExecutor("thread", args.concurrency, args.timeout * 2)
+
+    def write(text, target, translated, detected):
+        out.write(json.dumps({"text": text, "target": target, "translated": translated,
+                              "detected": detected}, ensure_ascii=False) + "\n")
+        out.flush()
+
+    start = time.perf_counter()
+    try:
+        stats = await translate_batch(phrases, targets, translator, executor, args.concurrency,
+                                      args.rate, args.retries, on_result=write)
+    finally:
+        executor.shutdown()
+        cache.close()
+        if hasattr(client, "close"):
+            client.close()
+    elapsed = time.perf_counter() - start
+    print(f"✅ {stats['translated'] + stats['cached']}/{stats['jobs']} done in {elapsed:.1f}s "
+          f"({stats['cached']} from the cache, {stats['translated']} requested at "
+          f"{stats['translated'] / elapsed:.1f}/s), {stats['retries']} retries, "
+          f"{stats['failed']} failed", file=sys.stderr)
+    return stats
+
+
+def main(args):
+    if args.input == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            asyncio.run(run(args, lines, out))
+    else:
+        asyncio.run(run(args, lines, sys.stdout))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", help="text file with one phrase per line, or - for stdin")
+    parser.add_argument("--target", default="en", help="target language(s), comma separated")
+    parser.add_argument("--output", help="JSON lines output file (default: stdout)")
+    parser.add_argument("--backend", choices=("google", "libretranslate"), default="google")
+    parser.add_argument("--url", default="http://localhost:5000", help="LibreTranslate server")
+    parser.add_argument("--api-key", help="LibreTranslate API key")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--rate", type=float, default=10, help="requests per second, 0 for no limit")
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=10, help="seconds per request")
+    parser.add_argument("--cache-db", default=CACHE_DB, help="translation cache to read and pre-fill")
+    main(parser.parse_args())
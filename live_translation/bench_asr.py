@@ -0,0 +1,119 @@
+"""
+Latency and throughput of the ASR backends over a folder of WAV fixtures.
+
+Each backend is warmed up once (timed separately), then transcribes every *.wav in the
+folder one at a time and again as a single batch. Reported per backend: warm-up time,
+per-file latency, real-time factor (processing time / audio length) and clips per
+second. If a fixture has a sidecar .txt transcript, word error rate is shown too.
+
+Usage:
+    python bench_asr.py fixtures/ --backend google --backend vosk --vosk-model vosk-model-small-en-us-0.15
+    python bench_asr.py --generate fixtures/    # write synthetic clips to try the stub backend
+"""
+import argparse
+import statistics
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+import speech_recognition as sr
+
+from asr_backends import BACKENDS, get_backend
+
+
+def load_fixtures(folder):
+    fixtures = []
+    for path in sorted(Path(folder).glob("*.wav")):
+        with sr.AudioFile(str(path)) as source:
+            audio = sr.Recognizer().record(source)
+        transcript = path.with_suffix(".txt")
+        reference = transcript.read_text().strip() if transcript.exists() else None
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        fixtures.append((path.name, audio, duration, reference))
+    return fixtures
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    # word-level edit distance, one row at a time
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, start=1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, start=1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1] / max(len(ref), 1)
+
+
+def generate_fixtures(folder, count=5, sample_rate=8000):
+    """Write tone-burst WAVs (8 kHz 8-bit, like Frame's mic) with stub transcripts."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(3)
+    for n in range(count):
+        seconds = 1 + 1.5 * n
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        signal = 0.4 * np.sin(2 * np.pi * 180 * t) + 0.02 * rng.standard_normal(len(t))
+        samples = (np.clip(signal, -1, 1) * 127 + 128).astype(np.uint8)
+        with wave.open(str(folder / f"clip{n:02d}.wav"), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(1)
+            wav.setframerate(sample_rate)
+            wav.writeframes(samples.tobytes())
+        (folder / f"clip{n:02d}.txt").write_text("hola, ¿cómo estás?\n")
+    print(f"Wrote {count} clips to {folder}")
+
+
+def bench(backend, fixtures):
+    start = time.perf_counter()
+    backend.warm_up()
+    warm_up = time.perf_counter() - start
+
+    latencies, errors = [], []
+    for name, audio, duration, reference in fixtures:
+        start = time.perf_counter()
+        text = backend.transcribe(audio)
+        latencies.append(time.perf_counter() - start)
+        if reference is not None:
+            errors.append(word_error_rate(reference, text))
+
+    start = time.perf_counter()
+    backend.transcribe_batch([audio for _, audio, _, _ in fixtures])
+    batch = time.perf_counter() - start
+
+    audio_seconds = sum(duration for _, _, duration, _ in fixtures)
+    wer = f"{statistics.mean(errors) * 100:5.1f}%" if errors else "    -"
+    print(f"{backend.name:<8} {warm_up * 1000:8.0f}ms {statistics.mean(latencies) * 1000:8.0f}ms "
+          f"{max(latencies) * 1000:8.0f}ms {sum(latencies) / audio_seconds:6.2f} "
+          f"{len(fixtures) / sum(latencies):7.1f}/s {len(fixtures) / batch:7.1f}/s {wer:>6}")
+
+
+def main(args):
+    if args.generate:
+        generate_fixtures(args.folder)
+        return
+    fixtures = load_fixtures(args.folder)
+    if not fixtures:
+        print(f"No .wav files in {args.folder}")
+        return
+    total = sum(duration for _, _, duration, _ in fixtures)
+    print(f"{len(fixtures)} fixtures, {total:.1f}s of audio\n")
+    print(f"{'backend':<8} {'warm-up':>10} {'mean':>10} {'max':>10} {'RTF':>6} "
+          f"{'serial':>9} {'batch':>9} {'WER':>6}")
+
+    options = {"vosk": {"model_path": args.vosk_model}} if args.vosk_model else {}
+    for name in args.backend or ["stub"]:
+        try:
+            bench(get_backend(name, **options.get(name, {})), fixtures)
+        except Exception as e:
+            print(f"{name:<8} failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("folder", help="folder of .wav fixtures (with optional .txt transcripts)")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="backend to run; repeat for several (default: stub)")
+    parser.add_argument("--vosk-model", help="path to an unpacked Vosk model")
+    parser.add_argument("--generate", action="store_true", help="write synthetic fixtures to folder and exit")
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+"""
+Memory and allocation cost of getting mic audio from BLE chunks to an sr.AudioData.
+
+Simulates a long session of utterances (1-6 s of 8 kHz 8-bit audio each) arriving in
+240-byte RxAudio chunks, and runs each through:
+
+  old   BytesIO accumulation -> RxAudio.to_wav_bytes() -> io.BytesIO -> sr.AudioFile
+        -> recognizer.record()   (the translator's original path)
+  new   pooled PcmBuffer -> in-place WAV view -> sr.AudioData
+
+and reports wall time, tracemalloc peak and the number of clip-sized buffers allocated.
+
+Usage: python bench_audio_buffer.py [--minutes 10]
+"""
+import argparse
+import io
+import random
+import time
+import tracemalloc
+
+import speech_recognition as sr
+from frame_msg import RxAudio
+
+from audio_buffer import BufferPool
+
+SAMPLE_RATE = 8000
+CHUNK = 240
+MAX_UTTERANCE_BYTES = 15 * SAMPLE_RATE
+
+
+def session(minutes, seed=7):
+    """Utterance lengths (bytes) adding up to roughly `minutes` of speech."""
+    rng = random.Random(seed)
+    lengths, total = [], 0
+    while total < minutes * 60 * SAMPLE_RATE:
+        lengths.append(rng.randint(1 * SAMPLE_RATE, 6 * SAMPLE_RATE))
+        total += lengths[-1]
+    return lengths
+
+
+def old_path(lengths, chunk):
+    allocations = 0
+    for length in lengths:
+        clip = io.BytesIO()
+        for offset in range(0, length, CHUNK):
+            clip.write(chunk[:min(CHUNK, length - offset)])
+        wav_bytes = RxAudio.to_wav_bytes(clip.getvalue())
+        with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+            audio = sr.Recognizer().record(source)
+        # clip buffer, getvalue, converted samples, header + samples, record()'s frames
+        allocations += 5
+        del audio
+    return allocations
+
+
+def new_path(lengths, chunk):
+    pool = BufferPool(MAX_UTTERANCE_BYTES, SAMPLE_RATE)
+    for length in lengths:
+        buffer = pool.acquire()
+        for offset in range(0, length, CHUNK):
+            buffer.append(chunk[:min(CHUNK, length - offset)])
+        audio = sr.AudioData(buffer.wav_samples(), SAMPLE_RATE, 1)
+        del audio
+        buffer.release()
+    return pool.allocated
+
+
+def measure(label, fn, lengths):
+    chunk = bytes(random.Random(1).randrange(256) for _ in range(CHUNK))
+    tracemalloc.start()
+    start = time.perf_counter()
+    allocations = fn(lengths, chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<4} {elapsed:7.2f}s  peak {peak / 1024:8.0f} KiB  "
+          f"clip-sized allocations {allocations:6d}")
+
+
+def main(args):
+    lengths = session(args.minutes)
+    print(f"{len(lengths)} utterances, {sum(lengths) / SAMPLE_RATE / 60:.1f} min of audio\n")
+    measure("old", old_path, lengths)
+    measure("new", new_path, lengths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=10, help="minutes of speech to simulate")
+    main(parser.parse_args())
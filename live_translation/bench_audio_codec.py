@@ -0,0 +1,119 @@
+"""
+Bytes per second of speech and ASR accuracy for each mic stream format.
+
+Every *.wav fixture in the folder (ideally 16 kHz 16-bit recordings, with optional .txt
+transcripts as for bench_asr.py) is resampled to each format's rate, encoded the way
+Frame sends it, decoded on the host as FrameMicStream does and transcribed. Reported
+per format: bytes per second on the air, BLE notifications per second, signal-to-noise
+ratio of the decoded audio against the 16-bit original, host decode cost and, for
+fixtures with a transcript, word error rate.
+
+Usage:
+    python bench_audio_codec.py fixtures/ --backend google
+    python bench_audio_codec.py fixtures/ --backend vosk --vosk-model vosk-model-small-en-us-0.15
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+import speech_recognition as sr
+
+from asr_backends import BACKENDS, get_backend
+from audio_codec import AudioFormat
+from bench_asr import word_error_rate
+from mic_listener import read_wav
+
+FORMATS = {
+    "16k 16-bit": AudioFormat(16000, 16, "pcm"),
+    "16k ulaw": AudioFormat(16000, 16, "ulaw"),
+    "8k 16-bit": AudioFormat(8000, 16, "pcm"),
+    "8k ulaw": AudioFormat(8000, 16, "ulaw"),
+    "8k 8-bit": AudioFormat(8000, 8, "pcm"),
+}
+
+
+def resample(samples, rate, new_rate):
+    if rate == new_rate:
+        return samples
+    positions = np.arange(int(len(samples) * new_rate / rate)) * rate / new_rate
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+
+def snr_db(reference, decoded):
+    noise = np.sum((reference.astype(np.float64) - decoded) ** 2)
+    if noise == 0:
+        return np.inf
+    return 10 * np.log10(np.sum(reference.astype(np.float64) ** 2) / noise)
+
+
+def to_int16(pcm, audio_format):
+    if audio_format.sample_width == 1:
+        return np.frombuffer(pcm, dtype=np.int8).astype(np.int16) << 8
+    return np.frombuffer(pcm, dtype="<i2")
+
+
+def run(name, audio_format, fixtures, backend, mtu):
+    snrs, errors = [], []
+    decode_time = audio_seconds = 0.0
+    for path, samples, rate, reference in fixtures:
+        samples = resample(samples, rate, audio_format.sample_rate)
+        sent = audio_format.encode(samples)
+
+        start = time.perf_counter()
+        pcm = audio_format.decode(sent)
+        decode_time += time.perf_counter() - start
+        audio_seconds += len(samples) / audio_format.sample_rate
+
+        snrs.append(snr_db(samples, to_int16(pcm, audio_format)))
+        if backend and reference is not None:
+            # WAV 8-bit is unsigned, Frame's is signed
+            wav_pcm = (np.frombuffer(pcm, dtype=np.int8).astype(np.int16) + 128).astype(np.uint8).tobytes() \
+                if audio_format.sample_width == 1 else pcm
+            text = backend.transcribe(sr.AudioData(wav_pcm, audio_format.sample_rate, audio_format.sample_width))
+            errors.append(word_error_rate(reference, text))
+
+    per_second = audio_format.bytes_per_second
+    snr = statistics.mean(snrs)
+    snr = f"{snr:6.1f}dB" if np.isfinite(snr) else "lossless"
+    wer = f"{statistics.mean(errors) * 100:5.1f}%" if errors else "    -"
+    print(f"{name:<11} {per_second:>7} B/s {per_second / (mtu - 1):6.1f}/s {snr:>8} "
+          f"{decode_time / audio_seconds * 1e6:8.1f}us {wer:>6}")
+
+
+def main(args):
+    fixtures = []
+    for path in sorted(Path(args.folder).glob("*.wav")):
+        samples, rate = read_wav(path)
+        transcript = path.with_suffix(".txt")
+        reference = transcript.read_text().strip() if transcript.exists() else None
+        fixtures.append((path, samples, rate, reference))
+    if not fixtures:
+        print(f"No .wav files in {args.folder}")
+        return
+
+    rates = sorted({rate for _, _, rate, _ in fixtures})
+    total = sum(len(samples) / rate for _, samples, rate, _ in fixtures)
+    print(f"{len(fixtures)} fixtures at {', '.join(map(str, rates))} Hz, {total:.1f}s of audio, "
+          f"{args.mtu} B MTU")
+    if max(rates) < 16000:
+        print("(16 kHz formats are upsampled from 8 kHz fixtures, so they can't be more accurate)")
+
+    backend = None
+    if args.backend:
+        options = {"model_path": args.vosk_model} if args.backend == "vosk" and args.vosk_model else {}
+        backend = get_backend(args.backend, **options)
+        backend.warm_up()
+    print(f"\n{'format':<11} {'on air':>11} {'notify':>8} {'SNR':>8} {'decode/s':>10} {'WER':>6}")
+    for name, audio_format in FORMATS.items():
+        run(name, audio_format, fixtures, backend, args.mtu)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("folder", help="folder of .wav fixtures (with optional .txt transcripts)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), help="ASR backend for word error rate")
+    parser.add_argument("--vosk-model", help="path to an unpacked Vosk model")
+    parser.add_argument("--mtu", type=int, default=244, help="BLE notification size")
+    main(parser.parse_args())
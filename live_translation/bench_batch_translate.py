@@ -0,0 +1,215 @@
+"""
+Throughput of batch_translate.py against a local mock LibreTranslate server.
+
+The mock server (stdlib, HTTP/1.1 keep-alive, one thread per connection) answers
+POST /translate after `--latency-ms`, refuses requests beyond `--server-rate` per
+second with 429 + Retry-After, and fails `--error-rate` of the others with 503. It
+counts the TCP connections it accepts, which shows whether the client reuses them.
+
+A generated phrasebook with repeats (case and spacing variants) is translated:
+  one at a time     translate_text()-style: a blocking call per phrase with a new
+                    HTTP connection each time
+  batch c=N         translate_batch() with N workers over one shared keep-alive
+                    client, the rate limiter and retries
+Each run starts from an empty cache and every result is checked, then it is run again
+to show everything coming from the pre-filled cache. With --server-rate and no --rate,
+workers outrun the server's limit and spend their retries on 429s.
+
+Usage:
+    python bench_batch_translate.py [--phrases 300] [--latency-ms 40] [--concurrency 1,4,16]
+    python bench_batch_translate.py --server-rate 50 --rate 45 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from batch_translate import LibreTranslateClient, translate_batch, unique_phrases
+from translation_cache import CachedTranslator, TranslationCache
+from workers import BlockingExecutor
+
+WORDS = ("where is the station museum bathroom exit ticket price open closed today left right "
+         "please thank you platform entrance water hotel street map help stop next last").split()
+
+
+class MockServer(ThreadingHTTPServer):
+    """LibreTranslate's POST /translate, with modelled latency, throttling and errors."""
+
+    daemon_threads = True
+
+    def __init__(self, latency, server_rate, error_rate, seed=0):
+        super().__init__(("127.0.0.1", 0), MockHandler)
+        self.latency = latency
+        self.server_rate = server_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []
+        self.reset()
+
+    def reset(self):
+        self.connections = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def admit(self):
+        """'ok', 'throttled' or 'error' for a request arriving now."""
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            self.window = [t for t in self.window if now - t < 1.0]
+            if self.server_rate and len(self.window) >= self.server_rate:
+                self.throttled += 1
+                return "throttled"
+            self.window.append(now)
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                return "error"
+            return "ok"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out as separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        fields = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        outcome = self.server.admit()
+        if outcome == "throttled":
+            self._reply(429, {"error": "Slowdown"}, {"Retry-After": "1"})
+            return
+        time.sleep(self.server.latency)
+        if outcome == "error":
+            self._reply(503, {"error": "Unavailable"})
+            return
+        self._reply(200, {"translatedText": f"[{fields['target']}] {fields['q']}",
+                          "detectedLanguage": {"confidence": 90, "language": "es"}})
+
+    def _reply(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in dict(headers).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def phrasebook(count, repeat, seed=1):
+    """`count` lines of which about `repeat` are case/spacing variants of earlier ones."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        if lines and rng.random() < repeat:
+            line = rng.choice(lines)
+            lines.append(rng.choice((line.upper(), line.title(), "  " + line.replace(" ", "  "))))
+        else:
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))))
+    return lines
+
+
+def one_at_a_time(server, phrases, targets):
+    """A blocking call per phrase, each on a fresh connection, as translate_text() loops would."""
+    for phrase in phrases:
+        for target in targets:
+            for _ in range(5):
+                response = httpx.post(server.url + "/translate", json={"q": phrase, "source": "auto",
+                                                                       "target": target})
+                if response.status_code == 200:
+                    break
+                time.sleep(float(response.headers.get("Retry-After", 0.5)))
+
+
+async def batch(server, phrases, targets, concurrency, args, cache):
+    client = LibreTranslateClient(server.url, connections=concurrency)
+    executor = BlockingExecutor("thread", concurrency, 30)
+    results = {}
+
+    def collect(text, target, translated, detected):
+        results[text, target] = translated
+
+    try:
+        stats = await translate_batch(phrases, targets, CachedTranslator(client, cache), executor,
+                                      concurrency, args.rate, args.retries, on_result=collect)
+    finally:
+        executor.shutdown()
+        client.close()
+    # failed ones (None) are counted in stats; anything else must be the right translation
+    wrong = [key for key, value in results.items() if value not in (None, f"[{key[1]}] {key[0]}")]
+    assert len(results) == len(phrases) * len(targets) and not wrong, f"bad results: {wrong[:3]}"
+    return stats
+
+
+def report(label, server, jobs, elapsed, stats=None):
+    if stats is not None:
+        extra = f" {stats['cached']:>6} {stats['retries']:>7} {stats['failed']:>6}"
+    else:
+        extra = f" {'-':>6} {'-':>7} {'-':>6}"
+    print(f"{label:<16} {jobs / elapsed:8.1f}/s {elapsed:7.2f}s {server.requests:>8} "
+          f"{server.connections:>6} {server.throttled:>9}{extra}")
+
+
+def main(args):
+    lines = phrasebook(args.phrases, args.repeat)
+    phrases = unique_phrases(lines)
+    targets = args.target.split(",")
+    jobs = len(phrases) * len(targets)
+    server = MockServer(args.latency_ms / 1000, args.server_rate, args.error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{len(lines)} lines, {len(phrases)} unique phrases × {len(targets)} targets = {jobs} translations; "
+          f"mock server {args.latency_ms:.0f} ms per request, "
+          f"{args.server_rate or 'no'} req/s limit, {args.error_rate:.0%} errors; client rate limit "
+          f"{args.rate or 'off'}\n")
+    print(f"{'run':<16} {'throughput':>10} {'time':>8} {'requests':>8} {'conns':>6} {'throttled':>9} "
+          f"{'cached':>6} {'retries':>7} {'failed':>6}")
+
+    if not args.skip_sequential:
+        server.reset()
+        start = time.perf_counter()
+        one_at_a_time(server, phrases, targets)
+        report("one at a time", server, jobs, time.perf_counter() - start)
+
+    for concurrency in map(int, args.concurrency.split(",")):
+        cache = TranslationCache(maxsize=jobs * 2)
+        for label in (f"batch c={concurrency}", "  again (cached)"):
+            server.reset()
+            start = time.perf_counter()
+            stats = asyncio.run(batch(server, phrases, targets, concurrency, args, cache))
+            report(label, server, jobs, time.perf_counter() - start, stats)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--phrases", type=int, default=300, help="lines in the generated phrasebook")
+    parser.add_argument("--repeat", type=float, default=0.3, help="fraction of lines repeating an earlier one")
+    parser.add_argument("--target", default="en,fr")
+    parser.add_argument("--latency-ms", type=float, default=40, help="mock server time per request")
+    parser.add_argument("--server-rate", type=float, default=0, help="mock server requests/s before 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 503")
+    parser.add_argument("--concurrency", default="1,4,16", help="worker counts to compare")
+    parser.add_argument("--rate", type=float, default=0, help="client rate limit, requests/s (0 for none)")
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--skip-sequential", action="store_true", help="skip the one-at-a-time baseline")
+    main(parser.parse_args())
@@ -0,0 +1,79 @@
+"""
+Measures how long the asyncio event loop stalls while backend calls are running.
+
+A heartbeat task wakes every few milliseconds (standing in for BLE notification
+handlers) and records how late it was. The same fake backend call - a blocking
+network wait followed by some CPU work, like recognize_google() - is then made
+inline on the loop ("before") and through BlockingExecutor ("after").
+
+Usage: python bench_event_loop.py [--calls 5] [--io 0.3] [--cpu 0.1]
+"""
+import argparse
+import asyncio
+import time
+
+from workers import BlockingExecutor
+
+HEARTBEAT_INTERVAL = 0.005
+
+
+def fake_backend_call(io_seconds, cpu_seconds):
+    """Blocks like a network request, then burns CPU like decoding the response."""
+    time.sleep(io_seconds)
+    end = time.perf_counter() + cpu_seconds
+    while time.perf_counter() < end:
+        pass
+    return "ok"
+
+
+async def heartbeat(lags, stop):
+    while not stop.is_set():
+        expected = time.perf_counter() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def measure(label, call, calls):
+    lags = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await beat
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    stalled = sum(lag for lag in lags if lag > HEARTBEAT_INTERVAL)
+    print(f"{label:<10} wall={elapsed:6.2f}s  heartbeats={len(lags):5d}  "
+          f"max stall={max(lags, default=0) * 1000:7.1f}ms  p99={p99 * 1000:7.1f}ms  "
+          f"total stalled={stalled:6.2f}s")
+
+
+async def main(args):
+    print(f"{args.calls} calls, each {args.io}s blocking I/O + {args.cpu}s CPU\n")
+
+    async def inline():
+        fake_backend_call(args.io, args.cpu)
+
+    await measure("inline", inline, args.calls)
+
+    for kind in ("thread", "process"):
+        with BlockingExecutor(kind, max_workers=2, timeout=30) as executor:
+            async def pooled():
+                await executor.run(fake_backend_call, args.io, args.cpu)
+
+            await measure(kind, pooled, args.calls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--io", type=float, default=0.3, help="seconds of blocking I/O per call")
+    parser.add_argument("--cpu", type=float, default=0.1, help="seconds of CPU work per call")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,131 @@
+"""
+Group translator fan-out over fake headsets: one guide, N Frames, mixed languages.
+
+group_translator.py main() runs against FakeFrameMsg transports. The guide's fake
+mic streams speech-like bursts, a stub ASR and a fake Google answer, one headset
+has a slow link and another drops out of range partway through. Reported per
+headset: its link, whether it stayed online, display messages and errors, lag from
+a translation being ready to it reaching the Frame, and whether the last text it
+shows is the translation into its language. Also reported: translate calls made,
+against one per utterance per headset with a translator.py per headset.
+
+Usage:
+    python bench_fanout.py [--languages -,en,fr,en,de,fr] [--utterances 4]
+    python bench_fanout.py --slow 2 --slow-packet-ms 200 --drop 3 --drop-after 4 --hang
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+from frame_common.bench_e2e import apply_text_messages, speech_bursts, working_dir
+from frame_common.fake_frame import FakeFrameMsg
+
+TRANSCRIPT = "hola, ¿cómo estás?"
+
+
+def expected(language):
+    return TRANSCRIPT if language is None else f"[{language}] hello, how are you?"
+
+
+async def session(args, languages):
+    import group_translator
+    import translator
+    from asr_backends import StubBackend
+    from frame_common.metrics import Metrics
+    from translation_cache import CachedTranslator, TranslationCache
+
+    calls = []
+
+    class FakeGoogle:
+        def translate(self, text, dest):
+            calls.append(dest)
+            time.sleep(args.translate_ms / 1000)
+            return SimpleNamespace(text=expected(dest), src="es")
+
+    audio_format = translator.AUDIO_FORMAT
+    gap = np.zeros(audio_format.sample_rate, dtype=np.int16)
+    stream = np.concatenate([part for clip in speech_bursts(args.utterances, audio_format.sample_rate)
+                             for part in (gap, clip)] + [gap])
+
+    translator.asr = StubBackend(TRANSCRIPT, latency=args.asr_ms / 1000)
+    # in memory, so every phrase is a cache miss only the first time per language
+    translator.translator = CachedTranslator(FakeGoogle(), TranslationCache())
+    translator.metrics = Metrics()
+    group_translator.HEADSETS = [{"name": f"Frame {i:02X}", "language": language}
+                                 for i, language in enumerate(languages)]
+    group_translator.GUIDE = 0
+
+    frames = []
+    for i in range(len(languages)):
+        packet_ms = args.slow_packet_ms if i == args.slow else args.packet_ms
+        frames.append(FakeFrameMsg(packet_ms=packet_ms, ready_message="Frame Lua app running",
+                                   mic_audio=audio_format.encode(stream) if i == 0 else b"",
+                                   mic_speed=args.mic_speed, seed=i))
+
+    async def drop_later():
+        await asyncio.sleep(args.drop_after)
+        frames[args.drop].drop(hang=args.hang)
+
+    dropper = asyncio.create_task(drop_later()) if args.drop is not None else None
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with working_dir(HERE), output:
+        start = time.perf_counter()
+        fanout = await group_translator.main(frames, max_utterances=args.utterances)
+        elapsed = time.perf_counter() - start
+    if dropper is not None:
+        dropper.cancel()
+    return fanout, frames, calls, elapsed, translator.metrics
+
+
+def main(args):
+    languages = [None if language == "-" else language for language in args.languages.split(",")]
+    fanout, frames, calls, elapsed, metrics = asyncio.run(session(args, languages))
+
+    print(f"{len(languages)} headsets, {args.utterances} utterances, session {elapsed:.1f}s\n")
+    print(f"{'headset':<10} {'language':<11} {'link':>7} {'state':<8} {'sent':>5} {'errors':>6} "
+          f"{'lag p50':>8} {'lag max':>8}  last text")
+    for headset, frame in zip(fanout.headsets, frames):
+        shown = apply_text_messages(frame.messages)
+        if frame.dropped:
+            check = "(dropped)"
+        else:
+            check = "✅" if shown == expected(headset.language) else f"❌ {shown!r}"
+        display = headset.display
+        print(f"{headset.name:<10} {headset.language or 'transcript':<11} {frame.packet_s * 1000:5.0f}ms "
+              f"{'online' if headset.online else 'offline':<8} {display.sent:>5} {display.errors:>6} "
+              f"{headset.lag.quantile(0.5) * 1000:6.0f}ms {headset.lag.max * 1000:6.0f}ms  {check}")
+
+    requested = sum(fanout.requests.values())
+    per_headset = args.utterances * sum(1 for language in languages if language is not None)
+    print(f"\nTranslate calls: {requested} ({', '.join(f'{lang}={n}' for lang, n in sorted(fanout.requests.items()))}), "
+          f"{per_headset} with a translator.py per headset; {len(calls)} reached Google past the cache")
+    for stage in ("asr", "translate", "end_to_end"):
+        if stage in metrics.histograms:
+            print(f"{stage:<11} p50 {metrics.histograms[stage].quantile(0.5) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--languages", default="-,en,fr,en,de,fr",
+                        help="each headset's language, '-' for the untranslated transcript; the first is the guide")
+    parser.add_argument("--utterances", type=int, default=4)
+    parser.add_argument("--packet-ms", type=float, default=15, help="time per acknowledged packet")
+    parser.add_argument("--slow", type=int, default=2, help="index of the headset with a slow link")
+    parser.add_argument("--slow-packet-ms", type=float, default=150)
+    parser.add_argument("--drop", type=int, default=3, help="index of the headset that drops out")
+    parser.add_argument("--drop-after", type=float, default=3, help="seconds into the session")
+    parser.add_argument("--hang", action="store_true", help="the dropped headset's sends hang instead of failing")
+    parser.add_argument("--mic-speed", type=float, default=2, help="fake mic speed vs real time")
+    parser.add_argument("--asr-ms", type=float, default=50, help="stub ASR latency")
+    parser.add_argument("--translate-ms", type=float, default=150, help="fake translate latency")
+    parser.add_argument("--verbose", action="store_true", help="show the translator's own output")
+    main(parser.parse_args())
@@ -0,0 +1,148 @@
+"""
+Phrases heard and speech-to-display latency of translator_mac.py's background listening.
+
+A WAV file (by default bench_vad.py's synthetic script of phrases and pauses) is
+played through FileSource as the microphone into listen_in_background(), with a stub
+ASR, a fake translator and a fake Frame whose display calls are timestamped. Each
+phrase's latency is the time from the end of its speech to its translation being
+drawn.
+
+For comparison, the old per-utterance loop is modelled on the same script: reopen
+the mic, calibrate for 0.5 s, listen until 0.8 s of silence, then transcribe,
+translate and scroll the text with the mic closed. A phrase that starts while the
+mic is closed or calibrating is clipped; one that ends before listening resumes is
+missed entirely.
+
+Usage:
+    python bench_mic_listener.py [--asr-ms 400] [--translate-ms 150]
+    python bench_mic_listener.py --wav phrases.wav --phrases 0.4-1.2,3.0-5.1
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+import bench_vad
+from asr_backends import StubBackend
+from mic_listener import FileSource
+
+# the old loop's fixed costs
+CALIBRATION_S = 0.5          # adjust_for_ambient_noise(source, duration=0.5)
+PAUSE_THRESHOLD_S = 0.8      # sr.Recognizer's default silence that ends listen()
+READY_PAUSE_S = 1.0          # asyncio.sleep(1) before the next recording
+
+
+class FakeFrame:
+    """The frame_sdk calls display_text_scroll() makes, timestamped."""
+
+    def __init__(self, lua_ms=20):
+        self.lua_s = lua_ms / 1000
+        self.shown = []
+
+    async def run_lua(self, lua, checked=False, await_print=False):
+        await asyncio.sleep(self.lua_s)
+        if await_print:
+            return "100 / 20"
+        self.shown.append(time.monotonic())
+
+
+def synthetic_script(path):
+    """Write bench_vad's phrase script as a 16-bit WAV; returns the (start, end) of each phrase."""
+    pcm, speech_ends = bench_vad.build_stream(np.random.default_rng(1))
+    samples = np.frombuffer(pcm, dtype=np.int8).astype(np.int16) << 8
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(bench_vad.SAMPLE_RATE)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return [(end - speech, end) for end, (_, speech) in zip(speech_ends, bench_vad.SCRIPT)]
+
+
+def per_utterance_model(phrases, processing_s, reopen_s):
+    """(start, end, latency or None, clipped) for each phrase under the old listen() loop."""
+    results = []
+    listening_from = reopen_s + CALIBRATION_S
+    for start, end in phrases:
+        if end <= listening_from:
+            results.append((start, end, None, False))
+            continue
+        done = end + PAUSE_THRESHOLD_S + processing_s
+        results.append((start, end, done - end, start < listening_from))
+        listening_from = done + READY_PAUSE_S + reopen_s + CALIBRATION_S
+    return results
+
+
+async def background(args, wav_path, phrases):
+    import translator_mac
+    from frame_common.metrics import Metrics
+
+    class FakeTranslator:
+        def translate(self, text, target):
+            time.sleep(args.translate_ms / 1000)
+            return "hello, how are you?", "es"
+
+    translator_mac.asr = StubBackend(latency=args.asr_ms / 1000)
+    translator_mac.translator = FakeTranslator()
+    translator_mac.metrics = Metrics()
+    frame = FakeFrame()
+    source = FileSource(wav_path, speed=1.0)
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.monotonic()
+    with output:
+        await translator_mac.listen_in_background(frame, source=source)
+    shown = [t - start for t in frame.shown]
+    return shown, translator_mac.metrics
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.wav:
+            wav_path = args.wav
+            phrases = [tuple(map(float, span.split("-"))) for span in args.phrases.split(",")]
+        else:
+            wav_path = Path(scratch) / "script.wav"
+            phrases = synthetic_script(wav_path)
+        shown, metrics = asyncio.run(background(args, wav_path, phrases))
+
+    # a page takes scroll_delay * 1.5 on screen before the old loop listens again
+    processing_s = (args.asr_ms + args.translate_ms) / 1000 + 3.0
+    model = per_utterance_model(phrases, processing_s, args.reopen_ms / 1000)
+
+    print(f"{len(phrases)} phrases, {args.asr_ms:.0f} ms ASR, {args.translate_ms:.0f} ms translate, "
+          f"3 s on screen per translation\n")
+    print(f"{'phrase':>13} {'background':>11} {'per utterance':>14}")
+    remaining = list(shown)
+    for (start, end), (_, _, old, clipped) in zip(phrases, model):
+        drawn = next((t for t in remaining if t >= end), None)
+        if drawn is not None:
+            remaining.remove(drawn)
+        new = f"{drawn - end:10.2f}s" if drawn is not None else f"{'missed':>11}"
+        old = f"{'missed':>14}" if old is None else f"{old:12.2f}s" + ("*" if clipped else " ")
+        print(f"{start:5.1f}-{end:5.1f}s {new} {old}")
+
+    heard = sum(1 for _, _, latency, clipped in model if latency is not None and not clipped)
+    print(f"\nbackground: {len(shown)}/{len(phrases)} phrases shown; "
+          f"per utterance: {heard}/{len(phrases)} heard whole (* clipped)")
+    for line in metrics.report():
+        print(f"📈 {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--wav", help="WAV file to use as the microphone instead of the synthetic script")
+    parser.add_argument("--phrases", help="start-end seconds of each phrase in --wav, comma separated")
+    parser.add_argument("--asr-ms", type=float, default=400, help="stub ASR latency")
+    parser.add_argument("--translate-ms", type=float, default=150, help="fake translate latency")
+    parser.add_argument("--reopen-ms", type=float, default=100, help="modelled cost of opening the mic")
+    parser.add_argument("--verbose", action="store_true", help="show the translator's own output")
+    args = parser.parse_args()
+    if args.wav and not args.phrases:
+        parser.error("--wav needs --phrases")
+    main(args)
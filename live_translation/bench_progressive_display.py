@@ -0,0 +1,111 @@
+"""
+What the wearer sees, and when, with progressive display versus whole-result display.
+
+Simulates a BLE link (per-message latency plus bytes/s) and a run of utterances, each
+producing a partial transcript every 150 ms while it is decoded, then the final
+transcript and its translation. Compares:
+
+  blocking     the old path: nothing until the translation, then a full-text send
+               followed by a fixed display sleep that holds up the next utterance
+  progressive  ProgressiveDisplay: partials, transcript and translation as diffs,
+               coalesced and paced in the background
+
+and reports time to first text, time to the translation, messages and bytes sent.
+
+Usage: python bench_progressive_display.py [--latency-ms 30] [--bps 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from progressive_display import ProgressiveDisplay
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.text_layout import tail
+
+PHRASES = [
+    ("hola, ¿cómo estás? hace mucho que no te veo", "hello, how are you? I haven't seen you in a long time"),
+    ("¿dónde está la estación de tren más cercana?", "where is the nearest train station?"),
+    ("quisiera una mesa para dos personas, por favor", "I would like a table for two, please"),
+    ("muchas gracias por tu ayuda", "thank you very much for your help"),
+]
+PARTIAL_EVERY = 0.15
+ASR_TIME = 0.9
+TRANSLATE_TIME = 0.3
+DISPLAY_SLEEP = 5
+
+
+class Link:
+    """Fake BLE link: a message takes latency + size / bytes_per_second to deliver."""
+
+    def __init__(self, latency, bytes_per_second):
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.messages = 0
+        self.bytes = 0
+        self.deliveries = []     # (time, payload)
+
+    async def send(self, code, payload):
+        await asyncio.sleep(self.latency + len(payload) / self.bytes_per_second)
+        self.messages += 1
+        self.bytes += len(payload)
+        self.deliveries.append((time.monotonic(), payload))
+
+
+async def blocking(link, shown):
+    for source, translated in PHRASES:
+        start = time.monotonic()
+        await asyncio.sleep(ASR_TIME + TRANSLATE_TIME)
+        await link.send(0x20, translated.encode())
+        shown.append((time.monotonic() - start, time.monotonic() - start))
+        await asyncio.sleep(DISPLAY_SLEEP)
+
+
+async def progressive(link, shown):
+    display = ProgressiveDisplay(link.send, link.bytes_per_second, layout=tail).start()
+    for source, translated in PHRASES:
+        start = time.monotonic()
+        words = source.split()
+        steps = int(ASR_TIME / PARTIAL_EVERY)
+        for step in range(1, steps + 1):
+            await asyncio.sleep(PARTIAL_EVERY)
+            display.update(" ".join(words[:len(words) * step // steps]))
+        await asyncio.sleep(ASR_TIME - steps * PARTIAL_EVERY)
+        display.update(source)
+        await asyncio.sleep(TRANSLATE_TIME)
+        display.update(translated)
+        # wait until the translation has actually gone over the link
+        while display.shown != translated:
+            await asyncio.sleep(0.005)
+        first = next(t for t, _ in link.deliveries if t >= start) - start
+        shown.append((first, time.monotonic() - start))
+    await display.close()
+    return display
+
+
+def report(label, link, shown, elapsed, extra=""):
+    first = statistics.mean(s[0] for s in shown)
+    final = statistics.mean(s[1] for s in shown)
+    print(f"{label:<12} first text {first * 1000:6.0f}ms  translation {final * 1000:6.0f}ms  "
+          f"{link.messages:3d} msgs {link.bytes:5d} B  session {elapsed:5.1f}s {extra}")
+
+
+async def main(args):
+    print(f"{len(PHRASES)} utterances over a {args.latency_ms}ms, {args.bps} B/s link\n")
+    for label, fn in (("blocking", blocking), ("progressive", progressive)):
+        link = Link(args.latency_ms / 1000, args.bps)
+        shown = []
+        start = time.monotonic()
+        display = await fn(link, shown)
+        extra = f"({display.report()})" if display else ""
+        report(label, link, shown, time.monotonic() - start, extra)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=int, default=30, help="per-message link latency")
+    parser.add_argument("--bps", type=int, default=2000, help="link throughput in bytes/s")
+    asyncio.run(main(parser.parse_args()))
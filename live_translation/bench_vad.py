@@ -0,0 +1,94 @@
+"""
+End-of-speech to hand-off latency of the VAD on synthetic PCM.
+
+Builds an 8 kHz signed 8-bit stream of voiced "speech" bursts (harmonics of a wobbling
+~140 Hz pitch under a syllable envelope) separated by low-level noise, streams it through
+VoiceActivityDetector in MTU-sized chunks like RxAudio delivers them, and reports for
+each phrase how much audio had to arrive after the speaker stopped before the utterance
+was handed off. The fixed RECORDING_DURATION = 5 window that the VAD replaces is shown
+for comparison.
+
+Usage: python bench_vad.py [--chunk 240] [--trailing-ms 500]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from vad import VoiceActivityDetector
+
+SAMPLE_RATE = 8000
+FIXED_WINDOW = 5.0
+
+# (seconds of silence before, seconds of speech)
+SCRIPT = [(1.0, 0.6), (0.8, 2.4), (1.2, 1.1), (0.7, 4.2), (1.5, 0.4), (1.0, 6.5)]
+
+
+def synth_speech(seconds, rng):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 20 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    # syllable-rate envelope that never fully closes inside a phrase
+    envelope = 0.55 + 0.45 * np.abs(np.sin(2 * np.pi * 2.5 * t))
+    return 0.4 * voiced * envelope + 0.01 * rng.standard_normal(len(t))
+
+
+def synth_silence(seconds, rng):
+    return 0.01 * rng.standard_normal(int(seconds * SAMPLE_RATE))
+
+
+def build_stream(rng):
+    pieces, speech_ends, t = [], [], 0.0
+    for silence, speech in SCRIPT:
+        pieces += [synth_silence(silence, rng), synth_speech(speech, rng)]
+        t += silence + speech
+        speech_ends.append(t)
+    pieces.append(synth_silence(1.5, rng))
+    signal = np.clip(np.concatenate(pieces), -1, 1)
+    return (signal * 127).astype(np.int8).tobytes(), speech_ends
+
+
+def main(args):
+    rng = np.random.default_rng(1)
+    pcm, speech_ends = build_stream(rng)
+    vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE, trailing_silence_ms=args.trailing_ms)
+    frame_s = vad.frame_len / SAMPLE_RATE
+
+    handoffs, cpu = [], 0.0
+    for offset in range(0, len(pcm), args.chunk):
+        start = time.perf_counter()
+        utterances = vad.feed(pcm[offset:offset + args.chunk])
+        cpu += time.perf_counter() - start
+        for utterance in utterances:
+            handoffs.append((vad.frames_seen * frame_s, len(utterance) / SAMPLE_RATE))
+            utterance.release()
+    for utterance in vad.flush():
+        handoffs.append((len(pcm) / SAMPLE_RATE, len(utterance) / SAMPLE_RATE))
+        utterance.release()
+
+    print(f"{len(pcm) / SAMPLE_RATE:.1f}s of audio in {args.chunk}-byte chunks, "
+          f"VAD cpu {cpu * 1000:.1f}ms total\n")
+    print(f"{'speech ends':>12} {'handed off':>11} {'latency':>8} {'clip':>6} {'fixed 5s':>9}")
+
+    # a phrase longer than max_utterance_s is handed off in pieces; match on the last one
+    pending = list(handoffs)
+    for end in speech_ends:
+        mine = [h for h in pending if h[0] >= end]
+        if not mine:
+            print(f"{end:11.2f}s {'missed':>11}")
+            continue
+        at, clip = mine[0]
+        pending = pending[pending.index(mine[0]) + 1:]
+        fixed = math.ceil(end / FIXED_WINDOW) * FIXED_WINDOW - end
+        print(f"{end:11.2f}s {at:10.2f}s {(at - end) * 1000:6.0f}ms {clip:5.1f}s {fixed * 1000:7.0f}ms")
+
+    print(f"\n{len(handoffs)} utterances handed off for {len(speech_ends)} phrases")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunk", type=int, default=240, help="bytes per RxAudio chunk")
+    parser.add_argument("--trailing-ms", type=int, default=500, help="silence that ends an utterance")
+    main(parser.parse_args())
@@ -0,0 +1,174 @@
+"""
+One guide, several Frames: fan a single transcript out to every headset's language.
+
+A group tour used to need a translator.py process per visitor, each running its own
+ASR on the same speech and able to target only one TARGET_LANGUAGE. Here the guide's
+speech is transcribed once and FanOut translates each utterance once per distinct
+language among the headsets still online, concurrently, and hands every headset its
+text.
+
+Each Headset has its own ProgressiveDisplay, so its display queue and BLE pacing are
+its own: a slow link only delays that headset, and sends are given `send_timeout`
+so a headset that walked out of range can't stall its task forever. After
+`max_failures` sends in a row fail it is taken offline; its language is no longer
+translated unless another headset still wants it.
+"""
+import asyncio
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from frame_msg import FrameMsg
+
+from progressive_display import ProgressiveDisplay
+
+# shared helpers live in frame_common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.metrics import Histogram
+
+
+class NamedFrameMsg(FrameMsg):
+    """FrameMsg that connects to the Frame advertising as `name` (e.g. "Frame 4F"), or the first one found."""
+
+    def __init__(self, name=None):
+        super().__init__()
+        self.name = name
+
+    async def connect(self, initialize=True):
+        try:
+            await self.ble.connect(name=self.name, data_response_handler=self._handle_data_response)
+            if initialize:
+                # same break/reset/break sequence as FrameMsg.connect()
+                await self.ble.send_break_signal()
+                await self.ble.send_reset_signal()
+                await self.ble.send_break_signal()
+            return True
+        except Exception:
+            if self.ble.is_connected():
+                await self.ble.disconnect()
+            raise
+
+
+class Headset:
+    """
+    One visitor's Frame: the language it shows (None for the untranslated transcript)
+    and its own display queue. start() once the Frame app is running.
+    """
+
+    def __init__(self, name, frame, language=None, bytes_per_second=2000, layout=None,
+                 rasterize=None, send_timeout=5.0, max_failures=3, on_sent=None):
+        self.name = name
+        self.frame = frame
+        self.language = language
+        self.send_timeout = send_timeout
+        self.max_failures = max_failures
+        self.online = False
+        self.failures = 0
+        # time from show() to the text reaching this Frame
+        self.lag = Histogram()
+        self._shown_at = None
+        self.display = ProgressiveDisplay(self._send, bytes_per_second, layout=layout,
+                                          rasterize=rasterize, on_sent=on_sent)
+
+    def start(self):
+        self.online = True
+        self.display.attach(self.frame).start()
+        return self
+
+    def show(self, text):
+        """Queue text for this headset; returns at once, and does nothing once it is offline."""
+        if self.online:
+            if self._shown_at is None:
+                self._shown_at = time.monotonic()
+            self.display.update(text)
+
+    async def _send(self, code, payload):
+        if not self.online:
+            raise ConnectionError(f"{self.name} is offline")
+        try:
+            await asyncio.wait_for(self.frame.send_message(code, payload), self.send_timeout)
+        except Exception as e:
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.online = False
+                print(f"📴 {self.name} dropped after {self.failures} failed sends ({e!r})")
+            raise
+        self.failures = 0
+        if self._shown_at is not None:
+            self.lag.observe(time.monotonic() - self._shown_at)
+            self._shown_at = None
+
+    async def close(self):
+        """Flush the display, giving up after send_timeout on a headset that stopped answering."""
+        try:
+            await asyncio.wait_for(self.display.close(), self.send_timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.display.detach(self.frame)
+
+    def report(self):
+        status = "online" if self.online else "offline"
+        return (f"{self.name} ({self.language or 'transcript'}, {status}): {self.display.report()}, "
+                f"lag p50={self.lag.quantile(0.5) * 1000:.0f}ms max={self.lag.max * 1000:.0f}ms")
+
+
+class FanOut:
+    """
+    The pipeline's translate and display stages for a group of headsets.
+
+    translate(text, target_lang) returns ({language: text}, detected language) with
+    one translate_fn(text, language) call per distinct language, run concurrently on
+    `executor`; show(translations) hands each online headset its language's text.
+    Pass them to TranslationPipeline in place of a single-language translate/display.
+    """
+
+    def __init__(self, headsets, executor, translate_fn):
+        self.headsets = headsets
+        self.executor = executor
+        self.translate_fn = translate_fn
+        self.requests = Counter()
+
+    def languages(self):
+        """Distinct target languages of the headsets still online."""
+        return sorted({h.language for h in self.headsets if h.online and h.language is not None})
+
+    async def translate(self, text, target_lang=None):
+        languages = self.languages()
+        results = await asyncio.gather(*(self.executor.run(self.translate_fn, text, language)
+                                         for language in languages), return_exceptions=True)
+        translations, detected = {}, "unknown"
+        for language, result in zip(languages, results):
+            self.requests[language] += 1
+            if isinstance(result, Exception):
+                print(f"❌ Translation to {language} failed: {result}")
+                continue
+            translated, source = result
+            if source != "unknown":
+                detected = source
+            # already in that language
+            if source == language:
+                translated = text
+            if translated:
+                translations[language] = translated
+        if any(h.language is None for h in self.headsets):
+            translations[None] = text
+        return translations, detected
+
+    def preview(self, text):
+        """Show the transcript on every headset while it is being translated."""
+        for headset in self.headsets:
+            headset.show(text)
+
+    async def show(self, translations):
+        for headset in self.headsets:
+            text = translations.get(headset.language)
+            if text:
+                headset.show(text)
+
+    def report(self):
+        lines = [headset.report() for headset in self.headsets]
+        asked = sum(self.requests.values())
+        lines.append(f"{asked} translate calls for {len(self.headsets)} headsets "
+                     f"({', '.join(f'{lang}={n}' for lang, n in sorted(self.requests.items()))})")
+        return lines
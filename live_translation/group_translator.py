@@ -0,0 +1,204 @@
+import asyncio
+from frame_msg import RxAudio
+import sys
+from pathlib import Path
+
+import translator
+from fanout import FanOut, Headset, NamedFrameMsg
+from pipeline import TranslationPipeline
+from vad import VoiceActivityDetector
+from workers import BlockingExecutor
+
+# shared helpers live in frame_common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.serial_frame import SerialFrame
+from frame_common.text_layout import tail
+from frame_common.upload_manager import UploadManager
+
+# Configuration
+# One guide speaks, every visitor's Frame shows the translation into its own language.
+# ASR, the mic format, VAD, caching and display settings are translator.py's.
+#   name       the "Frame XX" name shown on the device; None (the first one found) only
+#              works with a single headset
+#   language   target language, or None to show what the guide said untranslated
+HEADSETS = [
+    {"name": "Frame XX", "language": None},
+    {"name": "Frame YY", "language": "en"},
+    {"name": "Frame ZZ", "language": "fr"},
+]
+GUIDE = 0                    # index in HEADSETS of the Frame whose mic hears the guide
+
+SEND_TIMEOUT = 5             # seconds before a display update to one headset is abandoned
+MAX_FAILURES = 3             # failed updates in a row before a headset is treated as gone
+EXECUTOR_WORKERS = 8         # speech call plus one translate call per language at once
+
+def check_headsets(headsets):
+    """Every Frame needs its own name, or several connections go to the first one found."""
+    names = [h["name"] for h in headsets]
+    if len(names) > 1 and None in names:
+        raise ValueError("give every headset in HEADSETS the name its Frame shows")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"headset names must be different: {', '.join(duplicates)}")
+
+async def setup_headset(headset):
+    """Connect one Frame, upload the translator app if needed and start it."""
+    try:
+        await headset.frame.connect()
+        uploads = UploadManager(headset.frame)
+        await uploads.sync(stdlua_libs=['data', 'code', 'audio', 'sprite'],
+                           frame_app="lua/translator_frame_app.lua",
+                           extra_files={"mic.lua": "lua/mic.lua"})
+        headset.frame.attach_print_response_handler(lambda text: print(f"[{headset.name}] {text}"))
+        await headset.frame.start_frame_app()
+        headset.start()
+        print(f"✅ {headset.name} ready ({headset.language or 'transcript'}), {uploads.report()}")
+    except Exception as e:
+        print(f"❌ {headset.name} couldn't be set up: {e}")
+
+def build_pipeline(mic, executor, fanout):
+    """Transcribe the guide once, then translate and display per headset through fanout."""
+    loop = asyncio.get_running_loop()
+
+    async def capture():
+        pcm_buffer = await mic.next_utterance()
+        if pcm_buffer is None or len(pcm_buffer) == 0:
+            print("⚠️  No audio captured")
+        return pcm_buffer
+
+    async def transcribe(pcm_buffer):
+        done = False
+
+        def show_partial(text):
+            # a call abandoned after a timeout keeps decoding; what it finds is stale
+            if not done:
+                fanout.preview(text)
+
+        def on_partial(text):
+            loop.call_soon_threadsafe(show_partial, text)
+
+        try:
+            text = await executor.run(translator.transcribe_pcm_buffer, pcm_buffer,
+                                      on_partial if translator.PARTIAL_RESULTS else None)
+        finally:
+            done = True
+        if text == "":
+            print("❌ No speech recognized")
+        return text
+
+    async def translate(text, target_lang):
+        translations, detected_lang = await fanout.translate(text)
+        print(f"✅ Heard ({detected_lang}): '{text}'")
+        for language, translated in translations.items():
+            if language is not None:
+                print(f"🌍 {language}: '{translated}'")
+        return translations, detected_lang
+
+    def preview(text):
+        if translator.PARTIAL_RESULTS:
+            fanout.preview(text)
+
+    return TranslationPipeline(capture, transcribe, translate, fanout.show,
+                               target_lang=None, preview=preview, metrics=translator.metrics)
+
+async def main(frames=None, max_utterances=None):
+    """
+    Run the group translator; fake frames and max_utterances let benchmarks drive one
+    session, and the returned FanOut has each headset's display and lag figures.
+    """
+    if frames is None:
+        check_headsets(HEADSETS)
+        frames = [NamedFrameMsg(h["name"]) for h in HEADSETS]
+    # the guide's mic control shares its Frame with that headset's display
+    frames = [SerialFrame(frame) for frame in frames]
+    executor = BlockingExecutor("thread", EXECUTOR_WORKERS, translator.BACKEND_TIMEOUT)
+    translator.open_translator()
+    rasterize = translator.make_rasterizer()
+    metrics = translator.metrics
+    headsets = [Headset(h["name"] or f"Frame #{i + 1}", frame, h["language"],
+                        translator.DISPLAY_BYTES_PER_SECOND, layout=tail, rasterize=rasterize,
+                        send_timeout=SEND_TIMEOUT, max_failures=MAX_FAILURES,
+                        on_sent=lambda seconds: metrics.observe("display_send", seconds))
+                for i, (h, frame) in enumerate(zip(HEADSETS, frames))]
+    guide = headsets[GUIDE]
+    fanout = FanOut(headsets, executor, translator.translate_with_detection)
+    rx_audio = None
+    mic = None
+    pipeline = None
+
+    try:
+        print("=" * 60)
+        print("FRAME GROUP TRANSLATOR")
+        print("=" * 60)
+        for headset in headsets:
+            role = " (guide's mic)" if headset is guide else ""
+            print(f"{headset.name}: {headset.language or 'transcript'}{role}")
+        print("Press Ctrl+C to stop")
+        print("=" * 60)
+
+        # every Frame is set up at the same time; one that fails is left out
+        print("\n📡 Connecting to Frames...")
+        await asyncio.gather(*(setup_headset(headset) for headset in headsets))
+        if not guide.online:
+            raise RuntimeError(f"the guide's Frame ({guide.name}) isn't connected")
+
+        print(f"🧠 Warming up {translator.asr.name} speech recognition...")
+        await executor.run(translator.asr.warm_up, timeout=120)
+
+        print("🎧 Setting up audio receiver...")
+        rx_audio = RxAudio(streaming=True)
+        rx_audio.audio_queue = await rx_audio.attach(guide.frame)
+        audio_format = translator.AUDIO_FORMAT
+        vad = VoiceActivityDetector(audio_format.sample_rate, audio_format.sample_width,
+                                    **translator.VAD_SETTINGS)
+        mic = translator.FrameMicStream(guide.frame, rx_audio, vad, audio_format)
+
+        fanout.preview("Ready!")
+        print("\n✅ Frames initialized successfully!\n")
+
+        pipeline = build_pipeline(mic, executor, fanout)
+        await pipeline.run(max_utterances)
+
+    except KeyboardInterrupt:
+        print("\n\n👋 Stopping translator...")
+        fanout.preview("Goodbye!")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        if pipeline:
+            print("\n📊 Stage latencies:")
+            for line in pipeline.report():
+                print(f"   {line}")
+            if translator.translation_cache:
+                print(f"📊 Translation cache: {translator.translation_cache.stats()}")
+            for line in fanout.report():
+                print(f"📊 {line}")
+
+        # Cleanup
+        try:
+            if mic:
+                await mic.stop()
+            if rx_audio:
+                rx_audio.detach(guide.frame)
+        except:
+            pass
+        await asyncio.gather(*(headset.close() for headset in headsets), return_exceptions=True)
+
+        async def disconnect(frame):
+            frame.detach_print_response_handler()
+            await frame.stop_frame_app()
+            await frame.disconnect()
+
+        await asyncio.gather(*(disconnect(frame) for frame in frames), return_exceptions=True)
+        print("✅ Disconnected from Frames")
+        executor.shutdown()
+        translator.close_translator()
+        metrics.close()
+    return fanout
+
+if __name__ == "__main__":
+    asyncio.run(main())
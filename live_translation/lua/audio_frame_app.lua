@@ -1,7 +1,8 @@
 -- Audio Frame App for Live Translation
 local data = require('data.min')
-local audio = require('audio.min')
+local mic = require('mic')
 local code = require('code.min')
+local runtime = require('runtime')
 
 -- Message codes
 local AUDIO_CTRL = 0x30
@@ -10,21 +11,21 @@ local AUDIO_CTRL = 0x30
 local streaming = false
 
 -- Audio control handler
-data.parsers[AUDIO_CTRL] = function(msg)
-    local ctrl = code.parse_code(msg.data)
+data.parsers[AUDIO_CTRL] = function(raw)
+    local ctrl = code.parse_code(raw).value
     print("Audio control received: " .. tostring(ctrl))
     
     if ctrl == 1 then
-        -- Start audio streaming
+        -- Start audio streaming in the format the host asked for
         streaming = true
-        audio.start_audio_stream()
+        mic.start(raw)
         print("Audio stream STARTED")
     elseif ctrl == 0 then
-        -- Stop audio streaming
-        streaming = false
-        audio.stop_audio_stream()
+        -- Stop the mic; the main loop keeps draining until the final chunk is sent
+        mic.stop()
         print("Audio stream STOPPED")
     end
+    return ctrl
 end
 
 -- Main app loop
@@ -36,22 +37,22 @@ function app_loop()
     -- Signal ready to Python
     print("ready")
     
-    while true do
-        local ok, err = pcall(function()
-            -- Process incoming control messages
-            local items = data.process_raw_items()
-            
-            -- If streaming, audio.min automatically sends samples
-            -- via the data channel back to Python
-            
-            frame.sleep(0.01)
-        end)
-        
-        if not ok then
-            print("Error: " .. tostring(err))
-            frame.sleep(1)
+    runtime.run(function(items_ready)
+        if not streaming then
+            return false, false
         end
-    end
+        -- Send the mic samples to Python in MTU-sized chunks as they are
+        -- captured; nil means the mic was stopped and the final chunk went out
+        local sent = mic.read_and_send()
+        if sent == nil then
+            streaming = false
+            return true, false
+        end
+        return sent > 0, true
+    end, function(err)
+        print("Error: " .. tostring(err))
+        frame.sleep(1)
+    end)
 end
 
 app_loop()
@@ -0,0 +1,86 @@
+-- Mic streaming in the format the host asks for in AUDIO_CTRL (see audio_codec.py)
+local audio = require('audio.min')
+
+local _M = {}
+
+-- Frame to Host flags, the same as audio.lua so RxAudio reads either
+local AUDIO_DATA_NON_FINAL_MSG = 0x05
+local AUDIO_DATA_FINAL_MSG = 0x06
+
+-- encodings
+local PCM = 0
+local ULAW = 1
+
+-- one flag byte, then one μ-law byte per 16-bit sample
+local ULAW_SAMPLES = frame.bluetooth.max_length() - 1
+
+local encoding = PCM
+
+local function send(msg)
+	while true do
+		-- If the Bluetooth is busy, this simply tries again until it gets through
+		if (pcall(frame.bluetooth.send, msg)) then
+			break
+		end
+	end
+end
+
+-- G.711 μ-law byte for a signed 16-bit sample
+local function ulaw(s)
+	local sign = 0
+	if s < 0 then
+		s = -s
+		sign = 0x80
+	end
+	if s > 32635 then s = 32635 end
+	s = s + 0x84
+	local exponent = 7
+	local mask = 0x4000
+	while exponent > 0 and s & mask == 0 do
+		exponent = exponent - 1
+		mask = mask >> 1
+	end
+	return ~(sign | exponent << 4 | (s >> (exponent + 3)) & 0x0F) & 0xFF
+end
+
+-- Start the mic from an AUDIO_CTRL payload: value, then optionally
+-- sample_rate (uint16), bit_depth (uint8) and encoding (uint8)
+function _M.start(raw)
+	local rate, depth = 8000, 8
+	encoding = PCM
+	if #raw >= 5 then
+		rate = string.byte(raw, 2) << 8 | string.byte(raw, 3)
+		depth = string.byte(raw, 4)
+		encoding = string.byte(raw, 5)
+	end
+	audio.start({sample_rate=rate, bit_depth=depth})
+end
+
+function _M.stop()
+	audio.stop()
+end
+
+-- Read and send one MTU of audio; returns nil once the mic was stopped and the
+-- final message went out, like audio.read_and_send_audio()
+function _M.read_and_send()
+	if encoding ~= ULAW then
+		return audio.read_and_send_audio()
+	end
+
+	local pcm = frame.microphone.read(ULAW_SAMPLES * 2)
+	if pcm == nil then
+		send(string.char(AUDIO_DATA_FINAL_MSG))
+		return nil
+	elseif pcm == '' then
+		return 0
+	end
+
+	local out = {}
+	for i = 1, #pcm - 1, 2 do
+		out[#out + 1] = ulaw(string.unpack('<i2', pcm, i))
+	end
+	send(string.char(AUDIO_DATA_NON_FINAL_MSG, table.unpack(out)))
+	return #out
+end
+
+return _M
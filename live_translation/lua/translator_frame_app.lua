@@ -1,46 +1,128 @@
 local data = require('data.min')
-local audio = require('audio.min')
+local mic = require('mic')
 local code  = require('code.min')
+local sprite = require('sprite.min')
+local runtime = require('runtime')
 
 -- Message codes
-AUDIO_CTRL = 0x30      -- start/stop microphone
-TEXT_OUT   = 0x20      -- text from Python to display
+AUDIO_CTRL = 0x30      -- start (in the format sent) / stop microphone
+TEXT_OUT   = 0x20      -- full text from Python to display
+TEXT_DIFF  = 0x21      -- incremental text update from Python
+TEXT_SPRITE = 0x22     -- text rendered on the host, for scripts the font lacks
+-- 0x31 HEALTH (battery, Lua heap and loop stats) is answered by runtime.lua
 
--- Register parser so incoming text messages are handled
-data.parsers[TEXT_OUT] = function(msg)
-    local txt = msg.raw or ""
+local LINE_HEIGHT = 60
+
+-- Global state
+local streaming = false
+local current_text = ""
+local current_sum = 0
+
+-- Fletcher-16 of a string, as progressive_display.text_checksum() computes it
+local function checksum(s)
+    local low, high = 0, 0
+    for i = 1, #s do
+        low = (low + string.byte(s, i)) % 255
+        high = (high + low) % 255
+    end
+    return high << 8 | low
+end
+
+local function set_text(txt)
+    current_text = txt
+    current_sum = checksum(txt)
+    return current_text
+end
+
+-- One display.text() call per line, the firmware doesn't wrap
+local function draw_text(txt)
     frame.display.clear()
-    frame.display.text(txt, 1, 1)
+    local y = 1
+    for line in string.gmatch(txt, '[^\n]+') do
+        frame.display.text(line, 1, y)
+        y = y + LINE_HEIGHT
+    end
     frame.display.show()
 end
 
+data.parsers[AUDIO_CTRL] = function(raw)
+    local ctrl = code.parse_code(raw).value
+    if ctrl == 1 then
+        streaming = true
+        mic.start(raw)
+    elseif ctrl == 0 then
+        -- the main loop keeps draining until the final chunk is sent
+        mic.stop()
+    end
+    return ctrl
+end
+
+data.parsers[TEXT_OUT] = function(raw)
+    return set_text(raw or "")
+end
+
+-- keep (uint16), base (uint16 checksum), then the new tail: the diff only applies to
+-- the text it was made against, except a keep of 0 which replaces everything.
+-- Otherwise an empty TEXT_DIFF goes back and the host sends the whole text again.
+data.parsers[TEXT_DIFF] = function(raw)
+    local keep = string.byte(raw, 1) << 8 | string.byte(raw, 2)
+    local base = string.byte(raw, 3) << 8 | string.byte(raw, 4)
+    if keep == 0 or (base == current_sum and keep <= #current_text) then
+        return set_text(string.sub(current_text, 1, keep) .. string.sub(raw, 5))
+    end
+    runtime.send(string.char(TEXT_DIFF))
+    return nil
+end
+
+data.parsers[TEXT_SPRITE] = sprite.parse_sprite
+
 function app_loop()
-    frame.display.clear()
-    frame.display.text("Translator Ready", 1, 1)
-    frame.display.show()
+    draw_text("Translator Ready")
 
     print("Frame Lua app running")
 
-    while true do
-        local ok, err = pcall(function()
+    runtime.run(function(items_ready)
+        local busy = false
 
-            -- Process incoming data (text from Python)
-            local items_ready = data.process_raw_items()
-            if items_ready > 0 then
-                -- handled automatically by parser
-            end
+        -- several text updates in one pass are drawn once, with the latest text
+        if data.app_data[TEXT_OUT] ~= nil or data.app_data[TEXT_DIFF] ~= nil then
+            draw_text(current_text)
+            data.app_data[TEXT_OUT] = nil
+            data.app_data[TEXT_DIFF] = nil
+            busy = true
+        end
 
-            -- If microphone is enabled, audio.min will automatically
-            -- produce audio samples that go to the host via data channel
-            frame.sleep(0.001)
+        -- same bitmap path as sprite_frame_app.lua
+        if data.app_data[TEXT_SPRITE] ~= nil then
+            local spr = data.app_data[TEXT_SPRITE]
+            sprite.set_palette(spr.num_colors, spr.palette_data)
+            frame.display.bitmap(1, 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
+            frame.display.show()
 
-        end)
+            -- the next text diff has nothing on screen to build on
+            set_text("")
+            data.app_data[TEXT_SPRITE] = nil
+            busy = true
+        end
 
-        if not ok then
-            print(err)
-            break
+        if streaming then
+            -- Send the mic samples to Python in MTU-sized chunks as they are
+            -- captured; nil means the mic was stopped and the final chunk went out
+            local sent = mic.read_and_send()
+            if sent == nil then
+                streaming = false
+                busy = true
+            elseif sent > 0 then
+                busy = true
+            end
         end
-    end
+
+        return busy, streaming
+    end, function(err)
+        -- anything raised ends the app, including the break signal from the host
+        print(err)
+        return true
+    end)
 end
 
 app_loop()
@@ -0,0 +1,220 @@
+"""
+Always-on microphone capture for translator_mac.py.
+
+record_and_transcribe_from_mac() opened sr.Microphone(), spent half a second in
+adjust_for_ambient_noise() and then blocked in listen() for every utterance, so the
+device was reopened each time and nothing was heard while the previous phrase was
+being transcribed, translated and shown.
+
+BackgroundListener keeps one input stream open for the whole session. The source's
+callback only queues each chunk; a listener thread runs the chunks through the same
+VoiceActivityDetector as the Frame mic path, whose running noise floor takes the
+place of the one-off calibration, and pushes each finished utterance (a pooled
+PcmBuffer) into an asyncio queue for the pipeline.
+
+Sources:
+  PyAudioSource   an input device through PyAudio's callback API (what sr.Microphone uses)
+  FileSource      a WAV file played back in real time, or faster, as a fake microphone
+"""
+import asyncio
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+
+from vad import VoiceActivityDetector
+
+# Sentinel that shuts the listener thread down
+_STOP = object()
+
+
+def read_wav(path):
+    """int16 mono samples and the sample rate of a WAV file."""
+    with wave.open(str(path)) as wav:
+        rate, width, channels = wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2")
+    else:
+        raise ValueError(f"{path}: {width * 8}-bit WAVs aren't supported")
+    return samples.reshape(-1, channels)[:, 0].astype(np.int16), rate
+
+
+class PyAudioSource:
+    """An input device (the default one unless `device_index`) as 16-bit mono chunks."""
+
+    sample_width = 2
+
+    def __init__(self, sample_rate=16000, chunk_ms=30, device_index=None):
+        self.sample_rate = sample_rate
+        self.chunk_frames = sample_rate * chunk_ms // 1000
+        self.device_index = device_index
+        # times PortAudio reported lost input because the callback fell behind
+        self.overflows = 0
+        self._audio = None
+        self._stream = None
+
+    def start(self, callback, on_end=None):
+        import pyaudio
+
+        def on_audio(in_data, frame_count, time_info, status):
+            if status & pyaudio.paInputOverflow:
+                self.overflows += 1
+            callback(in_data)
+            return None, pyaudio.paContinue
+
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(format=pyaudio.paInt16, channels=1, rate=self.sample_rate,
+                                        input=True, input_device_index=self.device_index,
+                                        frames_per_buffer=self.chunk_frames, stream_callback=on_audio)
+        self._stream.start_stream()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+
+class FileSource:
+    """
+    A WAV file as a fake microphone: `chunk_ms` chunks delivered from a thread at
+    `speed` times real time (0 for as fast as they are taken), then `tail_s` of
+    silence so the last phrase is closed off, then on_end().
+    """
+
+    sample_width = 2
+
+    def __init__(self, path, speed=1.0, chunk_ms=30, tail_s=1.0):
+        samples, self.sample_rate = read_wav(path)
+        tail = np.zeros(int(tail_s * self.sample_rate), dtype=np.int16)
+        self.pcm = np.concatenate([samples, tail]).astype("<i2").tobytes()
+        self.speed = speed
+        self.chunk_bytes = self.sample_rate * chunk_ms // 1000 * self.sample_width
+        self.overflows = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def duration(self):
+        return len(self.pcm) / self.sample_width / self.sample_rate
+
+    def start(self, callback, on_end=None):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._play, args=(callback, on_end),
+                                        name="file-mic", daemon=True)
+        self._thread.start()
+
+    def _play(self, callback, on_end):
+        chunk_s = self.chunk_bytes / self.sample_width / self.sample_rate
+        start = time.monotonic()
+        for n, offset in enumerate(range(0, len(self.pcm), self.chunk_bytes)):
+            if self.speed:
+                # paced from the start, so sleep overshoot doesn't accumulate
+                delay = start + (n + 1) * chunk_s / self.speed - time.monotonic()
+                if self._stop.wait(max(delay, 0)):
+                    return
+            elif self._stop.is_set():
+                return
+            callback(self.pcm[offset:offset + self.chunk_bytes])
+        if on_end is not None:
+            on_end()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class BackgroundListener:
+    """
+    Runs `source` for the whole session and segments its audio into utterances.
+
+        listener = BackgroundListener(PyAudioSource(16000), trailing_silence_ms=500).start()
+        pcm_buffer = await listener.next_utterance()    # None once a FileSource has ended
+        ...
+        listener.stop()
+
+    Utterances wait in an asyncio queue until they are taken; past `max_backlog` the
+    oldest is dropped (and counted) rather than letting memory grow. Release each
+    PcmBuffer once it has been transcribed.
+    """
+
+    def __init__(self, source, max_backlog=8, **vad_settings):
+        self.source = source
+        self.vad = VoiceActivityDetector(source.sample_rate, source.sample_width, **vad_settings)
+        self.max_backlog = max_backlog
+        self.dropped = 0
+        self.finished = False
+        self._chunks = queue.SimpleQueue()
+        self._utterances = None
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        """Open the source and start segmenting; call from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._utterances = asyncio.Queue()
+        self._thread = threading.Thread(target=self._segment, name="mic-listener", daemon=True)
+        self._thread.start()
+        self.source.start(self._chunks.put, on_end=lambda: self._chunks.put(None))
+        return self
+
+    @property
+    def backlog(self):
+        return self._utterances.qsize()
+
+    @property
+    def noise_floor(self):
+        return self.vad.noise_floor
+
+    async def next_utterance(self):
+        """The next utterance as a PcmBuffer, or None once the source has ended."""
+        if self.finished and self._utterances.empty():
+            return None
+        return await self._utterances.get()
+
+    def stop(self):
+        self.source.stop()
+        self._chunks.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        while self._utterances is not None and not self._utterances.empty():
+            utterance = self._utterances.get_nowait()
+            if utterance is not None:
+                utterance.release()
+
+    def _segment(self):
+        # listener thread: the source callback only queues chunks, the VAD runs here
+        while True:
+            chunk = self._chunks.get()
+            if chunk is _STOP:
+                return
+            utterances = self.vad.flush() if chunk is None else self.vad.feed(chunk)
+            if chunk is None:
+                utterances.append(None)
+            try:
+                for utterance in utterances:
+                    self._loop.call_soon_threadsafe(self._deliver, utterance)
+            except RuntimeError:
+                # the event loop has already closed
+                return
+            if chunk is None:
+                return
+
+    def _deliver(self, utterance):
+        if utterance is None:
+            self.finished = True
+        elif self._utterances.qsize() >= self.max_backlog:
+            self._utterances.get_nowait().release()
+            self.dropped += 1
+        self._utterances.put_nowait(utterance)
@@ -0,0 +1,242 @@
+"""
+Concurrent capture → ASR → translate → display pipeline for the live translator.
+
+Each stage runs as its own asyncio task and hands work to the next one through a
+bounded queue, so utterance N+1 is being recorded while utterance N is still being
+transcribed, translated or shown. When a downstream stage falls behind its queue
+fills up and the upstream stage blocks on put() (backpressure) instead of piling up
+clips in memory.
+
+The stages only see plain async callables, so the pipeline can be driven by a real
+FrameMsg/RxAudio pair or by a fake source that just returns canned WAV bytes.
+A captured clip with a release() method (a pooled PcmBuffer) is released as soon as
+ASR is done with it, so its memory goes back to the capture side. If transcribe()
+times out, the call behind it may still be reading the clip: it is released once
+the TimeoutError's `future` (as BlockingExecutor.run() raises it) is done, or left
+to the garbage collector when there is no such future.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+# Sentinel passed down the queues to shut the stages down in order
+_STOP = object()
+
+
+@dataclass
+class Utterance:
+    """One captured clip and everything the later stages work out about it."""
+    seq: int
+    audio: object          # WAV bytes, or a PcmBuffer from the mic stream
+    captured_at: float = field(default_factory=time.monotonic)
+    text: str = ""
+    lang: str = "unknown"
+    translated: str = ""
+
+
+class StageStats:
+    """Running latency counters for one pipeline stage, optionally fed into a Metrics."""
+
+    def __init__(self, name, metrics=None):
+        self.name = name
+        self.metrics = metrics
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        # time spent waiting for room in the downstream queue
+        self.blocked = 0.0
+
+    def record(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.last = elapsed
+        self.max = max(self.max, elapsed)
+        if self.metrics is not None:
+            self.metrics.observe(self.name, elapsed)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        return (f"{self.name:<10} n={self.count:<4} mean={self.mean * 1000:7.0f}ms "
+                f"max={self.max * 1000:7.0f}ms blocked={self.blocked * 1000:7.0f}ms "
+                f"errors={self.errors}")
+
+
+class TranslationPipeline:
+    """
+    Runs capture, ASR, translate and display concurrently over bounded queues.
+
+    capture()                 -> audio clip, or None if nothing usable was recorded
+    transcribe(audio)         -> recognised text ("" if nothing was understood)
+    translate(text, target)   -> (translated text or None, detected language)
+    display(text)             -> shows the text on the glasses
+    preview(text)             -> optional, shows the transcript while it is translated;
+                                 called inline so it must not block
+
+    Stage latencies also go into `metrics` (a frame_common.metrics.Metrics) if given.
+    """
+
+    def __init__(self, capture, transcribe, translate, display,
+                 target_lang="en", queue_size=2, preview=None, metrics=None):
+        self.capture = capture
+        self.transcribe = transcribe
+        self.translate = translate
+        self.display = display
+        self.preview = preview
+        self.target_lang = target_lang
+
+        self.asr_queue = asyncio.Queue(maxsize=queue_size)
+        self.translate_queue = asyncio.Queue(maxsize=queue_size)
+        self.display_queue = asyncio.Queue(maxsize=queue_size)
+
+        self.stats = {name: StageStats(name, metrics)
+                      for name in ("capture", "asr", "translate", "display", "end_to_end")}
+        self._running = False
+
+    def stop(self):
+        """Ask the capture stage to finish; queued utterances still drain through."""
+        self._running = False
+
+    async def run(self, max_utterances=None):
+        """Run all stages until stop() is called or max_utterances have been captured."""
+        self._running = True
+        tasks = [
+            asyncio.create_task(self._capture_stage(max_utterances)),
+            asyncio.create_task(self._asr_stage()),
+            asyncio.create_task(self._translate_stage()),
+            asyncio.create_task(self._display_stage()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def report(self):
+        """Per-stage latency summary as printable lines."""
+        return [stats.summary() for stats in self.stats.values()]
+
+    async def _put(self, queue, item, stats):
+        start = time.monotonic()
+        await queue.put(item)
+        stats.blocked += time.monotonic() - start
+
+    async def _capture_stage(self, max_utterances):
+        stats = self.stats["capture"]
+        seq = 0
+        try:
+            while self._running and (max_utterances is None or seq < max_utterances):
+                start = time.monotonic()
+                try:
+                    audio = await self.capture()
+                except Exception as e:
+                    stats.errors += 1
+                    print(f"❌ Capture error: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                stats.record(time.monotonic() - start)
+
+                if not audio:
+                    continue
+
+                seq += 1
+                await self._put(self.asr_queue, Utterance(seq=seq, audio=audio), stats)
+        finally:
+            await self.asr_queue.put(_STOP)
+
+    async def _asr_stage(self):
+        stats = self.stats["asr"]
+        while True:
+            utterance = await self.asr_queue.get()
+            if utterance is _STOP:
+                break
+
+            start = time.monotonic()
+            # a call that timed out (or was cancelled) keeps running in its worker
+            abandoned = True
+            try:
+                utterance.text = await self.transcribe(utterance.audio)
+                abandoned = False
+            except asyncio.TimeoutError as e:
+                stats.errors += 1
+                print(f"❌ Transcription error: {e}")
+                self._release_when_done(utterance.audio, getattr(e, "future", None))
+                continue
+            except Exception as e:
+                abandoned = False
+                stats.errors += 1
+                print(f"❌ Transcription error: {e}")
+                continue
+            finally:
+                # the clip is not needed past this point, but one an abandoned call may
+                # still be reading only goes back to the pool once that call has ended
+                release = getattr(utterance.audio, "release", None)
+                if release is not None and not abandoned:
+                    release()
+                utterance.audio = None
+            stats.record(time.monotonic() - start)
+            if utterance.text:
+                if self.preview is not None:
+                    self.preview(utterance.text)
+                await self._put(self.translate_queue, utterance, stats)
+        await self.translate_queue.put(_STOP)
+
+    def _release_when_done(self, audio, future):
+        release = getattr(audio, "release", None)
+        if release is None or future is None:
+            return
+        loop = asyncio.get_running_loop()
+
+        def done(_):
+            # runs in the worker that finished the call
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                # the event loop has already closed
+                pass
+        future.add_done_callback(done)
+
+    async def _translate_stage(self):
+        stats = self.stats["translate"]
+        while True:
+            utterance = await self.translate_queue.get()
+            if utterance is _STOP:
+                break
+
+            start = time.monotonic()
+            try:
+                translated, utterance.lang = await self.translate(utterance.text, self.target_lang)
+            except Exception as e:
+                stats.errors += 1
+                print(f"❌ Translation error: {e}")
+                continue
+            stats.record(time.monotonic() - start)
+
+            if not translated:
+                continue
+            utterance.translated = translated
+            await self._put(self.display_queue, utterance, stats)
+        await self.display_queue.put(_STOP)
+
+    async def _display_stage(self):
+        stats = self.stats["display"]
+        while True:
+            utterance = await self.display_queue.get()
+            if utterance is _STOP:
+                break
+
+            start = time.monotonic()
+            # end-of-recording to the moment the translation goes up on the display
+            self.stats["end_to_end"].record(start - utterance.captured_at)
+            try:
+                await self.display(utterance.translated)
+            except Exception as e:
+                stats.errors += 1
+                print(f"❌ Display error: {e}")
+                continue
+            stats.record(time.monotonic() - start)
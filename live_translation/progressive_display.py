@@ -0,0 +1,178 @@
+"""
+Non-blocking, rate-limited text updates for the translator's Frame display.
+
+display_text_on_frame() sent each result as Lua and then slept for a fixed duration,
+so the pipeline's display stage was idle most of the time and nothing appeared until
+the translation was finished. ProgressiveDisplay instead takes any number of
+update(text) calls (interim transcripts, partial results, the final translation)
+and a background task sends them to translator_frame_app.lua:
+
+  - only the latest text is kept; updates that arrive while a send is in flight
+    are coalesced, so a burst of partials costs one BLE message, not one each
+  - each message is a small diff: how many bytes of the text already on Frame to
+    keep, followed by the new tail, so a growing transcript only sends what changed
+  - sends are paced to what the BLE link carries (bytes_per_second, min_interval),
+    and the pacing happens in the display task, never in the caller
+
+Diff message (TEXT_DIFF), all integers big-endian:
+    keep (uint16)   bytes of the current Frame text to keep
+    base (uint16)   text_checksum() of the text the diff was made against
+    tail (utf-8)    replaces everything after `keep`
+Frame ignores a diff whose base does not match what it shows, unless keep is 0, and
+replies with an empty TEXT_DIFF; attach(frame) has that reply call resync(), which
+sends the latest text again in full (keep 0). A failed send is followed by a full
+text too, since the message may have reached Frame anyway.
+
+Text Frame's font can't draw can instead go out as a sprite (TEXT_SPRITE): pass a
+rasterize(text) that returns packed TxSprite bytes, or None to send it as text.
+on_sent(seconds), if given, is called with how long each delivered message took.
+"""
+import asyncio
+import struct
+import time
+
+TEXT_DIFF = 0x21
+TEXT_SPRITE = 0x22
+
+
+def text_diff(old, new):
+    """(keep, tail): bytes of old to keep, and the UTF-8 bytes that follow them in new."""
+    common = 0
+    for a, b in zip(old, new):
+        if a != b:
+            break
+        common += 1
+    return len(old[:common].encode()), new[common:].encode()
+
+
+def text_checksum(data):
+    """Fletcher-16 of UTF-8 bytes, as translator_frame_app.lua computes it for its text."""
+    low = high = 0
+    for byte in data:
+        low = (low + byte) % 255
+        high = (high + low) % 255
+    return high << 8 | low
+
+
+def pack_diff(old, new):
+    keep, tail = text_diff(old, new)
+    return struct.pack(">HH", keep, text_checksum(old.encode())) + tail
+
+
+class ProgressiveDisplay:
+    """
+    Sends the latest text to Frame as TEXT_DIFF messages, without blocking callers.
+
+    send(code, payload) is an async callable that delivers one message, e.g.
+    frame.send_message. layout(text) turns text into the "\n"-separated lines Frame
+    draws; rasterize(text) is described above.
+    """
+
+    def __init__(self, send, bytes_per_second=2000, min_interval=0.1, layout=None,
+                 rasterize=None, on_sent=None):
+        self.send = send
+        self.bytes_per_second = bytes_per_second
+        self.min_interval = min_interval
+        self.layout = layout
+        self.rasterize = rasterize
+        self.on_sent = on_sent
+
+        self.shown = ""         # text Frame is showing, as far as we know
+        self._frame_text = ""   # laid-out text behind the last diff ("" after a sprite)
+        self.requested = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.resyncs = 0
+
+        self._pending = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._closing = False
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    def attach(self, frame):
+        """Resync when Frame reports a diff it couldn't apply; detach() at the end."""
+        frame.register_data_response_handler(self, [TEXT_DIFF], lambda data: self.resync())
+        return self
+
+    def detach(self, frame):
+        frame.unregister_data_response_handler(self)
+
+    def resync(self):
+        """Send the latest text again as a whole, for a Frame that lost track of it."""
+        self.resyncs += 1
+        self._frame_text = ""
+        text, self.shown = self.shown, None
+        if self._pending is None and text is not None:
+            self._pending = text
+        self._wakeup.set()
+
+    def update(self, text):
+        """Show `text` as soon as the link allows; returns immediately."""
+        self.requested += 1
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = text
+        self._wakeup.set()
+
+    async def close(self):
+        """Send whatever is still pending, then stop the background task."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def report(self):
+        return (f"{self.requested} updates, {self.sent} sent, {self.coalesced} coalesced, "
+                f"{self.bytes_sent} bytes, {self.errors} errors, {self.resyncs} resyncs")
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._pending is None:
+                if self._closing:
+                    return
+                continue
+
+            text, self._pending = self._pending, None
+            if text != self.shown:
+                await self._send(text)
+            if self._pending is not None or self._closing:
+                self._wakeup.set()
+
+    async def _send(self, text):
+        packed = self.rasterize(text) if self.rasterize is not None else None
+        if packed is not None:
+            code, payload, frame_text = TEXT_SPRITE, packed, ""
+        else:
+            frame_text = self.layout(text) if self.layout is not None else text
+            code, payload = TEXT_DIFF, pack_diff(self._frame_text, frame_text)
+
+        start = time.monotonic()
+        try:
+            await self.send(code, payload)
+            self.shown = text
+            self._frame_text = frame_text
+            self.sent += 1
+            self.bytes_sent += len(payload)
+            if self.on_sent is not None:
+                self.on_sent(time.monotonic() - start)
+        except Exception as e:
+            self.errors += 1
+            # it may have arrived all the same, so don't build the next diff on either text
+            self._frame_text = ""
+            print(f"Display error: {e}")
+
+        # leave the link alone for as long as that message took to carry
+        budget = max(self.min_interval, len(payload) / self.bytes_per_second)
+        remaining = budget - (time.monotonic() - start)
+        if remaining > 0 and not self._closing:
+            await asyncio.sleep(remaining)
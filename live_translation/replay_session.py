@@ -0,0 +1,218 @@
+"""
+Replay a recorded translator session offline: no glasses, no network.
+
+A trace written with TRACE_FILE set in translator.py (see session_trace.py) is fed
+back through translator.py's own main(): the recorded mic chunks arrive from a
+simulated Frame (FakeFrameMsg) with their original spacing, and the recorded ASR and
+translate results answer in place of Google, after the delay they took in the field.
+Everything in between (decoding, VAD, the pipeline and executor, display diffing and
+the BLE sends) is the current code, so a slow session can be profiled, or bisected
+across commits, on a laptop.
+
+With --fast the chunks and results come back as fast as the pipeline takes them,
+which leaves only the host's own processing time in the stage latencies.
+
+Usage:
+    python replay_session.py session.trace                 # real time
+    python replay_session.py session.trace --fast          # as fast as possible
+    python replay_session.py session.trace --speed 4 --packet-ms 15 --jitter-ms 5
+    python replay_session.py session.trace --info          # what the trace holds
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+
+from asr_backends import ASRBackend
+from session_trace import (ASR, DATA_IN, DETECT, KIND_NAMES, MESSAGE_OUT, STAGE, TRANSLATE,
+                           load_json, read_trace)
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+from frame_common.fake_frame import AUDIO_DATA_FINAL, AUDIO_DATA_NON_FINAL, FakeFrameMsg
+from frame_common.metrics import Metrics
+
+
+class ReplayFrame(FakeFrameMsg):
+    """FakeFrameMsg whose mic plays back the audio notifications of a trace."""
+
+    def __init__(self, records, speed=1.0, **options):
+        super().__init__(**options)
+        self.speed = speed
+        self.chunks = [r for r in records if r.kind == DATA_IN
+                       and r.code in (AUDIO_DATA_NON_FINAL, AUDIO_DATA_FINAL)]
+        self.position = 0
+
+    async def _stream_mic(self, ctrl):
+        # the recorded stream already has Frame's own final chunks, and restarting it
+        # carries on where it left off rather than from the beginning
+        start = time.monotonic()
+        first = self.chunks[self.position].t if self.position < len(self.chunks) else 0.0
+        while self.position < len(self.chunks) and not self._mic_stop.is_set():
+            chunk = self.chunks[self.position]
+            delay = (chunk.t - first) / self.speed - (time.monotonic() - start) if self.speed else 0
+            try:
+                await asyncio.wait_for(self._mic_stop.wait(), max(delay, 0))
+                break
+            except asyncio.TimeoutError:
+                pass
+            self.position += 1
+            self.mic_bytes += len(chunk.payload) - 1
+            self.notify(chunk.payload)
+            if chunk.code == AUDIO_DATA_FINAL:
+                return
+        self.notify(bytes([AUDIO_DATA_FINAL]))
+
+
+class ReplayBackend(ASRBackend):
+    """Answers with the trace's ASR results in order, after their recorded delay."""
+
+    name = "replay"
+
+    def __init__(self, results, speed=1.0):
+        self.results = deque(results)
+        self.speed = speed
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio):
+        with self._lock:
+            if not self.results:
+                raise RuntimeError("no more recorded transcripts")
+            result = self.results.popleft()
+        if self.speed:
+            time.sleep(result["seconds"] / self.speed)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["text"]
+
+
+class ReplayTranslator:
+    """Answers translate/detect calls with the trace's results for the same text."""
+
+    def __init__(self, translations, detections, speed=1.0):
+        self.speed = speed
+        self.translations = defaultdict(deque)
+        self.detections = defaultdict(deque)
+        for result in translations:
+            self.translations[result["text"], result["target"]].append(result)
+        for result in detections:
+            self.detections[result["text"]].append(result)
+
+    def _answer(self, results, key):
+        if not results.get(key):
+            raise KeyError(f"no recorded result for {key!r}")
+        # repeats beyond what was recorded get the last answer again
+        answers = results[key]
+        result = answers.popleft() if len(answers) > 1 else answers[0]
+        if self.speed:
+            time.sleep(result["seconds"] / self.speed)
+        return result
+
+    def translate(self, text, target):
+        result = self._answer(self.translations, (text, target))
+        return result["translated"], result["lang"]
+
+    def detect(self, text):
+        return self._answer(self.detections, text)["lang"]
+
+
+def of_kind(records, kind):
+    return [load_json(r) for r in records if r.kind == kind]
+
+
+def recorded_metrics(records):
+    metrics = Metrics()
+    for stage in of_kind(records, STAGE):
+        metrics.observe(stage["stage"], stage["seconds"])
+    return metrics
+
+
+def info(path, records):
+    kinds = Counter(KIND_NAMES.get(r.kind, r.kind) for r in records)
+    audio = sum(len(r.payload) - 1 for r in records if r.kind == DATA_IN
+                and r.code == AUDIO_DATA_NON_FINAL)
+    duration = records[-1].t if records else 0.0
+    print(f"{path}: {len(records)} records over {duration:.1f}s, {audio} B of mic audio")
+    print("   " + ", ".join(f"{kind}={count}" for kind, count in kinds.items()))
+    sent = Counter(r.code for r in records if r.kind == MESSAGE_OUT)
+    print("   messages sent: " + ", ".join(f"0x{code:02x}={count}" for code, count in sorted(sent.items())))
+    translations = iter(of_kind(records, TRANSLATE))
+    for result in of_kind(records, ASR):
+        heard = result.get("text", f"[error: {result.get('error')}]")
+        print(f"   🎤 {heard!r} ({result['seconds'] * 1000:.0f} ms)")
+        if result.get("text"):
+            translated = next(translations, None)
+            if translated:
+                print(f"      🌍 {translated['translated']!r} ({translated['seconds'] * 1000:.0f} ms)")
+    print("\n📈 Recorded stage latencies:")
+    for line in recorded_metrics(records).report():
+        print(f"   {line}")
+
+
+async def replay(args, records, translator):
+    speed = None if args.fast else args.speed
+    utterances = of_kind(records, ASR)
+    translator.asr = ReplayBackend(utterances, speed)
+    translator.translator = ReplayTranslator(of_kind(records, TRANSLATE), of_kind(records, DETECT), speed)
+    translator.metrics = Metrics()
+    translator.trace = None
+    frame = ReplayFrame(records, speed, ready_message="Frame Lua app running",
+                        packet_ms=args.packet_ms if args.packet_ms is not None else (0 if args.fast else 15),
+                        jitter_ms=args.jitter_ms, seed=args.seed)
+
+    audio_seconds = (frame.chunks[-1].t - frame.chunks[0].t) if frame.chunks else 0.0
+    # a replay that captures fewer utterances than the session did would wait on the
+    # mic forever, so give up a while after the recorded audio runs out
+    timeout = (audio_seconds / speed if speed else 0) + args.timeout
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with output:
+        try:
+            await asyncio.wait_for(translator.main(frame, max_utterances=len(utterances)), timeout)
+        except asyncio.TimeoutError:
+            pass
+    elapsed = time.perf_counter() - start
+
+    captured = translator.metrics.histograms.get("capture")
+    captured = captured.count if captured else 0
+    print(f"Replayed {len(utterances)} utterances ({audio_seconds:.1f}s of audio) in {elapsed:.1f}s"
+          + (" as fast as possible" if not speed else f" at {speed:g}x"))
+    if captured < len(utterances):
+        print(f"⚠️  Only {captured} utterances were captured; the VAD settings differ from the recording?")
+    print("\n📈 Recorded stage latencies:")
+    for line in recorded_metrics(records).report():
+        print(f"   {line}")
+    print("\n📈 Replayed stage latencies:")
+    for line in translator.metrics.report():
+        print(f"   {line}")
+
+
+def main(args):
+    records = read_trace(args.trace)
+    if args.info:
+        info(args.trace, records)
+        return
+    # translator.py reads the Frame app relative to live_translation/
+    os.chdir(HERE)
+    import translator
+    asyncio.run(replay(args, records, translator))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("trace", help="trace file written by translator.py with TRACE_FILE set")
+    parser.add_argument("--info", action="store_true", help="summarize the trace instead of replaying it")
+    parser.add_argument("--fast", action="store_true", help="replay as fast as possible")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed vs real time")
+    parser.add_argument("--packet-ms", type=float, help="simulated time per BLE packet (15, or 0 with --fast)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform ± jitter per packet")
+    parser.add_argument("--seed", type=int, default=0, help="jitter random seed")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds to wait after the audio runs out")
+    parser.add_argument("--verbose", action="store_true", help="show the translator's own output")
+    main(parser.parse_args())
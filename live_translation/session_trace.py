@@ -0,0 +1,220 @@
+"""
+Append-only, memory-mapped trace of a translator session, for replaying it offline.
+
+With TRACE_FILE set, translator.py records everything that crosses its boundaries:
+every data notification from Frame (mic chunks, health replies), every message and
+Lua snippet sent to it, every Lua print, every stage timing from Metrics, and every
+ASR and translate result along with how long it took. replay_session.py feeds such a
+trace back through the pipeline, in real time or as fast as possible, with the
+recorded results standing in for Google.
+
+The file is preallocated in `chunk_size` steps and written through mmap, so a record
+costs a memory copy rather than a write() call from the BLE callback or an executor
+thread. Records are only ever appended; the unused tail stays zeroed, so a trace cut
+short by a crash still reads back up to its last whole record.
+
+File layout:
+    MAGIC (b"FTRACE", uint16 version)
+    then records, all integers big-endian:
+        t (float64)          seconds since the trace was opened
+        kind (uint8)         DATA_IN ... DETECT below; 0 marks the end
+        code (uint8)         message code / data flag, 0 when not applicable
+        length (uint32)      bytes of payload
+        payload              raw bytes, UTF-8 text, or JSON for the result kinds
+"""
+import json
+import mmap
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from asr_backends import ASRBackend
+
+MAGIC = b"FTRACE" + struct.pack(">H", 1)
+RECORD = struct.Struct(">dBBI")
+
+DATA_IN = 1       # data notification from Frame, payload includes the flag byte
+MESSAGE_OUT = 2   # send_message(code, payload)
+LUA_OUT = 3       # send_lua(string)
+PRINT = 4         # Lua print() received
+STAGE = 5         # {"stage", "seconds"} from Metrics
+ASR = 6           # {"text", "seconds"} or {"error", "seconds"}
+TRANSLATE = 7     # {"text", "target", "translated", "lang", "seconds"}
+DETECT = 8        # {"text", "lang", "seconds"}
+
+KIND_NAMES = {DATA_IN: "data_in", MESSAGE_OUT: "message_out", LUA_OUT: "lua_out",
+              PRINT: "print", STAGE: "stage", ASR: "asr", TRANSLATE: "translate",
+              DETECT: "detect"}
+
+Record = namedtuple("Record", "t kind code payload")
+
+
+class TraceWriter:
+    """Appends records to a memory-mapped trace file; safe to call from any thread."""
+
+    def __init__(self, path, chunk_size=4 << 20):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.records = 0
+        self._file = open(path, "w+b")
+        self._size = chunk_size
+        self._file.truncate(self._size)
+        self._map = mmap.mmap(self._file.fileno(), self._size)
+        self._map[:len(MAGIC)] = MAGIC
+        self._offset = len(MAGIC)
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, kind, payload=b"", code=0):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        t = time.monotonic() - self._start
+        with self._lock:
+            if self._map is None:
+                return
+            end = self._offset + RECORD.size + len(payload)
+            if end > self._size:
+                self._grow(end)
+            RECORD.pack_into(self._map, self._offset, t, kind, code, len(payload))
+            self._map[self._offset + RECORD.size:end] = payload
+            self._offset = end
+            self.records += 1
+
+    def write_json(self, kind, **fields):
+        self.write(kind, json.dumps(fields, ensure_ascii=False))
+
+    def _grow(self, needed):
+        # remap rather than mmap.resize(), which isn't available everywhere
+        self._map.close()
+        while self._size < needed:
+            self._size += self.chunk_size
+        self._file.truncate(self._size)
+        self._map = mmap.mmap(self._file.fileno(), self._size)
+
+    def close(self):
+        """Flush and cut the file down to the records written."""
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            self._map.close()
+            self._map = None
+            self._file.truncate(self._offset)
+            self._file.close()
+
+
+def read_trace(path):
+    """All records of a trace file, stopping at the end marker or a torn last record."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a session trace")
+            records = []
+            offset = len(MAGIC)
+            while offset + RECORD.size <= len(data):
+                t, kind, code, length = RECORD.unpack_from(data, offset)
+                start = offset + RECORD.size
+                if kind == 0 or start + length > len(data):
+                    break
+                records.append(Record(t, kind, code, data[start:start + length]))
+                offset = start + length
+            return records
+
+
+def load_json(record):
+    return json.loads(record.payload.decode())
+
+
+class TracedFrame:
+    """
+    Wraps a FrameMsg so what goes to and comes from Frame is recorded in a trace.
+    Everything else is passed straight through.
+    """
+
+    def __init__(self, frame, trace):
+        self._frame = frame
+        self._trace = trace
+        self._last_inbound = None
+
+    def __getattr__(self, name):
+        return getattr(self._frame, name)
+
+    async def send_message(self, msg_code, payload, *args, **kwargs):
+        self._trace.write(MESSAGE_OUT, bytes(payload), msg_code)
+        return await self._frame.send_message(msg_code, payload, *args, **kwargs)
+
+    async def send_lua(self, string, *args, **kwargs):
+        self._trace.write(LUA_OUT, string)
+        response = await self._frame.send_lua(string, *args, **kwargs)
+        if response is not None:
+            self._trace.write(PRINT, str(response))
+        return response
+
+    def attach_print_response_handler(self, handler=print):
+        def traced(text):
+            self._trace.write(PRINT, str(text))
+            handler(text)
+        self._frame.attach_print_response_handler(traced)
+
+    def register_data_response_handler(self, subscriber, msg_codes, handler):
+        def traced(data):
+            # several subscribers can get the same notification; record it once
+            if data is not self._last_inbound:
+                self._last_inbound = data
+                self._trace.write(DATA_IN, bytes(data), data[0])
+            handler(data)
+        self._frame.register_data_response_handler(subscriber, msg_codes, traced)
+
+
+class RecordingBackend(ASRBackend):
+    """Passes calls to an ASR backend and records each result with its duration."""
+
+    def __init__(self, backend, trace):
+        self.backend = backend
+        self.trace = trace
+        self.name = backend.name
+
+    def warm_up(self):
+        self.backend.warm_up()
+
+    def _record(self, call):
+        start = time.perf_counter()
+        try:
+            text = call()
+        except Exception as e:
+            self.trace.write_json(ASR, error=str(e), seconds=time.perf_counter() - start)
+            raise
+        self.trace.write_json(ASR, text=text, seconds=time.perf_counter() - start)
+        return text
+
+    def transcribe(self, audio):
+        return self._record(lambda: self.backend.transcribe(audio))
+
+    def transcribe_stream(self, chunks, sample_rate, sample_width):
+        start = time.perf_counter()
+        for text, is_final in self.backend.transcribe_stream(chunks, sample_rate, sample_width):
+            if is_final:
+                self.trace.write_json(ASR, text=text, seconds=time.perf_counter() - start)
+            yield text, is_final
+
+
+class RecordingTranslator:
+    """Passes calls to a CachedTranslator and records each result with its duration."""
+
+    def __init__(self, translator, trace):
+        self.translator = translator
+        self.trace = trace
+
+    def translate(self, text, target):
+        start = time.perf_counter()
+        translated, lang = self.translator.translate(text, target)
+        self.trace.write_json(TRANSLATE, text=text, target=target, translated=translated,
+                              lang=lang, seconds=time.perf_counter() - start)
+        return translated, lang
+
+    def detect(self, text):
+        start = time.perf_counter()
+        lang = self.translator.detect(text)
+        self.trace.write_json(DETECT, text=text, lang=lang, seconds=time.perf_counter() - start)
+        return lang
@@ -0,0 +1,149 @@
+"""
+Translation cache for the live translators.
+
+Greetings, "thank you" and signage come up again and again, and every one of them used
+to cost a detect() and a translate() round trip to Google. TranslationCache keeps a
+bounded in-memory LRU keyed by (normalized text, source, target), optionally backed by
+a sqlite file so the cache survives restarts, with entries expiring after a TTL.
+
+CachedTranslator sits in front of googletrans.Translator: translate() returns the
+detected source language along with the translation, so a cache miss costs a single
+request, and the detected language is remembered for later detect() calls.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# source/target used for entries that only record the detected language of a text
+AUTO = "auto"
+DETECT = ""
+
+
+def normalize(text):
+    """Cache key form of a phrase: case and whitespace differences don't matter."""
+    return " ".join(text.split()).casefold()
+
+
+class TranslationCache:
+    """
+    Bounded LRU of (translated text, detected language), optionally persisted to sqlite.
+
+    Thread-safe, since lookups happen from the backend worker threads.
+    """
+
+    def __init__(self, maxsize=512, db_path=None, ttl=30 * 24 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " text TEXT, source TEXT, target TEXT,"
+                " translated TEXT, detected TEXT, created REAL,"
+                " PRIMARY KEY (text, source, target))")
+            self.evict_expired()
+
+    def get(self, text, source, target):
+        """Return (translated, detected) for a cached phrase, or None."""
+        key = (normalize(text), source, target)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[2] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1]
+
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT translated, detected, created FROM translations"
+                    " WHERE text = ? AND source = ? AND target = ? AND created > ?",
+                    (*key, now - self.ttl)).fetchone()
+            if row is None:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._remember(key, row)
+            self.disk_hits += 1
+            return row[0], row[1]
+
+    def put(self, text, source, target, translated, detected):
+        key = (normalize(text), source, target)
+        entry = (translated, detected, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                        (*key, *entry))
+
+    def evict_expired(self):
+        """Drop entries older than the TTL from memory and disk."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[2] <= cutoff]:
+                del self._entries[key]
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM translations WHERE created <= ?", (cutoff,))
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key, entry):
+        self._entries[key] = tuple(entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class CachedTranslator:
+    """googletrans.Translator front-end that answers repeated phrases from a TranslationCache."""
+
+    def __init__(self, translator, cache):
+        self.translator = translator
+        self.cache = cache
+
+    def translate(self, text, target):
+        """Return (translated text, detected source language) with at most one request."""
+        hit = self.cache.get(text, AUTO, target)
+        if hit is not None:
+            return hit
+
+        result = self.translator.translate(text, dest=target)
+        self.cache.put(text, AUTO, target, result.text, result.src)
+        self.cache.put(text, AUTO, DETECT, "", result.src)
+        return result.text, result.src
+
+    def detect(self, text):
+        """Return the language of text, reusing what any earlier translate() found out."""
+        hit = self.cache.get(text, AUTO, DETECT)
+        if hit is not None:
+            return hit[1]
+
+        lang = self.translator.detect(text).lang
+        self.cache.put(text, AUTO, DETECT, "", lang)
+        return lang
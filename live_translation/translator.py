@@ -1,15 +1,92 @@
 import asyncio
-from frame_msg import FrameMsg, RxAudio, TxCode
+from frame_msg import FrameMsg, RxAudio
 from googletrans import Translator
 import speech_recognition as sr
 import io
+import sys
+import time
+from collections import deque
+from pathlib import Path
 
-# Initialize translator
-translator = Translator()
+from asr_backends import get_backend
+from audio_codec import AUDIO_CTRL, AudioFormat, audio_ctrl
+from pipeline import TranslationPipeline
+from progressive_display import ProgressiveDisplay
+from session_trace import STAGE, RecordingBackend, RecordingTranslator, TraceWriter, TracedFrame
+from translation_cache import CachedTranslator, TranslationCache
+from vad import VoiceActivityDetector
+from workers import BlockingExecutor
+
+# shared helpers live in frame_common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.metrics import HealthPoller, HealthRequest, Metrics
+from frame_common.serial_frame import SerialFrame
+from frame_common.text_layout import can_render, tail
+from frame_common.text_raster import DEFAULT_FONT, TextRasterizer
+from frame_common.upload_manager import UploadManager
 
 # Configuration
 TARGET_LANGUAGE = "en"
-RECORDING_DURATION = 5
+
+# Speech recognition engine: "google" (network), "vosk" (offline, needs a model) or "stub"
+ASR_BACKEND = "google"
+ASR_OPTIONS = {}             # e.g. {"model_path": "vosk-model-small-en-us-0.15"} for vosk
+asr = get_backend(ASR_BACKEND, **ASR_OPTIONS)
+
+# Repeated phrases are answered from the translation cache instead of Google
+CACHE_SIZE = 512             # phrases kept in memory
+CACHE_DB = "translations.db" # on-disk cache, or None to keep it in memory only
+CACHE_TTL = 30 * 24 * 3600   # seconds before a cached translation is fetched again
+
+# Opened by main() (see open_translator), unless a translator was put here beforehand
+translation_cache = None
+translator = None
+
+# Mic stream format: "ulaw" sends 16-bit samples as one byte each, so it costs the
+# same 8000 B/s as 8-bit PCM at 8 kHz with far less quantization noise
+AUDIO_FORMAT = AudioFormat(sample_rate=8000, bit_depth=16, encoding="ulaw")
+
+# Utterances are cut by voice activity detection instead of a fixed recording window
+VAD_SETTINGS = dict(
+    energy_threshold=0.02,       # minimum RMS, as a fraction of full scale
+    trailing_silence_ms=500,     # silence that ends an utterance
+    min_speech_ms=200,           # shorter bursts are ignored as clicks
+    max_utterance_s=15,          # long monologues are split here
+)
+CHUNK_TIMEOUT = 15               # seconds without any audio before restarting the stream
+
+# Results are shown progressively: transcript first, then the translation replaces it.
+# Streaming backends (vosk, stub) also show partial transcripts while they decode.
+PARTIAL_RESULTS = True
+PARTIAL_CHUNK_S = 0.5            # audio fed to a streaming backend per partial result
+DISPLAY_BYTES_PER_SECOND = 2000  # BLE budget for text updates
+
+# Text Frame's font has no glyphs for (Arabic, Urdu, CJK, ...) is drawn on the host
+# and sent as a 1-2 bpp sprite instead
+RASTER_TEXT = "auto"             # "auto" (only when needed), "always" or "never"
+RASTER_FONT = DEFAULT_FONT       # a TrueType font covering the target script
+RASTER_SIZE = 36
+RASTER_BPP = 1                   # 2 keeps some antialiasing for twice the bytes
+
+# Per-stage latency histograms and Frame battery / Lua heap, for long field sessions
+METRICS_JSONL = "metrics.jsonl"     # every observation as a JSON line, or None
+METRICS_PROM = "metrics.prom"       # Prometheus text file rewritten on each health poll, or None
+HEALTH_INTERVAL = 30                # seconds between battery / Lua heap polls
+metrics = Metrics(METRICS_JSONL, METRICS_PROM, prefix="frame_translator")
+
+# Record the session (mic chunks, messages, Lua prints, stage timings, ASR and translate
+# results) to a memory-mapped trace that replay_session.py plays back offline
+TRACE_FILE = None                   # e.g. "session.trace", or None
+trace = TraceWriter(TRACE_FILE) if TRACE_FILE else None
+if trace:
+    asr = RecordingBackend(asr, trace)
+    metrics.listeners.append(lambda stage, seconds: trace.write_json(STAGE, stage=stage, seconds=seconds))
+
+# Blocking speech/translate calls run in this thread pool so they don't stall BLE
+# handlers. It has to be threads: the calls use the ASR backend and translation cache
+# set up in this process, which a process pool's workers wouldn't have.
+EXECUTOR_WORKERS = 4
+BACKEND_TIMEOUT = 20         # seconds before a speech/translate call is abandoned
 
 async def display_text_on_frame(frame, text, duration=3):
     """Display text on Frame glasses."""
@@ -20,106 +97,244 @@ async def display_text_on_frame(frame, text, duration=3):
         print(f"Display error: {e}")
 
 def transcribe_audio_from_wav(wav_bytes):
-    """Transcribe audio from WAV bytes using Google Speech Recognition."""
+    """Transcribe audio from WAV bytes using the configured ASR backend."""
     recognizer = sr.Recognizer()
-    recognizer.energy_threshold = 300
-    recognizer.dynamic_energy_threshold = True
-    recognizer.pause_threshold = 0.8
-    
+    with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+        audio = recognizer.record(source)
+    return recognize_audio(audio)
+
+def transcribe_pcm_buffer(pcm_buffer, on_partial=None):
+    """
+    Transcribe a captured utterance straight from its PcmBuffer, without a WAV round trip.
+
+    With on_partial, the clip is fed to the backend in PARTIAL_CHUNK_S pieces and
+    on_partial(text) is called with each interim result a streaming backend produces.
+    """
+    if on_partial is None:
+        audio = sr.AudioData(pcm_buffer.wav_samples(), pcm_buffer.sample_rate, pcm_buffer.sample_width)
+        return recognize_audio(audio)
+
+    samples = pcm_buffer.wav_samples()
+    step = int(PARTIAL_CHUNK_S * pcm_buffer.sample_rate) * pcm_buffer.sample_width
+    chunks = (samples[i:i + step] for i in range(0, len(samples), step))
     try:
-        audio_file = io.BytesIO(wav_bytes)
-        with sr.AudioFile(audio_file) as source:
-            audio = recognizer.record(source)
-            print("🔄 Transcribing...")
-            text = recognizer.recognize_google(audio, language=None)
-            return text.strip()
-    except sr.UnknownValueError:
-        print("❌ Could not understand audio")
-        return ""
-    except sr.RequestError as e:
-        print(f"❌ API error: {e}")
-        return ""
+        print("🔄 Transcribing...")
+        for text, is_final in asr.transcribe_stream(chunks, pcm_buffer.sample_rate,
+                                                     pcm_buffer.sample_width):
+            if is_final:
+                return text
+            if text:
+                on_partial(text)
+    except Exception as e:
+        print(f"❌ Transcription error: {e}")
+    return ""
+
+def recognize_audio(audio):
+    """Transcribe sr.AudioData using the configured ASR backend."""
+    try:
+        print("🔄 Transcribing...")
+        return asr.transcribe(audio)
     except Exception as e:
         print(f"❌ Transcription error: {e}")
         return ""
 
+def open_translator():
+    """Put the translation cache in front of Google Translate, unless a translator is set."""
+    global translation_cache, translator
+    if translator is not None:
+        return
+    translation_cache = TranslationCache(CACHE_SIZE, CACHE_DB, CACHE_TTL)
+    translator = CachedTranslator(Translator(), translation_cache)
+    if trace:
+        translator = RecordingTranslator(translator, trace)
+
+def close_translator():
+    """Close the translation cache opened by open_translator()."""
+    global translation_cache, translator
+    if translation_cache is not None:
+        translation_cache.close()
+        translation_cache = translator = None
+
 def translate_text(text, target_lang="en"):
     """Translate text using Google Translate."""
+    return translate_with_detection(text, target_lang)[0]
+
+def translate_with_detection(text, target_lang="en"):
+    """Translate text and report its detected language, in a single (cached) request."""
     try:
-        result = translator.translate(text, dest=target_lang)
-        return result.text
+        return translator.translate(text, target_lang)
     except Exception as e:
         print(f"Translation error: {e}")
-        return None
+        return None, "unknown"
 
 def detect_language(text):
     """Detect the language of text."""
     try:
-        result = translator.detect(text)
-        return result.lang
+        return translator.detect(text)
     except Exception as e:
         return "unknown"
 
-async def record_audio_from_frame(frame, rx_audio, duration=5):
-    """Record audio from Frame microphone and return WAV bytes."""
-    try:
-        # Clear any pending audio
-        while not rx_audio.audio_queue.empty():
-            try:
-                rx_audio.audio_queue.get_nowait()
-            except:
-                break
-        
-        print(f"🎤 Recording for {duration} seconds - SPEAK NOW!")
-        
-        # Start streaming
-        await frame.send_message(0x30, TxCode(value=1).pack())
-        await asyncio.sleep(0.2)  # Give it time to start
-        
-        # Record for duration
-        await asyncio.sleep(duration)
-        
-        # Stop streaming
-        await frame.send_message(0x30, TxCode(value=0).pack())
-        await asyncio.sleep(0.2)  # Give it time to flush
-        
-        # Get audio samples with longer timeout
-        print("⏳ Waiting for audio data...")
-        audio_samples = await asyncio.wait_for(
-            rx_audio.audio_queue.get(), 
-            timeout=15.0
-        )
-        
-        if len(audio_samples) == 0:
-            print("⚠️  Empty audio buffer")
+class FrameMicStream:
+    """
+    Keeps the Frame mic streaming and hands back one VAD-segmented utterance at a time.
+
+    Chunks from a streaming RxAudio are decoded from audio_format and fed to the VAD as
+    they arrive, so an utterance is returned as soon as the speaker pauses rather than
+    after a fixed window. Time spent decoding and segmenting the chunks behind each
+    utterance is recorded as "ble_drain", with the chunks still queued as a gauge.
+    """
+
+    def __init__(self, frame, rx_audio, vad, audio_format=AudioFormat()):
+        self.frame = frame
+        self.rx_audio = rx_audio
+        self.vad = vad
+        self.audio_format = audio_format
+        self.streaming = False
+        self._ready = deque()
+        self._drain = 0.0
+
+    async def start(self):
+        self.vad.reset()
+        await self.frame.send_message(AUDIO_CTRL, audio_ctrl(True, self.audio_format))
+        self.streaming = True
+        print("🎤 Listening - SPEAK NOW!")
+
+    async def stop(self):
+        if self.streaming:
+            self.streaming = False
+            await self.frame.send_message(AUDIO_CTRL, audio_ctrl(False))
+
+    async def next_utterance(self):
+        """Return the next utterance as a PcmBuffer, or None if the mic went quiet on us."""
+        try:
+            while not self._ready:
+                if not self.streaming:
+                    await self.start()
+
+                chunk = await asyncio.wait_for(self.rx_audio.audio_queue.get(),
+                                               timeout=CHUNK_TIMEOUT)
+                if chunk is None:
+                    # Frame ended the stream; keep whatever was said and restart it
+                    self.streaming = False
+                    self._ready.extend(self.vad.flush())
+                    continue
+
+                start = time.perf_counter()
+                self._ready.extend(self.vad.feed(self.audio_format.decode(chunk)))
+                self._drain += time.perf_counter() - start
+
+            metrics.observe("ble_drain", self._drain)
+            metrics.set_gauge("audio_backlog_chunks", self.rx_audio.audio_queue.qsize())
+            self._drain = 0.0
+            pcm_buffer = self._ready.popleft()
+            samples = len(pcm_buffer) // pcm_buffer.sample_width
+            print(f"✅ Captured {len(pcm_buffer)} bytes ({samples} samples)")
+            return pcm_buffer
+
+        except asyncio.TimeoutError:
+            print("❌ Timeout - no audio received from Frame")
+            print("   Check: Is Frame mic working? Try tapping the Frame.")
+            self.streaming = False
             return None
-        
-        # Convert to WAV
-        wav_bytes = RxAudio.to_wav_bytes(audio_samples)
-        print(f"✅ Captured {len(wav_bytes)} bytes ({len(audio_samples)} samples)")
-        
-        return wav_bytes
-    
-    except asyncio.TimeoutError:
-        print("❌ Timeout - no audio received from Frame")
-        print("   Check: Is Frame mic working? Try tapping the Frame.")
+
+def make_rasterizer():
+    """The display's rasterize hook for RASTER_TEXT, or None to always send text."""
+    if RASTER_TEXT == "never":
         return None
-    except Exception as e:
-        print(f"❌ Recording error: {e}")
-        import traceback
-        traceback.print_exc()
+    try:
+        rasterizer = TextRasterizer(RASTER_FONT, RASTER_SIZE, RASTER_BPP)
+    except OSError as e:
+        print(f"⚠️  Can't load {RASTER_FONT} ({e}); non-Latin text won't display")
         return None
 
-async def main():
-    frame = FrameMsg()
+    def rasterize(text):
+        if RASTER_TEXT == "auto" and can_render(text):
+            return None
+        return rasterizer.pack(text)
+    return rasterize
+
+def build_pipeline(mic, executor, display):
+    """Wire the Frame mic, speech/translate backends and the progressive display into a pipeline."""
+    loop = asyncio.get_running_loop()
+
+    async def capture():
+        pcm_buffer = await mic.next_utterance()
+        if pcm_buffer is None or len(pcm_buffer) == 0:
+            print("⚠️  No audio captured")
+        return pcm_buffer
+
+    async def transcribe(pcm_buffer):
+        # converts in place, so the backend call finds the samples ready
+        with metrics.time("wav"):
+            pcm_buffer.wav_samples().release()
+        done = False
+
+        def show_partial(text):
+            # a call abandoned after a timeout keeps decoding; what it finds is stale
+            if not done:
+                display.update(text)
+
+        def on_partial(text):
+            # called from the executor thread while a streaming backend decodes
+            loop.call_soon_threadsafe(show_partial, text)
+
+        try:
+            text = await executor.run(transcribe_pcm_buffer, pcm_buffer, on_partial if PARTIAL_RESULTS else None)
+        finally:
+            done = True
+        if text == "":
+            print("❌ No speech recognized")
+        return text
+
+    async def translate(text, target_lang):
+        translated, detected_lang = await executor.run(translate_with_detection, text, target_lang)
+        print(f"✅ Heard ({detected_lang}): '{text}'")
+
+        # Skip if already in target language
+        if detected_lang == target_lang:
+            print(f"✓ Already in {target_lang}")
+            return text, detected_lang
+
+        if translated is None or translated == "":
+            print("❌ Translation failed")
+            return None, detected_lang
+
+        print(f"🌍 Translated: '{translated}'")
+        return translated, detected_lang
+
+    async def show(text):
+        # returns at once; the display task sends it when the link has room
+        display.update(text)
+
+    def preview(text):
+        if PARTIAL_RESULTS:
+            display.update(text)
+
+    return TranslationPipeline(capture, transcribe, translate, show,
+                               target_lang=TARGET_LANGUAGE, preview=preview, metrics=metrics)
+
+async def main(frame=None, max_utterances=None):
+    """Run the translator; a fake frame and max_utterances let benchmarks drive one session."""
+    # the display, mic control and health poller all send from their own tasks
+    frame = SerialFrame(frame or FrameMsg())
+    if trace:
+        frame = TracedFrame(frame, trace)
     rx_audio = None
+    mic = None
+    pipeline = None
+    display = None
+    health = None
+    executor = BlockingExecutor("thread", EXECUTOR_WORKERS, BACKEND_TIMEOUT)
+    open_translator()
     
     try:
         print("=" * 60)
         print("FRAME LIVE TRANSLATOR")
         print("=" * 60)
         print(f"Target Language: {TARGET_LANGUAGE}")
-        print(f"Recording Duration: {RECORDING_DURATION} seconds")
+        print(f"Utterance end: {VAD_SETTINGS['trailing_silence_ms']} ms of silence")
+        print(f"Mic: {AUDIO_FORMAT.sample_rate} Hz {AUDIO_FORMAT.bit_depth}-bit {AUDIO_FORMAT.encoding}, "
+              f"{AUDIO_FORMAT.bytes_per_second} B/s")
         print("Press Ctrl+C to stop")
         print("=" * 60)
         
@@ -135,13 +350,13 @@ async def main():
         )
         print(f"🔋 Battery/Memory: {batt_mem}")
         
-        # Upload Lua libraries
-        print("📤 Uploading Lua libraries...")
-        await frame.upload_stdlua_libs(lib_names=['data', 'code', 'audio'])
-        
-        # Upload Frame app
-        print("📤 Uploading Frame app...")
-        await frame.upload_frame_app(local_filename="lua/audio_frame_app.lua")
+        # Upload Lua libraries and the Frame app (skipping any already on Frame)
+        print("📤 Uploading Lua libraries and Frame app...")
+        uploads = UploadManager(frame)
+        await uploads.sync(stdlua_libs=['data', 'code', 'audio', 'sprite'],
+                           frame_app="lua/translator_frame_app.lua",
+                           extra_files={"mic.lua": "lua/mic.lua"})
+        print(f"📤 {uploads.report()}")
         
         # Attach handlers
         frame.attach_print_response_handler()
@@ -150,89 +365,69 @@ async def main():
         print("🚀 Starting Frame app...")
         await frame.start_frame_app()
         
+        # Load the speech model now rather than on the first utterance
+        print(f"🧠 Warming up {asr.name} speech recognition...")
+        await executor.run(asr.warm_up, timeout=120)
+        
         # Set up RxAudio ONCE and keep it attached
         print("🎧 Setting up audio receiver...")
-        rx_audio = RxAudio()
+        rx_audio = RxAudio(streaming=True)
         audio_queue = await rx_audio.attach(frame)
         rx_audio.audio_queue = audio_queue
+        vad = VoiceActivityDetector(AUDIO_FORMAT.sample_rate, AUDIO_FORMAT.sample_width, **VAD_SETTINGS)
+        mic = FrameMicStream(frame, rx_audio, vad, AUDIO_FORMAT)
         
-        await display_text_on_frame(frame, "Ready!", 2)
-        print("\n✅ Frame initialized successfully!\n")
+        # Text goes to the running Frame app as diffs from here on; print_short_text
+        # only works before the app starts
+        display = ProgressiveDisplay(frame.send_message, DISPLAY_BYTES_PER_SECOND,
+                                     layout=tail, rasterize=make_rasterizer(),
+                                     on_sent=lambda seconds: metrics.observe("display_send", seconds))
+        display.attach(frame).start()
         
-        # Main translation loop
-        recording_count = 0
+        # Battery and Lua heap, asked of the running app every HEALTH_INTERVAL seconds
+        health = HealthPoller(HealthRequest(frame).attach(), metrics, HEALTH_INTERVAL).start()
+        display.update("Ready!")
+        print("\n✅ Frame initialized successfully!\n")
         
-        while True:
-            recording_count += 1
-            print(f"\n{'='*60}")
-            print(f"Recording #{recording_count}")
-            print(f"{'='*60}")
-            
-            await display_text_on_frame(frame, "Listening...", 0.5)
-            
-            # Record audio
-            wav_bytes = await record_audio_from_frame(frame, rx_audio, RECORDING_DURATION)
-            
-            if wav_bytes is None or len(wav_bytes) == 0:
-                print("⚠️  No audio captured")
-                await display_text_on_frame(frame, "No audio", 1)
-                await asyncio.sleep(1)
-                continue
-            
-            # Process
-            await display_text_on_frame(frame, "Processing...", 0.5)
-            
-            # Transcribe
-            text = transcribe_audio_from_wav(wav_bytes)
-            
-            if text == "":
-                print("❌ No speech recognized")
-                await display_text_on_frame(frame, "No speech", 2)
-                continue
-            
-            # Detect language
-            detected_lang = detect_language(text)
-            print(f"✅ Heard ({detected_lang}): '{text}'")
-            
-            # Skip if already in target language
-            if detected_lang == TARGET_LANGUAGE:
-                print(f"✓ Already in {TARGET_LANGUAGE}")
-                await display_text_on_frame(frame, text, 4)
-                continue
-            
-            # Translate
-            await display_text_on_frame(frame, "Translating...", 0.5)
-            translated = translate_text(text, TARGET_LANGUAGE)
-            
-            if translated is None or translated == "":
-                print("❌ Translation failed")
-                await display_text_on_frame(frame, "Failed", 2)
-                continue
-            
-            print(f"🌍 Translated: '{translated}'")
-            
-            # Display
-            await display_text_on_frame(frame, translated, 5)
-            
-            print("\n⏳ Ready for next recording in 2 seconds...")
-            await asyncio.sleep(2)
+        # Main translation pipeline: capture, ASR, translate and display run
+        # concurrently so the mic is recording the next utterance while the
+        # previous one is still being processed
+        pipeline = build_pipeline(mic, executor, display)
+        await pipeline.run(max_utterances)
     
     except KeyboardInterrupt:
         print("\n\n👋 Stopping translator...")
-        await display_text_on_frame(frame, "Goodbye!", 1)
+        if display:
+            display.update("Goodbye!")
     
     except Exception as e:
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
-        try:
-            await display_text_on_frame(frame, "Error!", 2)
-        except:
-            pass
+        if display:
+            display.update("Error!")
     
     finally:
+        if pipeline:
+            print("\n📊 Stage latencies:")
+            for line in pipeline.report():
+                print(f"   {line}")
+            if translation_cache:
+                print(f"📊 Translation cache: {translation_cache.stats()}")
+            print(f"📊 Display: {display.report()}")
+            for line in metrics.report():
+                print(f"📈 {line}")
+
         # Cleanup
         try:
+            if health:
+                await health.stop()
+                health.query.detach()
+            if display:
+                await display.close()
+                display.detach(frame)
+            if mic:
+                await mic.stop()
             if rx_audio:
                 rx_audio.detach(frame)
             frame.detach_print_response_handler()
@@ -241,6 +436,12 @@ async def main():
             print("✅ Disconnected from Frame")
         except:
             pass
+        executor.shutdown()
+        close_translator()
+        metrics.close()
+        if trace:
+            trace.close()
+            print(f"🧾 Trace: {trace.records} records in {TRACE_FILE}")
 
 if __name__ == "__main__":
     asyncio.run(main())
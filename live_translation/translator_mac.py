@@ -2,39 +2,90 @@ import asyncio
 from frame_sdk import Frame
 from googletrans import Translator
 import speech_recognition as sr
+import sys
+from functools import lru_cache
+from pathlib import Path
 
-# Initialize
-translator = Translator()
-recognizer = sr.Recognizer()
+from asr_backends import get_backend
+from mic_listener import BackgroundListener, FileSource, PyAudioSource
+from pipeline import TranslationPipeline
+from translation_cache import CachedTranslator, TranslationCache
+from workers import BlockingExecutor
+
+# shared helpers live in frame_common/ at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_common.metrics import HEALTH_LUA, HealthPoller, Metrics
+from frame_common.text_layout import DISPLAY_HEIGHT, DISPLAY_WIDTH, FRAME_FONT, Box, paginate
 
 # Configuration
 TARGET_LANGUAGE = "en"
 
+# Speech recognition engine: "google" (network), "vosk" (offline, needs a model) or "stub"
+ASR_BACKEND = "google"
+ASR_OPTIONS = {}             # e.g. {"model_path": "vosk-model-small-en-us-0.15"} for vosk
+
+# Repeated phrases are answered from the translation cache instead of Google
+CACHE_SIZE = 512             # phrases kept in memory
+CACHE_DB = "translations.db" # on-disk cache, or None to keep it in memory only
+CACHE_TTL = 30 * 24 * 3600   # seconds before a cached translation is fetched again
+
+# Initialize; the translation cache is opened by main() (see open_translator), unless
+# a translator was put here beforehand
+translation_cache = None
+translator = None
+recognizer = sr.Recognizer()
+asr = get_backend(ASR_BACKEND, **ASR_OPTIONS)
+
+# Blocking mic/speech/translate calls run in this thread pool so they don't stall the
+# event loop; threads, because the calls use the recognizer, backend and cache set up
+# in this process
+EXECUTOR_WORKERS = 2
+BACKEND_TIMEOUT = 20         # seconds before a speech/translate call is abandoned
+LISTEN_TIMEOUT = 30          # listen() can take timeout + phrase_time_limit on its own
+
+# "background" keeps one mic stream open and cuts utterances with the VAD while earlier
+# ones are transcribed and shown; "per_utterance" reopens the mic and calibrates for
+# every phrase, as before
+LISTEN_MODE = "background"
+MIC_SAMPLE_RATE = 16000
+MIC_FILE = None              # a WAV file played as the microphone, e.g. to test without one
+VAD_SETTINGS = dict(
+    energy_threshold=0.01,       # minimum RMS, as a fraction of full scale
+    trailing_silence_ms=500,     # silence that ends an utterance
+    min_speech_ms=200,           # shorter bursts are ignored as clicks
+    max_utterance_s=15,          # long monologues are split here
+)
+
+executor = BlockingExecutor("thread", EXECUTOR_WORKERS, BACKEND_TIMEOUT)
+
+# Per-stage latency histograms and Frame battery / Lua heap, for long field sessions
+METRICS_JSONL = "metrics_mac.jsonl" # every observation as a JSON line, or None
+METRICS_PROM = "metrics_mac.prom"   # Prometheus text file rewritten on each health poll, or None
+HEALTH_INTERVAL = 30                # seconds between battery / Lua heap polls
+metrics = Metrics(METRICS_JSONL, METRICS_PROM, prefix="frame_translator_mac")
+
+# Text is laid out for the area the translator has always used, below the status line
+TEXT_BOX = Box(50, 100, DISPLAY_WIDTH - 50, DISPLAY_HEIGHT - 100)
+
+@lru_cache(maxsize=64)
+def page_lua(page, box=TEXT_BOX):
+    """One Lua chunk that draws a laid-out page, so a page costs one round trip."""
+    calls = []
+    for i, line in enumerate(page.split("\n")):
+        line = line.replace("\\", "\\\\").replace('"', '\\"')
+        calls.append(f'frame.display.text("{line}",{box.x},{box.y + i * FRAME_FONT.line_height})')
+    return ";".join(calls) + ";frame.display.show()"
+
 async def display_text_scroll(frame, text, scroll_delay=2.0):
     """
-    Displays text on Frame with word wrapping.
+    Displays text on Frame, wrapped to the display in pixels and shown a page at a time.
     """
-    max_width = 640
-    lines = []
-    
-    words = text.split()
-    current_line = ""
-    
-    for word in words:
-        test_line = current_line + word + " "
-        if len(test_line) <= max_width:
-            current_line = test_line
-        else:
-            if current_line:
-                lines.append(current_line.strip())
-            current_line = word + " "
+    pages = paginate(text, box=TEXT_BOX)
     
-    if current_line:
-        lines.append(current_line.strip())
-    
-    for i, line in enumerate(lines):
-        await frame.display.show_text(line, 50, 100)
-        if i < len(lines) - 1:
+    for i, page in enumerate(pages):
+        with metrics.time("display"):
+            await frame.run_lua(page_lua(page), checked=True)
+        if i < len(pages) - 1:
             await asyncio.sleep(scroll_delay)
         else:
             await asyncio.sleep(scroll_delay * 1.5)
@@ -50,48 +101,158 @@ def record_and_transcribe_from_mac():
             recognizer.adjust_for_ambient_noise(source, duration=0.5)
             
             print("   Speak now!")
-            audio = recognizer.listen(source, timeout=10, phrase_time_limit=15)
+            with metrics.time("capture"):
+                audio = recognizer.listen(source, timeout=10, phrase_time_limit=15)
             
             print("🔄 Transcribing...")
-            text = recognizer.recognize_google(audio)
-            return text.strip()
+            with metrics.time("asr"):
+                return asr.transcribe(audio)
     
     except sr.WaitTimeoutError:
         print("⏱️  Timeout - no speech detected")
         return ""
-    except sr.UnknownValueError:
-        print("❌ Could not understand audio")
-        return ""
-    except sr.RequestError as e:
-        print(f"❌ API error: {e}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
         return ""
+
+def transcribe_pcm_buffer(pcm_buffer):
+    """
+    Transcribe an utterance from the background listener.
+    """
+    try:
+        audio = sr.AudioData(pcm_buffer.wav_samples(), pcm_buffer.sample_rate, pcm_buffer.sample_width)
+        return asr.transcribe(audio)
     except Exception as e:
         print(f"❌ Error: {e}")
         return ""
 
+def open_translator():
+    """
+    Put the translation cache in front of Google Translate, unless a translator is set.
+    """
+    global translation_cache, translator
+    if translator is not None:
+        return
+    translation_cache = TranslationCache(CACHE_SIZE, CACHE_DB, CACHE_TTL)
+    translator = CachedTranslator(Translator(), translation_cache)
+
+def close_translator():
+    """
+    Close the translation cache opened by open_translator().
+    """
+    global translation_cache, translator
+    if translation_cache is not None:
+        translation_cache.close()
+        translation_cache = translator = None
+
 def translate_text(text, target_lang="en"):
     """
     Translate text using Google Translate.
     """
+    return translate_with_detection(text, target_lang)[0]
+
+def translate_with_detection(text, target_lang="en"):
+    """
+    Translate text and report its detected language, in a single (cached) request.
+    """
     try:
-        result = translator.translate(text, dest=target_lang)
-        return result.text
+        return translator.translate(text, target_lang)
     except Exception as e:
         print(f"Translation error: {e}")
-        return None
+        return None, "unknown"
 
 def detect_language(text):
     """
     Detect language of text.
     """
     try:
-        result = translator.detect(text)
-        return result.lang
+        return translator.detect(text)
     except Exception as e:
         print(f"Language detection error: {e}")
         return "unknown"
 
+async def run_backend(fn, *args, timeout=None, fallback=None):
+    """
+    Run a blocking backend call in the executor, treating a timeout like a failed call.
+    """
+    try:
+        return await executor.run(fn, *args, timeout=timeout)
+    except asyncio.TimeoutError as e:
+        print(f"⏱️  {e}")
+        return fallback
+
+def make_mic_source():
+    """
+    The microphone for background listening, or MIC_FILE played back in its place.
+    """
+    if MIC_FILE:
+        return FileSource(MIC_FILE)
+    return PyAudioSource(MIC_SAMPLE_RATE)
+
+async def listen_in_background(frame=None, health=None, source=None, max_utterances=None):
+    """
+    Translate from one long-lived mic stream: the listener keeps cutting utterances
+    while earlier ones are transcribed, translated and shown. Without a frame the
+    results are printed.
+    """
+    listener = BackgroundListener(source or make_mic_source(), **VAD_SETTINGS).start()
+    print(f"🎤 Listening continuously at {listener.source.sample_rate} Hz - speak any time!")
+    pipeline = None
+
+    async def capture():
+        with metrics.time("capture"):
+            pcm_buffer = await listener.next_utterance()
+        metrics.set_gauge("mic_backlog_utterances", listener.backlog)
+        if pcm_buffer is None:
+            # only a FileSource runs out
+            pipeline.stop()
+            return None
+        seconds = len(pcm_buffer) / pcm_buffer.sample_width / pcm_buffer.sample_rate
+        print(f"✅ Captured {seconds:.1f}s of speech")
+        return pcm_buffer
+
+    async def transcribe(pcm_buffer):
+        print("🔄 Transcribing...")
+        with metrics.time("asr"):
+            return await run_backend(transcribe_pcm_buffer, pcm_buffer, fallback="")
+
+    async def translate(text, target_lang):
+        with metrics.time("translate"):
+            translated, detected_lang = await run_backend(
+                translate_with_detection, text, target_lang, fallback=(None, "unknown"))
+        print(f"✅ Heard ({detected_lang}): '{text}'")
+        if detected_lang == target_lang:
+            print(f"✓ Already in {target_lang}")
+            return text, detected_lang
+        if translated is None or translated == "":
+            print("❌ Translation failed")
+            return None, detected_lang
+        print(f"🌍 Translated: '{translated}'")
+        return translated, detected_lang
+
+    async def show(text):
+        if frame is None:
+            print(f"📱 Display: {text}")
+            return
+        # between display updates, never during one
+        if health:
+            await health.poll_if_due()
+        await display_text_scroll(frame, text)
+
+    pipeline = TranslationPipeline(capture, transcribe, translate, show, target_lang=TARGET_LANGUAGE)
+    try:
+        await pipeline.run(max_utterances)
+    finally:
+        listener.stop()
+        print("\n📊 Stage latencies:")
+        for line in pipeline.report():
+            print(f"   {line}")
+        print(f"🎤 Noise floor {listener.noise_floor:.4f}, {listener.dropped} utterances dropped, "
+              f"{listener.source.overflows} input overflows")
+
 async def main():
+    open_translator()
+    
     # Check if Frame is available
     frame_available = True
     frame = None
@@ -109,9 +270,21 @@ async def main():
             print("Press Ctrl+C to stop")
             print("=" * 60)
             
+            # Load the speech model now rather than on the first recording
+            print(f"🧠 Warming up {asr.name} speech recognition...")
+            await run_backend(asr.warm_up, timeout=120)
+            
             await frame.display.show_text("Translator Ready", 50, 100)
             
+            # Battery and Lua heap are read between recordings, never during a display update
+            health = HealthPoller(lambda: frame.run_lua(HEALTH_LUA, await_print=True),
+                                  metrics, HEALTH_INTERVAL)
+            
             try:
+                if LISTEN_MODE == "background":
+                    await listen_in_background(frame, health)
+                    return
+                
                 recording_count = 0
                 
                 while True:
@@ -120,18 +293,23 @@ async def main():
                     print(f"Recording #{recording_count}")
                     print(f"{'='*60}")
                     
+                    await health.poll_if_due()
                     await frame.display.show_text("Listening...", 50, 100)
                     
                     # Record and transcribe from Mac mic
-                    text = record_and_transcribe_from_mac()
+                    text = await run_backend(record_and_transcribe_from_mac, timeout=LISTEN_TIMEOUT, fallback="")
                     
                     if text == "":
                         await frame.display.show_text("No speech", 50, 100)
                         await asyncio.sleep(1)
                         continue
                     
-                    # Detect language
-                    detected_lang = detect_language(text)
+                    # Translate (the same request tells us the source language)
+                    await frame.display.show_text("Translating...", 50, 100)
+                    
+                    with metrics.time("translate"):
+                        translated, detected_lang = await run_backend(
+                            translate_with_detection, text, TARGET_LANGUAGE, fallback=(None, "unknown"))
                     print(f"✅ Heard ({detected_lang}): '{text}'")
                     
                     # Skip translation if already in target language
@@ -140,11 +318,6 @@ async def main():
                         await display_text_scroll(frame, text)
                         continue
                     
-                    # Translate
-                    await frame.display.show_text("Translating...", 50, 100)
-                    
-                    translated = translate_text(text, TARGET_LANGUAGE)
-                    
                     if translated is None or translated == "":
                         print("❌ Translation failed")
                         await frame.display.show_text("Translation failed", 50, 100)
@@ -186,6 +359,10 @@ async def main():
         print("=" * 60)
         
         try:
+            if LISTEN_MODE == "background":
+                await listen_in_background()
+                return
+            
             recording_count = 0
             
             while True:
@@ -195,13 +372,15 @@ async def main():
                 print(f"{'='*60}")
                 
                 # Record and transcribe from Mac mic
-                text = record_and_transcribe_from_mac()
+                text = await run_backend(record_and_transcribe_from_mac, timeout=LISTEN_TIMEOUT, fallback="")
                 
                 if text == "":
                     continue
                 
-                # Detect language
-                detected_lang = detect_language(text)
+                # Translate (the same request tells us the source language)
+                with metrics.time("translate"):
+                    translated, detected_lang = await run_backend(
+                        translate_with_detection, text, TARGET_LANGUAGE, fallback=(None, "unknown"))
                 print(f"✅ Heard ({detected_lang}): '{text}'")
                 
                 # Skip translation if already in target language
@@ -210,9 +389,6 @@ async def main():
                     print(f"📱 Display: {text}")
                     continue
                 
-                # Translate
-                translated = translate_text(text, TARGET_LANGUAGE)
-                
                 if translated is None or translated == "":
                     print("❌ Translation failed")
                     continue
@@ -232,4 +408,13 @@ async def main():
             traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        executor.shutdown()
+        if translation_cache:
+            print(f"📊 Translation cache: {translation_cache.stats()}")
+        for line in metrics.report():
+            print(f"📈 {line}")
+        close_translator()
+        metrics.close()
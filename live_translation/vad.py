@@ -0,0 +1,175 @@
+"""
+Energy/zero-crossing voice activity detection over streamed PCM chunks.
+
+Frame streams mic audio to the host in MTU-sized chunks of signed PCM. Instead of
+recording a fixed window, VoiceActivityDetector.feed() is called with each chunk as
+it arrives and returns any utterances that were closed off by trailing silence, so
+a short phrase is handed to ASR as soon as the speaker stops and a long one is
+not cut in half.
+
+Per-frame energy and zero-crossing rate are computed with NumPy across every whole
+analysis frame in a chunk at once; only the small speech/silence state machine runs
+per frame in Python. Samples go straight into a pooled PcmBuffer (with the pre-roll
+kept in a PcmRing), so a finished utterance is handed off without joining or copying.
+"""
+import numpy as np
+
+from audio_buffer import BufferPool, PcmRing
+
+
+class VoiceActivityDetector:
+    """
+    Incremental utterance segmenter for signed 8- or 16-bit mono PCM.
+
+    A frame counts as speech when its RMS energy is above both `energy_threshold`
+    (as a fraction of full scale) and `noise_ratio` times the running noise floor,
+    and its zero-crossing rate is below `max_zcr` (broadband hiss crosses zero far
+    more often than voiced speech). An utterance opens after `start_ms` of speech,
+    includes `pre_roll_ms` of audio from before the onset, and closes after
+    `trailing_silence_ms` of silence or once it reaches `max_utterance_s`.
+    Utterances with less than `min_speech_ms` of speech are discarded as clicks.
+
+    Completed utterances are PcmBuffers from `pool`; call release() on each once it
+    has been transcribed so its memory is reused for a later utterance.
+    """
+
+    def __init__(self, sample_rate=8000, sample_width=1, frame_ms=20,
+                 energy_threshold=0.02, noise_ratio=3.0, max_zcr=0.35,
+                 start_ms=60, trailing_silence_ms=500, min_speech_ms=200,
+                 pre_roll_ms=200, max_utterance_s=15.0, pool=None):
+        if sample_width not in (1, 2):
+            raise ValueError(f"sample_width must be 1 or 2 bytes, got {sample_width}")
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_len * sample_width
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.max_zcr = max_zcr
+
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.trailing_frames = max(1, trailing_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000) // frame_ms
+
+        self._dtype = np.int8 if sample_width == 1 else np.dtype("<i2")
+        self._full_scale = 128.0 if sample_width == 1 else 32768.0
+
+        pre_roll_frames = max(1, pre_roll_ms // frame_ms)
+        if pool is None:
+            pool = BufferPool((self.max_frames + pre_roll_frames) * self.frame_bytes,
+                              sample_rate, sample_width)
+        self.pool = pool
+
+        self._pending = b""
+        self._pre_roll = PcmRing(pre_roll_frames * self.frame_bytes)
+        self._current = None
+        self._noise_floor = energy_threshold / noise_ratio
+        # total frames analysed, so callers can convert positions to stream time
+        self.frames_seen = 0
+        self.reset()
+
+    def reset(self):
+        """Drop any partial utterance (e.g. when the mic stream is restarted)."""
+        self._pending = b""
+        self._pre_roll.clear()
+        if self._current is not None:
+            self._current.release()
+            self._current = None
+        self._utterance_frames = 0
+        self._in_speech = False
+        self._onset = 0
+        self._speech_frames = 0
+        self._silent_run = 0
+
+    @property
+    def in_speech(self):
+        return self._in_speech
+
+    @property
+    def noise_floor(self):
+        """Running RMS of non-speech frames, as a fraction of full scale."""
+        return self._noise_floor
+
+    def classify(self, pcm):
+        """Vectorized speech/silence decision for each whole frame in `pcm`."""
+        samples = np.frombuffer(pcm, dtype=self._dtype)
+        n_frames = len(samples) // self.frame_len
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        frames = frames.astype(np.float32) / self._full_scale
+
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+
+        threshold = max(self.energy_threshold, self._noise_floor * self.noise_ratio)
+        speech = (energy > threshold) & (zcr < self.max_zcr)
+
+        # track the noise floor on frames that don't look like speech
+        quiet = energy[~speech]
+        if len(quiet):
+            self._noise_floor = 0.95 * self._noise_floor + 0.05 * float(np.median(quiet))
+        return speech
+
+    def feed(self, chunk):
+        """Add a chunk of PCM; returns a list of completed utterances (PcmBuffers), usually empty."""
+        # only the sub-frame leftover from the previous chunk is ever re-copied
+        data = self._pending + chunk if self._pending else chunk
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = bytes(data[usable:])
+        if usable == 0:
+            return []
+
+        completed = []
+        view = memoryview(data)[:usable]
+        for i, is_speech in enumerate(self.classify(view)):
+            frame = view[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            self.frames_seen += 1
+            utterance = self._step(frame, bool(is_speech))
+            if utterance is not None:
+                completed.append(utterance)
+        return completed
+
+    def flush(self):
+        """Close off whatever is in progress (end of stream); returns [] or [utterance]."""
+        utterance = self._close() if self._in_speech else None
+        self.reset()
+        return [utterance] if utterance else []
+
+    def _step(self, frame, is_speech):
+        if not self._in_speech:
+            self._pre_roll.write(frame)
+            self._onset = self._onset + 1 if is_speech else 0
+            if self._onset >= self.start_frames:
+                self._in_speech = True
+                self._current = self.pool.acquire()
+                self._utterance_frames = self._pre_roll.filled // self.frame_bytes
+                self._pre_roll.drain_into(self._current)
+                self._speech_frames = self._onset
+                self._silent_run = 0
+            return None
+
+        self._current.append(frame)
+        self._utterance_frames += 1
+        if is_speech:
+            self._speech_frames += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+
+        if self._silent_run >= self.trailing_frames or self._utterance_frames >= self.max_frames:
+            return self._close()
+        return None
+
+    def _close(self):
+        utterance, speech_frames = self._current, self._speech_frames
+        self._current = None
+        self._utterance_frames = 0
+        self._in_speech = False
+        self._onset = 0
+        self._speech_frames = 0
+        self._silent_run = 0
+        if speech_frames < self.min_speech_frames:
+            utterance.release()
+            return None
+        return utterance
@@ -0,0 +1,66 @@
+"""
+Runs blocking speech/translation backend calls off the asyncio event loop.
+
+The Google speech and translate clients are synchronous: called straight from a
+coroutine they freeze the loop, so BLE notifications (RxAudio chunks, Lua print
+responses) queue up until the call returns. BlockingExecutor pushes those calls
+into a thread or process pool via loop.run_in_executor and puts a timeout on them.
+"""
+import asyncio
+import concurrent.futures
+import functools
+
+
+class BlockingExecutor:
+    """
+    Thread/process pool for blocking backend calls, awaited with a timeout.
+
+    kind="thread" suits the network-bound Google calls; kind="process" is there for
+    CPU-heavy work that is self-contained: picklable, module-level callables that don't
+    rely on anything set up in this process, since a worker process starts without it.
+    The translator scripts' backend calls use the ASR backend and translation cache
+    their main() sets up, so they only run on threads.
+
+    On timeout or cancellation the awaiting coroutine is released straight away and
+    the pooled call is cancelled if it has not started yet. A call that is already
+    running can't be interrupted, so it finishes in the background and its result
+    is dropped.
+    """
+
+    def __init__(self, kind="thread", max_workers=4, timeout=30.0):
+        if kind == "thread":
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="backend")
+        elif kind == "process":
+            self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unknown executor kind: {kind!r} (expected 'thread' or 'process')")
+        self.kind = kind
+        self.timeout = timeout
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool and await its result.
+
+        The TimeoutError raised when it takes too long carries the pooled call's
+        concurrent.futures.Future as `future`, which is done once the call really ends.
+        """
+        future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            name = getattr(fn, "__name__", repr(fn))
+            error = asyncio.TimeoutError(f"{name} timed out after {timeout}s")
+            error.future = future
+            raise error from None
+
+    def shutdown(self, wait=False):
+        """Stop accepting work and drop anything still queued."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
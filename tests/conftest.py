@@ -0,0 +1,27 @@
+"""
+Shared fixtures: the repo's script folders on sys.path, as the scripts expect to run
+from them, and FakeFrameMsg transports over a fast simulated link.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "image_display"))
+sys.path.insert(0, str(ROOT / "live_translation"))
+
+from frame_common.fake_frame import FakeFrameMsg
+
+# Frame apps print this once they are up; FakeFrameMsg answers start_frame_app() with it
+READY = "Frame Lua app running"
+
+
+@pytest.fixture
+def make_frame():
+    """FakeFrameMsg factory; 1 ms packets keep the suite quick while still yielding."""
+    def make(**options):
+        options.setdefault("packet_ms", 1.0)
+        return FakeFrameMsg(**options)
+    return make
@@ -0,0 +1,27 @@
+"""animation_player.py drops frames that fall a whole interval behind on a slow link."""
+import asyncio
+
+from animation_player import USER_SPRITE, AnimationPlayer, demo_frames, quantize_frame
+
+FPS = 10
+SEND_INTERVALS = 3.3   # each sprite takes 3.3 frame intervals to cross the link
+
+
+def test_late_frames_are_dropped(make_frame):
+    image = next(demo_frames(size=(120, 80)))
+    frames = [image] * 8
+    packed, _ = quantize_frame((image.mode, image.size, image.convert("RGB").tobytes()))
+    frame = make_frame()
+    frame.packet_s = SEND_INTERVALS / FPS / frame.packets_for(len(packed))
+
+    with AnimationPlayer(frame, fps=FPS, prefetch=4, workers=2) as player:
+        stats = asyncio.run(player.play(frames))
+
+    # frame 0 is shown at once and takes until 3.3 intervals; 1 and 2 are past their
+    # slots by then, 3 is shown (until 6.6), 4 and 5 are dropped, 6 shown, 7 dropped
+    assert (stats.shown, stats.dropped) == (3, 5)
+    assert [code for code, _ in frame.messages] == [USER_SPRITE] * 3
+    assert frame.messages[0][1] == packed
+    # the dropped frames were skipped without waiting on their quantize
+    assert len(stats.quantize_times) == stats.shown
+    assert stats.cancelled <= stats.dropped
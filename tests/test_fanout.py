@@ -0,0 +1,71 @@
+"""group_translator.py fanning one guide's speech out to N FakeFrameMsg headsets."""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from frame_common.bench_e2e import TRANSCRIPT, apply_text_messages, speech_bursts
+
+from .conftest import READY, ROOT
+
+# the guide sees the transcript, everyone else a translation into their language
+LANGUAGES = [None, "en", "fr", "en", "de"]
+
+
+def expected(language):
+    return TRANSCRIPT if language is None else f"[{language}] hello, how are you?"
+
+
+def test_fanout(benchmark, make_frame, monkeypatch):
+    import group_translator
+    import translator
+    from asr_backends import StubBackend
+    from frame_common.metrics import Metrics
+    from translation_cache import CachedTranslator, TranslationCache
+
+    calls = []
+
+    class FakeGoogle:
+        def translate(self, text, dest):
+            calls.append(dest)
+            return SimpleNamespace(text=expected(dest), src="es")
+
+    audio_format = translator.AUDIO_FORMAT
+    gap = np.zeros(audio_format.sample_rate, dtype=np.int16)
+    stream = audio_format.encode(np.concatenate([gap, *speech_bursts(1, audio_format.sample_rate), gap]))
+
+    monkeypatch.chdir(ROOT / "live_translation")
+    monkeypatch.setattr(translator, "asr", StubBackend(TRANSCRIPT, latency=0.01))
+    monkeypatch.setattr(translator, "translator", CachedTranslator(FakeGoogle(), TranslationCache()))
+    monkeypatch.setattr(translator, "metrics", Metrics())
+    monkeypatch.setattr(group_translator, "HEADSETS", [{"name": f"Frame {i:02X}", "language": language}
+                                                       for i, language in enumerate(LANGUAGES)])
+    monkeypatch.setattr(group_translator, "GUIDE", 0)
+
+    def session():
+        frames = [make_frame(ready_message=READY, mic_audio=stream if i == 0 else b"",
+                             mic_speed=8, seed=i)
+                  for i in range(len(LANGUAGES))]
+        fanout = asyncio.run(group_translator.main(frames, max_utterances=1))
+        return fanout, frames
+
+    fanout, frames = benchmark.pedantic(session, rounds=1)
+    for headset, frame in zip(fanout.headsets, frames):
+        assert headset.online and frame.collisions == 0
+        assert apply_text_messages(frame.messages) == expected(headset.language)
+    # one translate call per language, not per headset
+    assert sorted(calls) == ["de", "en", "fr"]
+
+
+def test_headset_names_must_differ():
+    import group_translator
+
+    group_translator.check_headsets(group_translator.HEADSETS)
+    group_translator.check_headsets([{"name": None, "language": "en"}])
+    with pytest.raises(ValueError, match="name"):
+        group_translator.check_headsets([{"name": None, "language": None},
+                                         {"name": "Frame 4F", "language": "en"}])
+    with pytest.raises(ValueError, match="Frame 4F"):
+        group_translator.check_headsets([{"name": "Frame 4F", "language": None},
+                                         {"name": "Frame 4F", "language": "en"}])
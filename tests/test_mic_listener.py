@@ -0,0 +1,49 @@
+"""BackgroundListener segmenting a WAV played through FileSource as the microphone."""
+import asyncio
+
+from bench_mic_listener import synthetic_script
+from mic_listener import BackgroundListener, FileSource
+
+
+async def listen(source, **vad_settings):
+    listener = BackgroundListener(source, **vad_settings).start()
+    durations = []
+    try:
+        while (utterance := await listener.next_utterance()) is not None:
+            durations.append(len(utterance) / source.sample_width / source.sample_rate)
+            utterance.release()
+    finally:
+        listener.stop()
+    return durations, listener.dropped
+
+
+def test_one_utterance_per_phrase(benchmark, tmp_path):
+    wav_path = tmp_path / "script.wav"
+    phrases = synthetic_script(wav_path)
+
+    durations, dropped = benchmark.pedantic(
+        lambda: asyncio.run(listen(FileSource(wav_path, speed=0), trailing_silence_ms=500)),
+        rounds=3)
+    assert len(durations) == len(phrases) and dropped == 0
+    for (start, end), duration in zip(phrases, durations):
+        assert duration >= end - start
+
+
+def test_backlog_drops_oldest(tmp_path):
+    wav_path = tmp_path / "script.wav"
+    phrases = synthetic_script(wav_path)
+
+    async def late_reader():
+        listener = BackgroundListener(FileSource(wav_path, speed=0), max_backlog=2,
+                                      trailing_silence_ms=500).start()
+        while not listener.finished:
+            await asyncio.sleep(0.01)
+        kept = []
+        while (utterance := await listener.next_utterance()) is not None:
+            kept.append(utterance)
+            utterance.release()
+        listener.stop()
+        return kept, listener.dropped
+
+    kept, dropped = asyncio.run(late_reader())
+    assert len(kept) == 2 and dropped == len(phrases) - 2
@@ -0,0 +1,100 @@
+"""TranslationPipeline with fake stages: overlap, ordering and clip release."""
+import asyncio
+import time
+
+from pipeline import TranslationPipeline
+
+
+class Clip:
+    """Stands in for a pooled PcmBuffer."""
+
+    def __init__(self, seq):
+        self.seq = seq
+        self.released = False
+
+    def __bool__(self):
+        return True
+
+    def release(self):
+        self.released = True
+
+
+def make_pipeline(count, stage_s=0.02, transcribe=None):
+    clips = [Clip(seq) for seq in range(count)]
+    shown = []
+    pending = iter(clips)
+
+    async def capture():
+        await asyncio.sleep(stage_s)
+        return next(pending)
+
+    async def fake_transcribe(clip):
+        await asyncio.sleep(stage_s)
+        return f"frase {clip.seq}"
+
+    async def translate(text, target):
+        await asyncio.sleep(stage_s)
+        return text.replace("frase", "phrase"), "es"
+
+    async def display(text):
+        await asyncio.sleep(stage_s)
+        shown.append(text)
+
+    pipeline = TranslationPipeline(capture, transcribe or fake_transcribe, translate, display)
+    return pipeline, clips, shown
+
+
+def test_stages_overlap(benchmark):
+    count, stage_s = 6, 0.02
+
+    def run():
+        pipeline, clips, shown = make_pipeline(count, stage_s)
+        start = time.perf_counter()
+        asyncio.run(pipeline.run(max_utterances=count))
+        return pipeline, clips, shown, time.perf_counter() - start
+
+    pipeline, clips, shown, elapsed = benchmark.pedantic(run, rounds=3)
+    assert shown == [f"phrase {seq}" for seq in range(count)]
+    assert all(clip.released for clip in clips)
+    # one after another would take count * 4 stages
+    assert elapsed < count * 4 * stage_s * 0.6
+    assert pipeline.stats["end_to_end"].count == count
+
+
+def test_timed_out_clip_is_not_released_early():
+    async def transcribe(clip):
+        if clip.seq == 1:
+            raise asyncio.TimeoutError("speech backend took too long")
+        return f"frase {clip.seq}"
+
+    pipeline, clips, shown = make_pipeline(3, 0.001, transcribe)
+    asyncio.run(pipeline.run(max_utterances=3))
+    # with no future to say when the abandoned call ends, clip 1 never goes back to the pool
+    assert [clip.released for clip in clips] == [True, False, True]
+    assert shown == ["phrase 0", "phrase 2"]
+    assert pipeline.stats["asr"].errors == 1
+
+
+def test_timed_out_clip_is_released_when_the_call_ends():
+    from workers import BlockingExecutor
+
+    def slow_transcribe(clip):
+        time.sleep(0.2 if clip.seq == 1 else 0)
+        return f"frase {clip.seq}"
+
+    async def session():
+        with BlockingExecutor("thread", max_workers=2, timeout=0.05) as executor:
+            async def transcribe(clip):
+                return await executor.run(slow_transcribe, clip)
+
+            pipeline, clips, shown = make_pipeline(3, 0.001, transcribe)
+            await pipeline.run(max_utterances=3)
+            # the transcription of clip 1 is still running in its thread
+            still_reading = clips[1].released
+            await asyncio.sleep(0.3)
+            return clips, shown, still_reading
+
+    clips, shown, still_reading = asyncio.run(session())
+    assert not still_reading
+    assert [clip.released for clip in clips] == [True, True, True]
+    assert shown == ["phrase 0", "phrase 2"]
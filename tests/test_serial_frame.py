@@ -0,0 +1,36 @@
+"""Overlapping sends on one Frame: FakeFrameMsg fails them as frame_ble does, SerialFrame queues them."""
+import asyncio
+
+from frame_common.serial_frame import SerialFrame
+
+
+async def send_together(frame, count=3):
+    return await asyncio.gather(*(frame.send_message(0x20, bytes(500)) for _ in range(count)),
+                                return_exceptions=True)
+
+
+def test_overlapping_sends_fail(make_frame):
+    frame = make_frame()
+    results = asyncio.run(send_together(frame))
+    assert frame.collisions == 2
+    assert [str(r) for r in results if isinstance(r, Exception)] == ["device didn't respond"] * 2
+    assert len(frame.messages) == 1
+
+
+def test_serial_frame_queues_sends(make_frame):
+    frame = make_frame()
+    results = asyncio.run(send_together(SerialFrame(frame)))
+    assert results == [None] * 3
+    assert frame.collisions == 0 and len(frame.messages) == 3
+
+
+def test_serial_frame_passes_through(make_frame):
+    frame = make_frame()
+    serial = SerialFrame(frame)
+
+    async def mixed():
+        return await asyncio.gather(serial.send_lua("print(1)", await_print=True),
+                                    serial.send_message(0x31, bytes([1])))
+
+    health, _ = asyncio.run(mixed())
+    assert health == serial.health() == frame.health()
@@ -0,0 +1,94 @@
+"""session_daemon.py on FakeFrameMsg over a Unix socket, driven by SessionClient."""
+import asyncio
+import socket
+
+import pytest
+
+from frame_common.session_client import SessionClient
+from frame_common.session_daemon import APP_FILE, CLEAR_MSG, USER_SPRITE, USER_TEXT, SessionDaemon
+from sprite_cache import SpriteCache
+
+from .conftest import ROOT
+
+KOALA = ROOT / "image_display" / "images" / "koala.jpg"
+
+
+async def start_daemon(make_frame, socket_path):
+    daemon = SessionDaemon(make_frame, socket_path=str(socket_path))
+    task = asyncio.create_task(daemon.serve())
+    while daemon._server is None and not task.done():
+        await asyncio.sleep(0.01)
+    return daemon, task
+
+
+async def stop_daemon(daemon, task):
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await daemon.close()
+
+
+def test_jobs(make_frame, tmp_path):
+    socket_path = tmp_path / "frame.sock"
+
+    async def session():
+        daemon, task = await start_daemon(make_frame, socket_path)
+        try:
+            async with SessionClient(str(socket_path)) as client:
+                replies = [await client.show_text("Hello from the daemon"),
+                           await client.show_sprite(KOALA),
+                           await client.clear(),
+                           await client.request({"job": "ping"}),
+                           await client.request({"job": "dance"})]
+            return daemon.frame, replies
+        finally:
+            await stop_daemon(daemon, task)
+
+    frame, replies = asyncio.run(session())
+    assert all(reply["ok"] for reply in replies[:4])
+    assert replies[3]["jobs_done"] == 3
+    assert replies[4] == {"ok": False, "error": "unknown job: 'dance'"}
+    assert [code for code, _ in frame.messages] == [USER_TEXT, USER_SPRITE, CLEAR_MSG]
+    assert frame.messages[1][1] == SpriteCache().packed_sprite(KOALA)
+    assert frame.files["frame_app.lua"] == APP_FILE.read_text()
+    assert not frame.app_running   # close() stopped the app
+    assert not socket_path.exists()
+
+
+def test_second_daemon_is_refused(make_frame, tmp_path):
+    socket_path = tmp_path / "frame.sock"
+
+    async def session():
+        daemon, task = await start_daemon(make_frame, socket_path)
+        try:
+            second = SessionDaemon(make_frame, socket_path=str(socket_path))
+            with pytest.raises(RuntimeError, match="already listening"):
+                await second.serve()
+            await second.close()
+            # the first daemon still owns the socket and answers on it
+            async with SessionClient(str(socket_path)) as client:
+                return await client.request({"job": "ping"}), second.frame
+        finally:
+            await stop_daemon(daemon, task)
+
+    reply, second_frame = asyncio.run(session())
+    assert reply["ok"]
+    # refused before it connected to a Frame of its own
+    assert second_frame is None
+
+
+def test_stale_socket_is_replaced(make_frame, tmp_path):
+    socket_path = tmp_path / "frame.sock"
+    # what a daemon that died leaves behind: the socket file, with nobody listening
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(str(socket_path))
+    stale.close()
+
+    async def session():
+        daemon, task = await start_daemon(make_frame, socket_path)
+        try:
+            async with SessionClient(str(socket_path)) as client:
+                return await client.request({"job": "ping"})
+        finally:
+            await stop_daemon(daemon, task)
+
+    assert asyncio.run(session())["ok"]
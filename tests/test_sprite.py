@@ -0,0 +1,25 @@
+"""Koala.py's sprite send over the fake link."""
+import asyncio
+from pathlib import Path
+
+from .conftest import ROOT
+
+
+def test_koala_sprite(benchmark, make_frame, monkeypatch):
+    import Koala
+    from sprite_cache import SpriteCache
+    from sprite_codec import decompress_sprite
+
+    # Koala.py reads images/ and lua/ relative to image_display/
+    monkeypatch.chdir(ROOT / "image_display")
+    expected = SpriteCache().packed_sprite(Path("images/koala.jpg"))
+
+    def send():
+        frame = make_frame()
+        asyncio.run(Koala.main(frame, hold=0))
+        return frame
+
+    frame = benchmark.pedantic(send, rounds=3)
+    sprites = [payload for code, payload in frame.messages if code == 0x20]
+    assert len(sprites) == 1
+    assert decompress_sprite(sprites[0]) == expected
@@ -0,0 +1,39 @@
+"""Banded RLE round trip over the bundled images and bench_sprite_codec's generated graphics."""
+import pytest
+
+from bench_sprite_codec import packed_sprites
+from sprite_codec import HEADER, compress_sprite, decompress_sprite, iter_bands
+
+SPRITES = dict(packed_sprites())
+
+
+@pytest.mark.parametrize("band_bytes", [512, 2048])
+@pytest.mark.parametrize("name", sorted(SPRITES))
+def test_round_trip(name, band_bytes):
+    packed = SPRITES[name]
+    compressed = compress_sprite(packed, band_bytes)
+    assert decompress_sprite(compressed) == packed
+
+
+@pytest.mark.parametrize("name", sorted(SPRITES))
+def test_bands_match_pixels(name):
+    """Each band decodes to its rows of the original pixels, as sprite_frame_app.lua draws them."""
+    packed = SPRITES[name]
+    compressed = compress_sprite(packed)
+    if compressed is packed:
+        pytest.skip("sent uncompressed")
+    width, height, _, bpp, num_colors = HEADER.unpack_from(packed)
+    pixels = packed[HEADER.size + num_colors * 3:]
+    row_bytes = width * bpp / 8
+    drawn = b""
+    for row, band in iter_bands(compressed):
+        start = int(row * row_bytes)
+        assert band == pixels[start:start + len(band)], f"band at row {row} differs"
+        drawn += band
+    assert drawn == pixels
+
+
+def test_compress(benchmark):
+    packed = SPRITES["koala.jpg"]
+    compressed = benchmark(compress_sprite, packed)
+    assert len(compressed) < len(packed)
@@ -0,0 +1,91 @@
+"""Uploading the translator app and starting it, and the upload manifest that skips files."""
+import asyncio
+
+from frame_common.upload_manager import MANIFEST_FILE, RUNTIME_LUA, UploadManager
+
+from .conftest import READY, ROOT
+
+APP = ROOT / "live_translation" / "lua"
+LIBS = ['data', 'code', 'audio', 'sprite']
+
+
+async def sync(frame, frame_app=APP / "translator_frame_app.lua"):
+    uploads = UploadManager(frame)
+    await uploads.sync(stdlua_libs=LIBS, frame_app=str(frame_app),
+                       extra_files={"mic.lua": str(APP / "mic.lua")})
+    return uploads
+
+
+async def start(frame):
+    ready = []
+    await frame.connect()
+    uploads = await sync(frame)
+    frame.attach_print_response_handler(ready.append)
+    await frame.start_frame_app()
+    await frame.stop_frame_app()
+    await frame.disconnect()
+    return uploads, ready
+
+
+def test_startup_cold(benchmark, make_frame):
+    uploads, ready = benchmark.pedantic(
+        lambda frame: asyncio.run(start(frame)),
+        setup=lambda: ((make_frame(ready_message=READY),), {}), rounds=3)
+    assert ready == [READY]
+    assert RUNTIME_LUA.name in uploads.uploaded
+    assert "frame_app.lua" in uploads.uploaded and not uploads.skipped
+
+
+def test_startup_warm(benchmark, make_frame):
+    frame = make_frame(ready_message=READY)
+    asyncio.run(start(frame))
+
+    uploads, ready = benchmark.pedantic(lambda: asyncio.run(start(frame)), rounds=3)
+    assert ready == [READY]
+    assert uploads.uploaded == []
+
+
+async def resync(frame, tmp_path):
+    await frame.connect()
+    first = await sync(frame)
+    second = await sync(frame)
+
+    app = tmp_path / "translator_frame_app.lua"
+    app.write_text((APP / "translator_frame_app.lua").read_text() + "\n-- changed\n")
+    third = await sync(frame, frame_app=app)
+    await frame.disconnect()
+    return first, second, third
+
+
+def test_manifest_skips_unchanged_files(make_frame, tmp_path):
+    frame = make_frame()
+    first, second, third = asyncio.run(resync(frame, tmp_path))
+
+    assert sorted(first.uploaded) == sorted(["data.min.lua", "code.min.lua", "audio.min.lua",
+                                             "sprite.min.lua", "runtime.lua", "frame_app.lua",
+                                             "mic.lua"])
+    assert second.uploaded == [] and sorted(second.skipped) == sorted(first.uploaded)
+    assert third.uploaded == ["frame_app.lua"]
+    assert "changed" in frame.files["frame_app.lua"]
+    assert MANIFEST_FILE in frame.files
+
+
+def test_manifest_longer_than_a_packet(make_frame):
+    """Entries from every app synced pile up in one manifest, past what a single print carries."""
+    frame = make_frame(mtu=64)
+
+    async def sync_apps():
+        await frame.connect()
+        await sync(frame)
+        uploads = UploadManager(frame)
+        await uploads.sync(stdlua_libs=["data", "sprite", "plain_text"],
+                           frame_app=ROOT / "frame_common" / "lua" / "session_frame_app.lua",
+                           frame_app_name="session_frame_app.lua")
+        manifest = await uploads.read_manifest()
+        again = await sync(frame)
+        return manifest, again
+
+    manifest, again = asyncio.run(sync_apps())
+    assert len(frame.files[MANIFEST_FILE]) > 3 * 64
+    assert len(manifest) == 9
+    assert again.uploaded == []
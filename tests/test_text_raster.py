@@ -0,0 +1,39 @@
+"""TextRasterizer line breaking: every rendered line fits the display."""
+import pytest
+
+from frame_common.text_raster import DISPLAY_WIDTH, TextRasterizer
+
+CJK = "我们今天下午三点在火车站见面，然后一起去博物馆参观新的展览，晚上再去吃饭好吗？谢谢你的帮助"
+
+
+@pytest.fixture(scope="module")
+def rasterizer():
+    return TextRasterizer()
+
+
+def test_cjk_breaks_between_characters(rasterizer):
+    lines = rasterizer.wrap(CJK)
+    assert len(lines) > 1 and "".join(lines) == CJK
+    assert rasterizer.render(CJK).shape[1] <= rasterizer.width
+    # closing punctuation never starts a line
+    assert not any(line[0] in "，。？" for line in lines)
+
+
+def test_long_word_is_split(rasterizer):
+    word = "Donaudampfschifffahrtsgesellschaftskapitän" * 3
+    lines = rasterizer.wrap(f"der {word} kommt")
+    assert all(rasterizer.text_width(line) <= DISPLAY_WIDTH for line in lines)
+    assert "".join(lines).replace(" ", "") == f"der{word}kommt"
+    assert rasterizer.render(word).shape[1] <= rasterizer.width
+
+
+def test_latin_breaks_at_spaces(rasterizer):
+    text = "the quick brown fox jumps over the lazy dog and keeps running far away"
+    lines = rasterizer.wrap(text)
+    assert " ".join(lines) == text
+    assert all(rasterizer.text_width(line) <= DISPLAY_WIDTH for line in lines)
+
+
+def test_render(benchmark, rasterizer):
+    page = benchmark(rasterizer.render, CJK)
+    assert page.shape[1] <= rasterizer.width
@@ -0,0 +1,75 @@
+"""Tile deltas: decoded like sprite_frame_app.lua, within the Lua heap, and resent when unacknowledged."""
+import asyncio
+import struct
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from bench_sprite_codec import LUA_BUDGET
+from bench_tile_delta import SCENES, apply_update, background
+from tile_delta import MAX_UNACKED, TILE_UPDATE, TileDiffer, TileSender
+
+from .conftest import ROOT
+
+
+@pytest.fixture(scope="module")
+def base():
+    with pytest.MonkeyPatch.context() as m:
+        m.chdir(ROOT / "image_display")
+        return background()
+
+
+@pytest.mark.parametrize("scene", sorted(SCENES))
+def test_deltas_fit_the_lua_heap(benchmark, base, scene):
+    frames = [SCENES[scene](base, n) for n in range(10)]
+
+    def encode_all():
+        differ = TileDiffer()
+        return differ, [differ.encode(image) for image in frames]
+
+    differ, updates = benchmark.pedantic(encode_all, rounds=3)
+    assert differ.resident_bytes(*base.size) <= differ.max_resident
+    screen, tiles, peak = None, {}, 0
+    for image, payloads in zip(frames, updates):
+        pixels = differ.quantize(image)
+        if screen is None:
+            screen = np.zeros_like(pixels)
+        for payload in payloads:
+            peak = max(peak, apply_update(screen, tiles, payload))
+        assert np.array_equal(screen, pixels)
+    assert peak <= LUA_BUDGET
+
+
+def test_fixed_palette_over_budget(base):
+    palette = bytes(range(48))
+    with pytest.raises(ValueError, match="max_resident"):
+        TileDiffer(num_colors=16, palette=palette).encode(base)
+
+
+def test_unacknowledged_updates_are_resent(make_frame):
+    frame = make_frame()
+    sender = TileSender(frame).attach()
+    black = Image.new("RGB", (64, 64))
+
+    async def show_all():
+        for n in range(MAX_UNACKED + 2):
+            image = black.copy()
+            image.putpixel((n % 64, 0), (255, 255, 255))
+            await sender.show(image)
+
+    # FakeFrameMsg never acknowledges TILE_UPDATE, like an app that stopped drawing
+    asyncio.run(show_all())
+    assert len(sender._unacked) == MAX_UNACKED
+    assert sender.lost == 2
+    clears = [payload[4] for code, payload in frame.messages if code == TILE_UPDATE]
+    # the first frame, then a full resend once updates start going unanswered
+    assert clears[0] == 1 and clears[-1] == 1 and sum(clears) == 2
+
+
+def test_ack_clears_pending(make_frame):
+    frame = make_frame()
+    sender = TileSender(frame).attach()
+    asyncio.run(sender.show(Image.new("RGB", (64, 64), (255, 255, 255))))
+    frame.notify(bytes([TILE_UPDATE]) + struct.pack(">H", 1))
+    assert not sender._unacked and sender.lost == 0
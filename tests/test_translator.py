@@ -0,0 +1,52 @@
+"""One full translator.py cycle against FakeFrameMsg: mic stream to text on the display."""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from frame_common.bench_e2e import TRANSCRIPT, TRANSLATION, apply_text_messages, speech_bursts
+
+from .conftest import READY, ROOT
+
+
+class FakeGoogle:
+    def translate(self, text, dest):
+        return SimpleNamespace(text=TRANSLATION, src="es")
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    import translator
+    from asr_backends import StubBackend
+    from frame_common.metrics import Metrics
+    from translation_cache import CachedTranslator, TranslationCache
+
+    # the Frame app and mic.lua are read relative to live_translation/
+    monkeypatch.chdir(ROOT / "live_translation")
+    monkeypatch.setattr(translator, "asr", StubBackend(TRANSCRIPT, latency=0.01))
+    monkeypatch.setattr(translator, "translator", CachedTranslator(FakeGoogle(), TranslationCache()))
+    monkeypatch.setattr(translator, "metrics", Metrics())
+    return translator
+
+
+def mic_stream(audio_format, utterances):
+    gap = np.zeros(audio_format.sample_rate, dtype=np.int16)
+    clips = speech_bursts(utterances, audio_format.sample_rate)
+    return audio_format.encode(np.concatenate([part for clip in clips for part in (gap, clip)] + [gap]))
+
+
+def test_translator_cycle(benchmark, make_frame, translator):
+    mic_audio = mic_stream(translator.AUDIO_FORMAT, 1)
+
+    def cycle():
+        frame = make_frame(ready_message=READY, mic_audio=mic_audio, mic_speed=8)
+        asyncio.run(translator.main(frame, max_utterances=1))
+        return frame
+
+    frame = benchmark.pedantic(cycle, rounds=1)
+    assert apply_text_messages(frame.messages) == TRANSLATION
+    assert translator.metrics.histograms["capture"].count == 1
+    assert frame.mic_bytes > 0
+    # display, mic control and health polling share the link without stepping on each other
+    assert frame.collisions == 0
@@ -0,0 +1,74 @@
+"""VoiceActivityDetector on synthetic PCM: utterance boundaries and end-of-speech delay."""
+import numpy as np
+import pytest
+
+from bench_vad import SAMPLE_RATE, synth_silence, synth_speech
+from vad import VoiceActivityDetector
+
+CHUNK = 240          # bytes per RxAudio chunk, as bench_vad.py streams them
+TRAILING_S = 0.5
+
+
+def stream(*parts, seed=0):
+    """8-bit PCM of ("speech" | "silence", seconds) parts; returns the bytes and speech (start, end)s."""
+    rng = np.random.default_rng(seed)
+    pieces, spans, t = [], [], 0.0
+    for kind, seconds in parts:
+        pieces.append((synth_speech if kind == "speech" else synth_silence)(seconds, rng))
+        if kind == "speech":
+            spans.append((t, t + seconds))
+        t += seconds
+    signal = np.clip(np.concatenate(pieces), -1, 1)
+    return (signal * 127).astype(np.int8).tobytes(), spans
+
+
+def segment(pcm, **settings):
+    """(stream time the utterance was handed off, its length in seconds) for each utterance."""
+    vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE, trailing_silence_ms=TRAILING_S * 1000,
+                                **settings)
+    frame_s = vad.frame_len / SAMPLE_RATE
+    found = []
+    for offset in range(0, len(pcm), CHUNK):
+        for utterance in vad.feed(pcm[offset:offset + CHUNK]):
+            found.append((vad.frames_seen * frame_s, len(utterance) / SAMPLE_RATE))
+            utterance.release()
+    return found
+
+
+def test_one_phrase(benchmark):
+    pcm, [(start, end)] = stream(("silence", 1.0), ("speech", 1.2), ("silence", 1.5))
+    [(handed_off, length)] = benchmark(segment, pcm)
+
+    # closed off by TRAILING_S of silence, give or take a chunk and a frame
+    delay = handed_off - end
+    assert TRAILING_S <= delay <= TRAILING_S + (CHUNK + 160) / SAMPLE_RATE
+    # the phrase, the trailing silence and no more than the 200 ms pre-roll before it
+    assert end - start + TRAILING_S <= length <= end - start + TRAILING_S + 0.2 + 0.04
+
+
+def test_phrases_and_pauses():
+    pcm, spans = stream(("silence", 0.8), ("speech", 0.6), ("silence", 1.0), ("speech", 2.0),
+                        ("silence", 0.3), ("speech", 0.8), ("silence", 1.2))
+    found = segment(pcm)
+    # a 300 ms pause is shorter than the trailing silence, so the last two phrases are one
+    assert len(found) == 2
+    assert spans[0][1] < found[0][0] < spans[1][0]
+    assert found[1][0] > spans[2][1]
+
+
+def test_click_is_discarded():
+    pcm, _ = stream(("silence", 1.0), ("speech", 0.1), ("silence", 1.0))
+    assert segment(pcm) == []
+
+
+def test_long_speech_is_split():
+    pcm, _ = stream(("silence", 0.5), ("speech", 5.0), ("silence", 1.0))
+    found = segment(pcm, max_utterance_s=2.0)
+    assert len(found) == 3
+    assert all(length <= 2.0 for _, length in found)
+
+
+@pytest.mark.parametrize("sample_width", [1, 2])
+def test_silence_alone(sample_width):
+    vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE, sample_width=sample_width)
+    assert vad.feed(bytes(SAMPLE_RATE * sample_width * 2)) == [] and vad.flush() == []